@@ -0,0 +1,52 @@
+"""Atomic replacement of files read by other processes.
+
+Caches, reports, sketches, dashboards and metrics are read while they are being
+rewritten, so they are written to a temporary file in the same directory and
+moved into place. ``tempfile.mkstemp`` creates the file readable by its owner
+only; the mode is reset to the one ``open`` would give a new file, so replaced
+files stay readable by the web server or the metrics collector.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+"""Umask of the process, read once at import since reading it means setting it."""
+
+FILE_MODE = 0o666 & ~_UMASK
+"""Mode of a new file created by open under the process umask."""
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w") -> Iterator[IO[Any]]:
+    """Open a temporary file that replaces the file at path when closed.
+
+    The parent directory is created if needed. If the block raises, the
+    temporary file is removed and the file at path is left as it was.
+
+    Args:
+        path (Path): File to replace.
+        mode (str): "w" for UTF-8 text or "wb" for bytes.
+
+    Yields:
+        IO[Any]: The temporary file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else "utf-8") as file:
+            yield file
+        os.chmod(temp_path, FILE_MODE)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,6 @@
+"""http_service package: HTTP entry point with a warm worker pool and a load-test client."""
+
+from http_service.client import LoadTestReport, load_test
+from http_service.server import AnalyzerServer, ServiceConfig, serve
+
+__all__ = ["AnalyzerServer", "ServiceConfig", "serve", "LoadTestReport", "load_test"]
@@ -0,0 +1,117 @@
+import logging
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import urlencode
+
+from http_service.server import XLSX_CONTENT_TYPE
+from yaml_worker.types import Worksheet
+
+
+@dataclass
+class LoadTestReport:
+    """Result of a load test against the HTTP service.
+
+    Attributes:
+        requests (int): Number of requests sent.
+        statuses (Dict[int, int]): Response count by HTTP status.
+        elapsed (float): Wall time of the whole test in seconds.
+        median_latency (float): Median request latency in seconds.
+        p95_latency (float): 95th percentile request latency in seconds.
+    """
+
+    requests: int
+    statuses: Dict[int, int]
+    elapsed: float
+    median_latency: float
+    p95_latency: float
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+
+def analyze_url(base_url: str, worksheets: List[Worksheet]) -> str:
+    """Build the analyze URL for the given worksheets."""
+    query = urlencode(
+        [
+            pair
+            for ws in worksheets
+            for pair in (
+                ("worksheet", ws.name),
+                ("point_range", f"{ws.point_range.start}:{ws.point_range.end}"),
+            )
+        ]
+    )
+    return f"{base_url.rstrip('/')}/analyze?{query}"
+
+
+def post_workbook(url: str, data: bytes, timeout: float = 300.0) -> Tuple[int, bytes]:
+    """Upload a workbook and return the response status and body."""
+    request = urllib.request.Request(
+        url, data=data, method="POST", headers={"Content-Type": XLSX_CONTENT_TYPE}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def load_test(
+    base_url: str,
+    workbook_path: Path,
+    worksheets: List[Worksheet],
+    requests: int,
+    concurrency: int,
+) -> LoadTestReport:
+    """Send the same workbook many times in parallel and measure latency.
+
+    Args:
+        base_url (str): Base URL of the service, for example http://127.0.0.1:8080.
+        workbook_path (Path): Workbook to upload.
+        worksheets (List[Worksheet]): Worksheets to process in the workbook.
+        requests (int): Total number of requests.
+        concurrency (int): Number of requests in flight at once.
+
+    Returns:
+        LoadTestReport: Status counts and latency figures.
+    """
+    data = workbook_path.read_bytes()
+    url = analyze_url(base_url, worksheets)
+
+    def timed_post(_: int) -> Tuple[int, float]:
+        started = time.perf_counter()
+        status, _body = post_workbook(url, data)
+        return status, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_post, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    report = LoadTestReport(
+        requests,
+        dict(Counter(status for status, _ in results)),
+        elapsed,
+        statistics.median(latencies) if latencies else 0.0,
+        latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+    )
+    logging.info(
+        "Load test: %d requests in %.2fs (%.1f req/s), statuses %s, "
+        "median %.3fs, p95 %.3fs",
+        report.requests,
+        report.elapsed,
+        report.throughput,
+        report.statuses,
+        report.median_latency,
+        report.p95_latency,
+    )
+    return report
@@ -0,0 +1,267 @@
+import json
+import logging
+import multiprocessing
+import threading
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from zipfile import BadZipFile
+
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.utils.exceptions import InvalidFileException
+
+from http_service.worker_pool import WorkerPool
+from openpyxl_worker.types import Range, TableLayout
+from pipeline import process_bytes
+from yaml_worker.types import Subject, Worksheet
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class ServiceConfig:
+    """Settings of the HTTP service.
+
+    Attributes:
+        host (str): Interface to listen on.
+        port (int): Port to listen on.
+        workers (int): Number of pre-forked worker processes.
+        max_concurrency (int): Requests processed at once; others get 503.
+        max_upload_bytes (int): Largest accepted upload; bigger ones get 413.
+        timeout (float): Seconds to wait for the result before answering 504;
+            a worker still busy then is restarted.
+    """
+
+    host: str = "127.0.0.1"
+    port: int = 8080
+    workers: int = 2
+    max_concurrency: int = 4
+    max_upload_bytes: int = 20 * 1024 * 1024
+    timeout: float = 120.0
+
+
+class RequestError(Exception):
+    """Error in request parameters, answered with 400."""
+
+
+def parse_worksheets(query: str) -> Tuple[List[Worksheet], Optional[Subject]]:
+    """Parse worksheet specs and optional grade thresholds from a query string.
+
+    Worksheets are given as repeated worksheet/point_range pairs, for example
+    ``?worksheet=Протокол&point_range=C2:R21&grade_thresholds=6,11,16``. An
+    optional ``layout=aggregate`` applies to every worksheet.
+
+    Raises:
+        RequestError: If the parameters are missing or malformed.
+    """
+    params = parse_qs(query)
+    names = params.get("worksheet", [])
+    point_ranges = params.get("point_range", [])
+    if not names or len(names) != len(point_ranges):
+        raise RequestError("Every worksheet needs a point_range")
+
+    try:
+        layout = TableLayout(params.get("layout", [TableLayout.FULL.value])[0])
+    except ValueError as ve:
+        raise RequestError("layout must be full or aggregate") from ve
+
+    worksheets: List[Worksheet] = []
+    for name, point_range in zip(names, point_ranges):
+        try:
+            start, end = point_range.split(":")
+            start_row, start_column = coordinate_to_tuple(start)
+            end_row, end_column = coordinate_to_tuple(end)
+        except ValueError as ve:
+            raise RequestError(f"Invalid point_range format: '{point_range}'") from ve
+        if start_row > end_row or start_column > end_column:
+            raise RequestError(
+                f"point_range must go from the top left to the bottom right cell: "
+                f"'{point_range}'"
+            )
+        worksheets.append(Worksheet(name, Range(start, end), layout))
+
+    subject = None
+    if "grade_thresholds" in params:
+        try:
+            thresholds = tuple(
+                float(value) for value in params["grade_thresholds"][0].split(",")
+            )
+        except ValueError as ve:
+            raise RequestError("grade_thresholds must be numbers") from ve
+        if len(thresholds) != 3 or list(thresholds) != sorted(thresholds):
+            raise RequestError("grade_thresholds must be three non-decreasing numbers")
+        subject = Subject("upload", thresholds)
+    return worksheets, subject
+
+
+def _warm_up() -> None:
+    """Pool initializer: quiet logging and save an empty workbook to warm up openpyxl."""
+    logging.getLogger().setLevel(logging.WARNING)
+    from openpyxl import Workbook as OpenpyxlWorkbook
+
+    OpenpyxlWorkbook().save(BytesIO())
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Request handler; the server instance carries the pool and the limits."""
+
+    server: "AnalyzerServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path != "/health":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+        self._send_json(HTTPStatus.OK, self.server.health())
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/analyze":
+            self.close_connection = True
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+
+        length = self.headers.get("Content-Length", "")
+        if not length.isdigit():
+            self.close_connection = True
+            self._send_json(HTTPStatus.LENGTH_REQUIRED, {"error": "Length required"})
+            return
+        if int(length) > self.server.config.max_upload_bytes:
+            self.close_connection = True
+            self._send_json(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Upload is too large"}
+            )
+            return
+
+        try:
+            # http.server decodes the request line as latin-1; undo it for raw UTF-8 names.
+            query = url.query.encode("latin-1").decode("utf-8")
+        except UnicodeError:
+            query = url.query
+        try:
+            worksheets, subject = parse_worksheets(query)
+        except RequestError as exc:
+            self.close_connection = True
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            return
+
+        if not self.server.acquire_slot():
+            self.close_connection = True
+            self._send_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "Too many requests"},
+                {"Retry-After": "1"},
+            )
+            return
+        try:
+            data = self.rfile.read(int(length))
+            # A worker still busy at the timeout is replaced, so the slot is
+            # never held by a hung task.
+            result = self.server.pool.run(
+                process_bytes, (data, worksheets, subject), self.server.config.timeout
+            )
+        except multiprocessing.TimeoutError:
+            self._send_json(
+                HTTPStatus.GATEWAY_TIMEOUT, {"error": "Processing timed out"}
+            )
+            return
+        except (KeyError, ValueError, BadZipFile, InvalidFileException) as exc:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            return
+        except Exception as exc:
+            logging.exception("Failed to process upload")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)})
+            return
+        finally:
+            self.server.release_slot()
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", XLSX_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(result)))
+        self.end_headers()
+        view = memoryview(result)
+        for start in range(0, len(view), CHUNK_SIZE):
+            self.wfile.write(view[start : start + CHUNK_SIZE])
+
+    def _send_json(
+        self, status: HTTPStatus, body: dict, headers: Optional[dict] = None
+    ) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        logging.info("%s - %s", self.address_string(), format % args)
+
+
+class AnalyzerServer(ThreadingHTTPServer):
+    """HTTP server running the pipeline in a pool of pre-forked worker processes."""
+
+    daemon_threads = True
+
+    def __init__(self, config: ServiceConfig) -> None:
+        """Start the worker pool and bind the server.
+
+        Args:
+            config (ServiceConfig): Service settings.
+        """
+        self.config = config
+        self.active_requests = 0
+        self._slots_lock = threading.Lock()
+        self.pool = WorkerPool(config.workers, _warm_up)
+        super().__init__((config.host, config.port), ServiceHandler)
+        logging.info(
+            "Serving on %s:%d with %d workers",
+            config.host,
+            self.server_address[1],
+            config.workers,
+        )
+
+    def acquire_slot(self) -> bool:
+        """Take a request slot.
+
+        Returns:
+            bool: True if a slot was free, False if max_concurrency requests
+                are already being processed.
+        """
+        with self._slots_lock:
+            if self.active_requests >= self.config.max_concurrency:
+                return False
+            self.active_requests += 1
+            return True
+
+    def release_slot(self) -> None:
+        """Free a request slot."""
+        with self._slots_lock:
+            self.active_requests -= 1
+
+    def health(self) -> dict:
+        """Return the service state for the health endpoint."""
+        return {
+            "status": "ok",
+            "workers": self.config.workers,
+            "max_concurrency": self.config.max_concurrency,
+            "active_requests": self.active_requests,
+        }
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.terminate()
+
+
+def serve(config: ServiceConfig) -> None:
+    """Run the HTTP service until interrupted."""
+    with AnalyzerServer(config) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Stopping the service")
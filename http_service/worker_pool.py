@@ -0,0 +1,138 @@
+"""Pre-forked worker processes that are replaced when a task hangs.
+
+multiprocessing.Pool cannot cancel a task, so an upload that hangs the
+pipeline would keep its worker and its request slot forever. Every worker here
+runs one task at a time over its own pipe; a worker still busy when the
+request times out is terminated and replaced by a fresh one.
+"""
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Optional, Set, Tuple
+
+
+def _serve(connection: Connection, initializer: Optional[Callable[[], None]]) -> None:
+    """Worker loop: run every received function and send back its outcome."""
+    if initializer is not None:
+        initializer()
+    while True:
+        try:
+            function, args = connection.recv()
+        except EOFError:
+            return
+        try:
+            outcome: Tuple[bool, Any] = (True, function(*args))
+        except Exception as exc:
+            outcome = (False, exc)
+        try:
+            connection.send(outcome)
+        except Exception as exc:
+            # The result or the exception could not be pickled.
+            connection.send((False, RuntimeError(f"{type(exc).__name__}: {exc}")))
+
+
+class _Worker:
+    """A worker process and the parent end of its pipe."""
+
+    def __init__(self, initializer: Optional[Callable[[], None]]) -> None:
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(child, initializer), daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def stop(self) -> None:
+        self.connection.close()
+        self.process.terminate()
+        self.process.join()
+
+
+class WorkerPool:
+    """Fixed number of worker processes running one task each."""
+
+    def __init__(
+        self, size: int, initializer: Optional[Callable[[], None]] = None
+    ) -> None:
+        """Start the worker processes.
+
+        Args:
+            size (int): Number of worker processes.
+            initializer (Optional[Callable[[], None]]): Called once in every new worker.
+        """
+        self.initializer = initializer
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: Set[_Worker] = set()
+        self._lock = threading.Lock()
+        for _ in range(size):
+            self._idle.put(self._start())
+
+    def _start(self) -> _Worker:
+        worker = _Worker(self.initializer)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _replace(self, worker: _Worker) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop()
+        self._idle.put(self._start())
+
+    def run(
+        self, function: Callable[..., Any], args: Tuple[Any, ...], timeout: float
+    ) -> Any:
+        """Run a function in a worker process and return its result.
+
+        Args:
+            function (Callable[..., Any]): Picklable module-level function.
+            args (Tuple[Any, ...]): Picklable arguments.
+            timeout (float): Seconds to wait for a free worker and the result together.
+
+        Returns:
+            Any: The result of the function.
+
+        Raises:
+            multiprocessing.TimeoutError: If the result is not ready in time;
+                a worker still running the task is replaced.
+            RuntimeError: If the worker process died.
+            Exception: Whatever the function raised.
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise multiprocessing.TimeoutError("No free worker") from None
+
+        try:
+            worker.connection.send((function, args))
+            if not worker.connection.poll(max(deadline - time.monotonic(), 0.0)):
+                logging.warning(
+                    "Replacing worker %s still busy after %.0f s",
+                    worker.process.pid,
+                    timeout,
+                )
+                self._replace(worker)
+                raise multiprocessing.TimeoutError("Task timed out")
+            succeeded, value = worker.connection.recv()
+        except (EOFError, OSError) as exc:
+            logging.error("Worker %s died: %s", worker.process.pid, exc)
+            self._replace(worker)
+            raise RuntimeError("Worker process died") from exc
+
+        self._idle.put(worker)
+        if not succeeded:
+            raise value
+        return value
+
+    def terminate(self) -> None:
+        """Stop every worker process."""
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,15 @@
+"""job_queue package: shared-directory job queue for spreading workbooks across hosts."""
+
+from job_queue.job_queue import JobQueue
+from job_queue.types import Job, JobStatus
+from job_queue.worker import JobProcessor, LeaseLost, default_worker_id, run_worker
+
+__all__ = [
+    "JobQueue",
+    "Job",
+    "JobStatus",
+    "JobProcessor",
+    "LeaseLost",
+    "default_worker_id",
+    "run_worker",
+]
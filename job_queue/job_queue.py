@@ -0,0 +1,273 @@
+import logging
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from job_queue.types import Job, JobStatus
+
+_SCHEMA = (
+    """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    workbook TEXT NOT NULL,
+    config_path TEXT NOT NULL,
+    table_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    error TEXT,
+    updated_at REAL NOT NULL
+)
+""",
+    "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until)",
+)
+
+_COLUMNS = (
+    "id, workbook, config_path, table_path, status, attempts, max_attempts, "
+    "worker, lease_until, error"
+)
+
+
+class JobQueue:
+    """Job queue of workbooks stored in an SQLite file on a shared directory.
+
+    Every workbook from the configuration becomes a job. Workers claim jobs with
+    a time-limited lease, extend it with heartbeats and report the result. A job
+    whose lease expired (the worker died or lost the network) is claimed again,
+    until it runs out of attempts.
+
+    The rollback journal is used instead of WAL, because WAL needs shared memory
+    and does not work across hosts on a network filesystem.
+    """
+
+    DATABASE_NAME = "jobs.sqlite3"
+
+    def __init__(self, directory: Path, timeout: float = 30.0) -> None:
+        """Initialize the queue, creating the database when it does not exist.
+
+        Args:
+            directory (Path): Shared directory holding the queue database.
+            timeout (float): Seconds to wait for a lock held by another worker.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / self.DATABASE_NAME
+        self.timeout = timeout
+        with self._transaction() as connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection and hold the write lock for the whole block."""
+        with closing(
+            sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        ) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def enqueue(
+        self,
+        workbook: str,
+        config_path: Path,
+        table_path: Path,
+        max_attempts: int = 3,
+    ) -> Optional[int]:
+        """Add a workbook job unless the same workbook is already waiting or running.
+
+        Args:
+            workbook (str): Name of the workbook in the configuration file.
+            config_path (Path): Path of the YAML configuration file.
+            table_path (Path): Path of the Excel file to process.
+            max_attempts (int): Number of claims after which the job is failed.
+
+        Returns:
+            Optional[int]: Identifier of the new job, None if it was already queued.
+        """
+        with self._transaction() as connection:
+            active = connection.execute(
+                "SELECT id FROM jobs WHERE table_path = ? AND status IN (?, ?)",
+                (str(table_path.resolve()), JobStatus.PENDING, JobStatus.RUNNING),
+            ).fetchone()
+            if active:
+                logging.info("Job for %s is already queued: %d", table_path, active[0])
+                return None
+            cursor = connection.execute(
+                "INSERT INTO jobs (workbook, config_path, table_path, status, "
+                "max_attempts, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    workbook,
+                    str(config_path.resolve()),
+                    str(table_path.resolve()),
+                    JobStatus.PENDING,
+                    max_attempts,
+                    time.time(),
+                ),
+            )
+        logging.info("Enqueued job %d for workbook %s", cursor.lastrowid, workbook)
+        return cursor.lastrowid
+
+    def claim(self, worker: str, lease_seconds: float) -> Optional[Job]:
+        """Claim the oldest pending job or a job whose lease has expired.
+
+        Args:
+            worker (str): Identifier of the claiming worker.
+            lease_seconds (float): Lease duration in seconds.
+
+        Returns:
+            Optional[Job]: The claimed job, None when nothing is available.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            self._fail_exhausted(connection, now)
+            row = connection.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE status = ? "
+                "OR (status = ? AND lease_until < ?) ORDER BY id LIMIT 1",
+                (JobStatus.PENDING, JobStatus.RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            job = self._to_job(row)
+            if job.status is JobStatus.RUNNING:
+                logging.warning(
+                    "Reclaiming job %d from worker %s with expired lease",
+                    job.id,
+                    job.worker,
+                )
+            connection.execute(
+                "UPDATE jobs SET status = ?, worker = ?, lease_until = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (JobStatus.RUNNING, worker, now + lease_seconds, now, job.id),
+            )
+        job.status = JobStatus.RUNNING
+        job.worker = worker
+        job.lease_until = now + lease_seconds
+        job.attempts += 1
+        logging.info("Worker %s claimed job %d", worker, job.id)
+        return job
+
+    def heartbeat(self, job_id: int, worker: str, lease_seconds: float) -> bool:
+        """Extend the lease of a running job.
+
+        Args:
+            job_id (int): Identifier of the job.
+            worker (str): Identifier of the worker holding the lease.
+            lease_seconds (float): New lease duration from now.
+
+        Returns:
+            bool: False if the worker no longer holds the lease.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (now + lease_seconds, now, job_id, worker, JobStatus.RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str) -> bool:
+        """Mark a job as done.
+
+        Returns:
+            bool: False if the worker no longer holds the lease.
+        """
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT id FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker, JobStatus.RUNNING),
+            ).fetchone()
+            if row is None:
+                logging.warning("Worker %s lost the lease of job %d", worker, job_id)
+                return False
+            self._finish(connection, job_id, JobStatus.DONE, None)
+        return True
+
+    def fail(self, job_id: int, worker: str, error: str) -> bool:
+        """Record a failed attempt, returning the job to the queue if attempts remain.
+
+        Returns:
+            bool: False if the worker no longer holds the lease.
+        """
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT attempts, max_attempts FROM jobs "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker, JobStatus.RUNNING),
+            ).fetchone()
+            if row is None:
+                logging.warning("Worker %s lost the lease of job %d", worker, job_id)
+                return False
+            status = JobStatus.PENDING if row[0] < row[1] else JobStatus.FAILED
+            self._finish(connection, job_id, status, error)
+        return True
+
+    def counts(self) -> Dict[JobStatus, int]:
+        """Return the number of jobs in every state."""
+        with self._transaction() as connection:
+            rows = connection.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        counts = {status: 0 for status in JobStatus}
+        counts.update({JobStatus(status): count for status, count in rows})
+        return counts
+
+    def jobs(self) -> List[Job]:
+        """Return all jobs in the order they were enqueued."""
+        with self._transaction() as connection:
+            rows = connection.execute(
+                f"SELECT {_COLUMNS} FROM jobs ORDER BY id"
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def _finish(
+        self,
+        connection: sqlite3.Connection,
+        job_id: int,
+        status: JobStatus,
+        error: Optional[str],
+    ) -> None:
+        connection.execute(
+            "UPDATE jobs SET status = ?, error = ?, worker = NULL, "
+            "lease_until = NULL, updated_at = ? WHERE id = ?",
+            (status, error, time.time(), job_id),
+        )
+        logging.info("Job %d finished with status %s", job_id, status)
+
+    def _fail_exhausted(self, connection: sqlite3.Connection, now: float) -> None:
+        """Fail expired jobs that have no attempts left."""
+        connection.execute(
+            "UPDATE jobs SET status = ?, error = ?, worker = NULL, lease_until = NULL, "
+            "updated_at = ? WHERE status = ? AND lease_until < ? "
+            "AND attempts >= max_attempts",
+            (
+                JobStatus.FAILED,
+                "Lease expired on the last attempt",
+                now,
+                JobStatus.RUNNING,
+                now,
+            ),
+        )
+
+    @staticmethod
+    def _to_job(row: tuple) -> Job:
+        return Job(
+            row[0],
+            row[1],
+            row[2],
+            row[3],
+            JobStatus(row[4]),
+            row[5],
+            row[6],
+            row[7],
+            row[8],
+            row[9],
+        )
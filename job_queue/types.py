@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Optional
+
+
+class JobStatus(StrEnum):
+    """Lifecycle states of a queued workbook job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """Represents a workbook job stored in the shared queue.
+
+    Attributes:
+        id (int): Job identifier.
+        workbook (str): Name of the workbook in the configuration file.
+        config_path (str): Absolute path of the YAML configuration file.
+        table_path (str): Absolute path of the Excel file to process.
+        status (JobStatus): Current state of the job.
+        attempts (int): Number of times the job has been claimed.
+        max_attempts (int): Number of claims after which the job is failed.
+        worker (Optional[str]): Identifier of the worker holding the lease.
+        lease_until (Optional[float]): Unix time when the lease expires.
+        error (Optional[str]): Last error message.
+    """
+
+    id: int
+    workbook: str
+    config_path: str
+    table_path: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    worker: Optional[str] = None
+    lease_until: Optional[float] = None
+    error: Optional[str] = None
@@ -0,0 +1,119 @@
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable
+
+from job_queue.job_queue import JobQueue
+from job_queue.types import Job
+
+JobProcessor = Callable[[Job, Callable[[], None]], None]
+"""Function processing a job; it calls the given lease check before writing results."""
+
+
+class LeaseLost(Exception):
+    """Raised when another worker has taken over the lease of a job."""
+
+
+def default_worker_id() -> str:
+    """Return an identifier unique across hosts sharing the queue."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Heartbeat(threading.Thread):
+    """Background thread extending the lease of a job while it is processed."""
+
+    def __init__(
+        self, queue: JobQueue, job: Job, worker: str, lease_seconds: float
+    ) -> None:
+        super().__init__(name=f"heartbeat-{job.id}", daemon=True)
+        self.queue = queue
+        self.job = job
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.lease_seconds / 3):
+            try:
+                if not self.queue.heartbeat(
+                    self.job.id, self.worker, self.lease_seconds
+                ):
+                    logging.warning("Lease of job %d was taken over", self.job.id)
+                    self.lost = True
+                    return
+            except Exception:
+                logging.exception("Heartbeat of job %d failed", self.job.id)
+
+    def check(self) -> None:
+        """Confirm that the lease is still held, extending it.
+
+        Raises:
+            LeaseLost: If another worker has taken over the job.
+        """
+        if not self.lost and not self.queue.heartbeat(
+            self.job.id, self.worker, self.lease_seconds
+        ):
+            logging.warning("Lease of job %d was taken over", self.job.id)
+            self.lost = True
+        if self.lost:
+            raise LeaseLost(f"Lease of job {self.job.id} was taken over")
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+
+def run_worker(
+    queue: JobQueue,
+    process: JobProcessor,
+    worker: str,
+    lease_seconds: float = 300.0,
+    poll_interval: float = 5.0,
+    exit_when_empty: bool = False,
+) -> int:
+    """Claim and process jobs until the queue is empty or the worker is stopped.
+
+    Args:
+        queue (JobQueue): The shared job queue.
+        process (JobProcessor): Function processing a single job. It gets the
+            lease check, which raises LeaseLost once another worker has taken
+            over the job, and must call it before saving any result.
+        worker (str): Identifier of this worker.
+        lease_seconds (float): Lease duration, extended by heartbeats every third of it.
+        poll_interval (float): Seconds to wait before polling an empty queue again.
+        exit_when_empty (bool): Stop when there is nothing to claim.
+
+    Returns:
+        int: Number of jobs completed by this worker.
+    """
+    completed = 0
+
+    while True:
+        job = queue.claim(worker, lease_seconds)
+        if job is None:
+            if exit_when_empty:
+                logging.info("Worker %s found no jobs, exiting", worker)
+                return completed
+            time.sleep(poll_interval)
+            continue
+
+        heartbeat = Heartbeat(queue, job, worker, lease_seconds)
+        heartbeat.start()
+        try:
+            process(job, heartbeat.check)
+            heartbeat.check()
+        except LeaseLost as exc:
+            heartbeat.stop()
+            logging.warning("Abandoning job %d: %s", job.id, exc)
+            continue
+        except Exception as exc:
+            heartbeat.stop()
+            logging.exception("Job %d failed: %s", job.id, exc)
+            queue.fail(job.id, worker, f"{type(exc).__name__}: {exc}")
+            continue
+        heartbeat.stop()
+        if queue.complete(job.id, worker):
+            completed += 1
@@ -1,64 +1,343 @@
+import argparse
+import json
 import logging
+import math
 import os
+import sys
+from contextlib import nullcontext
+from dataclasses import asdict
 from pathlib import Path
-from typing import List
-
-from openpyxl_worker import (
-    AnalyticTableCreates,
-    GivenTableWorker,
-    SummaryTableWorker,
-    WorkbookContainer,
-    WorksheetRanges,
+from typing import Any, Callable, Dict, List, Optional
+
+from openpyxl.utils.cell import coordinate_from_string
+
+from http_service import ServiceConfig, load_test, serve
+from job_queue import Job, JobQueue, default_worker_id, run_worker
+from metrics import MetricsExporter
+from openpyxl_worker.constants import (
+    DISTRICT_TABLE_TITLE,
+    PIVOT_TABLE_TITLE,
+    SUMMARY_TABLE_TITLE,
 )
-from openpyxl_worker.constants import SUMMARY_TABLE_TITLE
-from sentences import Directory, Sentences
+from openpyxl_worker.types import Range
+from openpyxl_worker.workbook_diff import diff_workbooks
+from pipeline import (
+    analyze_workbook,
+    build_profiles,
+    process_workbook,
+    write_dashboard_indexes,
+    write_district_ranks,
+)
+from sentences import Directory
 from yaml_worker import YamlWorker
+from yaml_worker.types import Workbook, Worksheet
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Without a command all workbooks from the configuration are processed in this process.
+    """
+    parser = argparse.ArgumentParser(description="VPR analyzer")
+    commands = parser.add_subparsers(dest="command")
+    queue_parent = argparse.ArgumentParser(add_help=False)
+    queue_parent.add_argument(
+        "--queue",
+        type=Path,
+        default=Path(os.getenv("JOB_QUEUE_PATH", "queue")),
+        help="Shared directory holding the job queue",
+    )
+
+    enqueue = commands.add_parser(
+        "enqueue", parents=[queue_parent], help="Add every configured workbook as a job"
+    )
+    enqueue.add_argument("--max-attempts", type=int, default=3)
+
+    worker = commands.add_parser(
+        "worker", parents=[queue_parent], help="Claim and process jobs from the queue"
+    )
+    worker.add_argument("--lease", type=float, default=300.0, help="Lease in seconds")
+    worker.add_argument("--poll", type=float, default=5.0, help="Poll interval")
+    worker.add_argument("--exit-when-empty", action="store_true")
+
+    commands.add_parser("status", parents=[queue_parent], help="Show job counts")
+
+    service = commands.add_parser("serve", help="Run the HTTP service")
+    service.add_argument("--host", default="127.0.0.1")
+    service.add_argument("--port", type=int, default=8080)
+    service.add_argument("--workers", type=int, default=2)
+    service.add_argument("--max-concurrency", type=int, default=4)
+    service.add_argument("--max-upload-mb", type=float, default=20.0)
+    service.add_argument("--timeout", type=float, default=120.0)
+
+    stats = commands.add_parser(
+        "stats", help="Print score statistics from the score cache as JSON lines"
+    )
+    stats.add_argument(
+        "--output", type=Path, help="File for the JSON lines instead of stdout"
+    )
+
+    profiles = commands.add_parser(
+        "profiles",
+        help="Print completion by subject of every student as JSON lines",
+    )
+    profiles.add_argument(
+        "--output", type=Path, help="File for the JSON lines instead of stdout"
+    )
+
+    commands.add_parser(
+        "percentiles",
+        help="Write district percentile ranks of classes and students into workbooks",
+    )
+
+    diff = commands.add_parser(
+        "diff", help="Compare analytic tables of processed workbooks as JSON lines"
+    )
+    diff.add_argument("old", type=Path, help="Old workbook or directory of workbooks")
+    diff.add_argument("new", type=Path, help="New workbook or directory of workbooks")
+    diff.add_argument(
+        "--output", type=Path, help="File for the JSON lines instead of stdout"
+    )
+    diff.add_argument(
+        "--all-cells",
+        action="store_true",
+        help="Compare every cell of every worksheet, not only the generated tables",
+    )
+
+    loadtest = commands.add_parser("loadtest", help="Load-test the HTTP service")
+    loadtest.add_argument("workbook", type=Path)
+    loadtest.add_argument(
+        "--sheet",
+        action="append",
+        required=True,
+        metavar="NAME=RANGE",
+        help="Worksheet and point range, for example Протокол=C2:R21",
+    )
+    loadtest.add_argument("--url", default="http://127.0.0.1:8080")
+    loadtest.add_argument("--requests", type=int, default=20)
+    loadtest.add_argument("--concurrency", type=int, default=4)
+    return parser.parse_args(argv)
+
+
+def parse_sheet_arg(value: str) -> Worksheet:
+    """Parse a NAME=START:END command line worksheet spec."""
+    name, point_range = value.rsplit("=", 1)
+    start, end = point_range.split(":")
+    return Worksheet(name, Range(start, end))
+
 
+def run_batch(table_config_path: Path) -> None:
+    """Process every configured workbook in this process."""
+    workbooks = YamlWorker(table_config_path).read()
+    for wb in workbooks:
+        process_workbook(wb, Path(Directory.tables, wb.name))
+    write_dashboard_indexes(workbooks)
 
-def main() -> None:
+
+def print_statistics(table_config_path: Path, output: Optional[Path]) -> None:
+    """Write score statistics of every configured workbook as JSON lines.
+
+    Scores come from the score cache, so archived files are not parsed again
+    unless they changed.
+    """
+    workbooks = YamlWorker(table_config_path).read()
+    with (
+        open(output, "w", encoding="utf-8")
+        if output
+        else nullcontext(sys.stdout) as stream
+    ):
+        for wb in workbooks:
+            for statistics in analyze_workbook(wb, Path(Directory.tables, wb.name)):
+                record = {"workbook": wb.name, **asdict(statistics)}
+                stream.write(json.dumps(_finite(record), ensure_ascii=False) + "\n")
+
+
+def print_profiles(table_config_path: Path, output: Optional[Path]) -> None:
+    """Write one profile per student with completion by subject as JSON lines."""
+    index = build_profiles(YamlWorker(table_config_path).read(), Path(Directory.tables))
+    with (
+        open(output, "w", encoding="utf-8")
+        if output
+        else nullcontext(sys.stdout) as stream
+    ):
+        for profile in index:
+            record = {**profile.key._asdict(), "completion": profile.completion}
+            stream.write(json.dumps(_finite(record), ensure_ascii=False) + "\n")
+
+
+def _finite(value: Any) -> Any:
+    """Replace NaN with None in nested statistics values."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def diff_regions(workbooks: List[Workbook], name: str) -> Optional[Dict[str, int]]:
+    """Return the first row of the generated tables of every worksheet of a workbook.
+
+    Analytic tables start under the given table of every configured worksheet;
+    the summary, pivot and district sheets are compared in full. Workbooks missing from the
+    configuration are compared in full.
+    """
+    for wb in workbooks:
+        if Path(wb.name).stem == Path(name).stem:
+            regions = {
+                ws.name: coordinate_from_string(ws.point_range.end)[1] + 1
+                for ws in wb.worksheets
+            }
+            return {
+                **regions,
+                SUMMARY_TABLE_TITLE: 1,
+                PIVOT_TABLE_TITLE: 1,
+                DISTRICT_TABLE_TITLE: 1,
+            }
+    return None
+
+
+def print_differences(
+    table_config_path: Path,
+    old: Path,
+    new: Path,
+    output: Optional[Path],
+    all_cells: bool = False,
+) -> None:
+    """Write cell differences between processed workbooks as JSON lines.
+
+    Two directories are compared file by file: every xlsx file of the new
+    directory with the file of the same name in the old one.
+    """
+    workbooks = [] if all_cells else YamlWorker(table_config_path).read()
+    if new.is_dir():
+        pairs = [(old / path.name, path) for path in sorted(new.glob("*.xlsx"))]
+    else:
+        pairs = [(old, new)]
+    with (
+        open(output, "w", encoding="utf-8")
+        if output
+        else nullcontext(sys.stdout) as stream
+    ):
+        for old_path, new_path in pairs:
+            if not old_path.exists():
+                logging.warning("No workbook to compare with %s", new_path)
+                continue
+            regions = None if all_cells else diff_regions(workbooks, new_path.name)
+            count = 0
+            for difference in diff_workbooks(old_path, new_path, regions):
+                record = {"workbook": new_path.name, **difference._asdict()}
+                stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+            logging.info("%s: %d differences", new_path.name, count)
+
+
+def enqueue_workbooks(
+    table_config_path: Path, queue: JobQueue, max_attempts: int
+) -> None:
+    """Add every configured workbook to the shared job queue."""
+    workbooks = YamlWorker(table_config_path).read()
+    for wb in workbooks:
+        queue.enqueue(
+            wb.name, table_config_path, Path(Directory.tables, wb.name), max_attempts
+        )
+
+
+def process_job(job: Job, check_lease: Callable[[], None]) -> None:
+    """Process the workbook of a job claimed from the queue.
+
+    The lease is checked before the workbook is saved, so a worker whose job
+    was taken over never overwrites the result of the new owner.
+
+    Raises:
+        KeyError: If the workbook is no longer in the configuration file.
+        LeaseLost: If another worker has taken over the job.
+    """
+    workbooks = YamlWorker(Path(job.config_path)).read()
+    for wb in workbooks:
+        if wb.name == job.workbook:
+            process_workbook(wb, Path(job.table_path), check_lease)
+            write_dashboard_indexes([wb])
+            return
+    raise KeyError(f"Workbook '{job.workbook}' not found in {job.config_path}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Main entry point for the VPR analyzer application.
 
     Reads workbook configurations, processes each worksheet, creates analytic and summary tables, and saves results.
+    Workbooks can also be spread across hosts through a job queue on a shared directory.
+    Run metrics are exported when METRICS_TEXTFILE_PATH or METRICS_JSONL_PATH is set.
     Enhanced with error handling and logging.
     """
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s [%(levelname)s] %(message)s",
     )
+    args = parse_args(argv)
     table_config_path = Path(os.getenv("TABLES_CONFIG_PATH", "tables.yaml"))
+    exporter = MetricsExporter.from_env()
+    exporter.start()
     try:
-        yaml_worker = YamlWorker(table_config_path)
-        workbooks = yaml_worker.read()
-
-        for wb in workbooks:
-            table_path = Path(Directory.tables, wb.name)
-            wb_container = WorkbookContainer(table_path)
-            summary_table_data: List[WorksheetRanges] = []
-
-            for ws in wb.worksheets:
-                wb_data = wb_container.activate_sheet(ws.name)
-                given_ranges = GivenTableWorker(
-                    wb_data.ws, ws.point_range
-                ).get_cell_ranges()
-                worksheet_ranges = AnalyticTableCreates(
-                    wb_data.wb, wb_data.ws, given_ranges
-                ).create()
-                summary_table_data.append(worksheet_ranges)
-                logging.info("%s %s - %s", Sentences.create_table, wb.name, ws.name)
-
-            SummaryTableWorker(wb_container.wb, SUMMARY_TABLE_TITLE).create(
-                summary_table_data
+        if args.command == "enqueue":
+            enqueue_workbooks(
+                table_config_path, JobQueue(args.queue), args.max_attempts
+            )
+        elif args.command == "worker":
+            worker = default_worker_id()
+            completed = run_worker(
+                JobQueue(args.queue),
+                process_job,
+                worker,
+                args.lease,
+                args.poll,
+                args.exit_when_empty,
+            )
+            logging.info("Worker %s completed %d jobs", worker, completed)
+        elif args.command == "serve":
+            serve(
+                ServiceConfig(
+                    args.host,
+                    args.port,
+                    args.workers,
+                    args.max_concurrency,
+                    int(args.max_upload_mb * 1024 * 1024),
+                    args.timeout,
+                )
+            )
+        elif args.command == "loadtest":
+            load_test(
+                args.url,
+                args.workbook,
+                [parse_sheet_arg(sheet) for sheet in args.sheet],
+                args.requests,
+                args.concurrency,
+            )
+        elif args.command == "stats":
+            print_statistics(table_config_path, args.output)
+        elif args.command == "profiles":
+            print_profiles(table_config_path, args.output)
+        elif args.command == "percentiles":
+            write_district_ranks(
+                YamlWorker(table_config_path).read(), Path(Directory.tables)
             )
-            logging.info(
-                "%s %s - %s", Sentences.create_table, wb.name, Sentences.overall_results
+        elif args.command == "diff":
+            print_differences(
+                table_config_path, args.old, args.new, args.output, args.all_cells
             )
-            wb_container.save_table(table_path)
-            logging.info("%s %s", Sentences.save_table, table_path)
+        elif args.command == "status":
+            for status, count in JobQueue(args.queue).counts().items():
+                logging.info("%s: %d", status, count)
+        else:
+            run_batch(table_config_path)
 
         # For CLI use, uncomment the next line:
         # input(Sentences.press_to_close)
     except Exception as exc:
         logging.exception("An error occurred during processing: %s", exc)
+    finally:
+        exporter.stop()
 
 
 if __name__ == "__main__":
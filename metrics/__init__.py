@@ -0,0 +1,17 @@
+"""metrics package: run metrics exported as a Prometheus textfile and JSON lines."""
+
+from metrics.exporter import MetricsExporter, render_textfile
+from metrics.registry import Counter, Gauge, Histogram, Registry
+from metrics.run_metrics import REGISTRY, record_failure, timed_stage
+
+__all__ = [
+    "MetricsExporter",
+    "render_textfile",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "REGISTRY",
+    "record_failure",
+    "timed_stage",
+]
@@ -0,0 +1,173 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import List, Optional, Type
+
+from atomic_file import atomic_write
+from metrics.registry import Registry, Sample
+from metrics.run_metrics import REGISTRY, update_derived
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_sample(sample: Sample) -> str:
+    if not sample.labels:
+        return f"{sample.name} {_format_value(sample.value)}"
+    labels = ",".join(
+        f'{name}="{_escape_label(value)}"' for name, value in sample.labels
+    )
+    return f"{sample.name}{{{labels}}} {_format_value(sample.value)}"
+
+
+def render_textfile(registry: Registry) -> str:
+    """Render all metrics in the Prometheus text exposition format.
+
+    Args:
+        registry (Registry): Metrics to render.
+
+    Returns:
+        str: Text for the node exporter textfile collector.
+    """
+    lines: List[str] = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(_format_sample(sample) for sample in metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Writes metrics periodically during a run and once more at its end.
+
+    The textfile is replaced atomically, as the node exporter textfile collector
+    requires; the JSON-lines stream gets one snapshot per export.
+    """
+
+    def __init__(
+        self,
+        textfile_path: Optional[Path] = None,
+        jsonl_path: Optional[Path] = None,
+        interval: float = 30.0,
+        registry: Registry = REGISTRY,
+    ) -> None:
+        """Initialize the exporter.
+
+        Args:
+            textfile_path (Optional[Path]): Prometheus textfile, None to skip it.
+            jsonl_path (Optional[Path]): JSON-lines stream, None to skip it.
+            interval (float): Seconds between periodic exports; 0 exports only at the end.
+            registry (Registry): Metrics to export.
+        """
+        self.textfile_path = textfile_path
+        self.jsonl_path = jsonl_path
+        self.interval = interval
+        self.registry = registry
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "MetricsExporter":
+        """Create an exporter configured by METRICS_TEXTFILE_PATH, METRICS_JSONL_PATH
+        and METRICS_INTERVAL environment variables."""
+        textfile_path = os.getenv("METRICS_TEXTFILE_PATH")
+        jsonl_path = os.getenv("METRICS_JSONL_PATH")
+        return cls(
+            Path(textfile_path) if textfile_path else None,
+            Path(jsonl_path) if jsonl_path else None,
+            float(os.getenv("METRICS_INTERVAL", "30")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.textfile_path is not None or self.jsonl_path is not None
+
+    def start(self) -> None:
+        """Start periodic exports in a background thread."""
+        if not self.enabled or self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop periodic exports and write the final snapshot."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.export(final=True)
+
+    def __enter__(self) -> "MetricsExporter":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.export()
+
+    def export(self, final: bool = False) -> None:
+        """Write the current metrics to the configured destinations.
+
+        Args:
+            final (bool): Whether this is the snapshot at the end of the run.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            update_derived()
+            try:
+                if self.textfile_path is not None:
+                    self._write_textfile(self.textfile_path)
+                if self.jsonl_path is not None:
+                    self._append_jsonl(self.jsonl_path, final)
+            except OSError:
+                logging.exception("Failed to export metrics")
+
+    def _write_textfile(self, path: Path) -> None:
+        with atomic_write(path) as file:
+            file.write(render_textfile(self.registry))
+
+    def _append_jsonl(self, path: Path, final: bool) -> None:
+        record = {
+            "timestamp": time.time(),
+            "event": "final" if final else "periodic",
+            "samples": [
+                {
+                    "name": sample.name,
+                    "labels": dict(sample.labels),
+                    "value": sample.value,
+                }
+                for metric in self.registry
+                for sample in metric.samples()
+            ],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
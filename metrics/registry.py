@@ -0,0 +1,196 @@
+import bisect
+import math
+import threading
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+"""Upper bounds of stage duration buckets in seconds; +Inf is added on export."""
+
+
+class Sample(NamedTuple):
+    """A single exported value of a metric."""
+
+    name: str
+    labels: Labels
+    value: float
+
+
+def _labels(label_names: Sequence[str], values: Sequence[str]) -> Labels:
+    if len(label_names) != len(values):
+        raise ValueError(f"Expected labels {tuple(label_names)}, got {tuple(values)}")
+    return tuple(zip(label_names, (str(value) for value in values)))
+
+
+class Metric:
+    """Base class of metrics: a name, a help text and optional label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing value, one per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, help, label_names)
+        self._values: Dict[Labels, float] = {}
+        if not self.label_names:
+            self._values[()] = 0.0
+
+    def inc(self, amount: float = 1.0, labels: Sequence[str] = ()) -> None:
+        """Increase the counter of the given label values.
+
+        Raises:
+            ValueError: If the amount is negative or the labels do not match.
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = _labels(self.label_names, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [
+                Sample(self.name, labels, value)
+                for labels, value in self._values.items()
+            ]
+
+
+class Gauge(Metric):
+    """Value that can go up and down, one per label combination."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, help, label_names)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, labels: Sequence[str] = ()) -> None:
+        """Set the gauge of the given label values."""
+        key = _labels(self.label_names, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [
+                Sample(self.name, labels, value)
+                for labels, value in self._values.items()
+            ]
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: bucket counts (last one is +Inf), sum and count.
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, labels: Sequence[str] = ()) -> None:
+        """Record an observed value for the given label values."""
+        key = _labels(self.label_names, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> List[Sample]:
+        samples: List[Sample] = []
+        with self._lock:
+            for labels, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip((*self.buckets, math.inf), counts):
+                    cumulative += count
+                    samples.append(
+                        Sample(
+                            f"{self.name}_bucket",
+                            (*labels, ("le", _format_bound(bound))),
+                            cumulative,
+                        )
+                    )
+                samples.append(Sample(f"{self.name}_sum", labels, total[0]))
+                samples.append(Sample(f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(bound)
+
+
+MetricType = TypeVar("MetricType", bound=Metric)
+
+
+class Registry:
+    """Set of metrics exported together."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: MetricType) -> MetricType:
+        """Add a metric to the registry.
+
+        Raises:
+            ValueError: If a metric with the same name is already registered.
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def __iter__(self) -> Iterator[Metric]:
+        with self._lock:
+            return iter(list(self._metrics.values()))
@@ -0,0 +1,107 @@
+"""Metrics of batch runs, shared by the pipeline, the queue worker and the exporter."""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from metrics.registry import Counter, Gauge, Histogram, Registry
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module.
+    resource = None  # type: ignore[assignment]
+
+REGISTRY = Registry()
+"""Registry holding every metric of the process."""
+
+RUN_STARTED = time.time()
+"""Unix time when the process started collecting metrics."""
+
+WORKBOOKS_PROCESSED = REGISTRY.register(
+    Counter("vpr_workbooks_processed_total", "Workbooks processed and saved.")
+)
+SHEETS_PROCESSED = REGISTRY.register(
+    Counter("vpr_sheets_processed_total", "Worksheets with created analytic tables.")
+)
+SHEETS_UNCHANGED = REGISTRY.register(
+    Counter(
+        "vpr_sheets_unchanged_total",
+        "Worksheets left as they are because their fingerprint did not change.",
+    )
+)
+SCORE_ANOMALIES = REGISTRY.register(
+    Counter(
+        "vpr_score_anomalies_total",
+        "Score cells coerced or rejected by the cleaning stage.",
+        ("kind",),
+    )
+)
+BLOATED_SHEETS = REGISTRY.register(
+    Counter(
+        "vpr_bloated_sheets_total",
+        "Input worksheets storing far more rows or columns than their data.",
+    )
+)
+STUDENT_ROWS_PROCESSED = REGISTRY.register(
+    Counter("vpr_student_rows_processed_total", "Student rows read from worksheets.")
+)
+BYTES_READ = REGISTRY.register(
+    Counter("vpr_bytes_read_total", "Bytes of workbook files loaded.")
+)
+BYTES_WRITTEN = REGISTRY.register(
+    Counter("vpr_bytes_written_total", "Bytes of workbook files saved.")
+)
+FAILURES = REGISTRY.register(
+    Counter("vpr_failures_total", "Failed workbooks by error type.", ("error_type",))
+)
+STAGE_DURATION = REGISTRY.register(
+    Histogram("vpr_stage_duration_seconds", "Duration of pipeline stages.", ("stage",))
+)
+ROWS_PER_SECOND = REGISTRY.register(
+    Gauge("vpr_rows_per_second", "Student rows processed per second of the run.")
+)
+PEAK_RSS = REGISTRY.register(
+    Gauge("vpr_peak_rss_bytes", "Peak resident set size of the process.")
+)
+RUN_START = REGISTRY.register(
+    Gauge("vpr_run_start_timestamp_seconds", "Unix time when the run started.")
+)
+LAST_UPDATE = REGISTRY.register(
+    Gauge("vpr_last_update_timestamp_seconds", "Unix time of the last metrics export.")
+)
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """Observe the duration of a pipeline stage, also when it fails."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - started, (stage,))
+
+
+def record_failure(exc: BaseException) -> None:
+    """Count a failed workbook by the type of its error."""
+    FAILURES.inc(labels=(type(exc).__name__,))
+
+
+def peak_rss_bytes() -> float:
+    """Return the peak resident set size, 0 when the platform does not report it."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return float(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def update_derived() -> None:
+    """Refresh gauges computed from other metrics right before an export."""
+    now = time.time()
+    elapsed = now - RUN_STARTED
+    rows = STUDENT_ROWS_PROCESSED.samples()[0].value
+    ROWS_PER_SECOND.set(rows / elapsed if elapsed > 0 else 0.0)
+    PEAK_RSS.set(peak_rss_bytes())
+    RUN_START.set(RUN_STARTED)
+    LAST_UPDATE.set(now)
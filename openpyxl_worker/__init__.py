@@ -1,5 +1,10 @@
 from openpyxl_worker.analitic_table.analitic_table_creater import AnalyticTableCreates
 from openpyxl_worker.given_table.given_table_worker import GivenTableWorker
+from openpyxl_worker.statistics_table.statistics_table_creater import (
+    StatisticsTableCreates,
+)
+from openpyxl_worker.summary_table.district_table_worker import DistrictTableWorker
+from openpyxl_worker.summary_table.pivot_table_worker import PivotTableWorker
 from openpyxl_worker.summary_table.summary_table_worker import SummaryTableWorker
 from openpyxl_worker.table_worker import WorkbookContainer
 from openpyxl_worker.types import MatrixCells, WorksheetRanges
@@ -9,6 +14,9 @@ __all__ = [
     "GivenTableWorker",
     "AnalyticTableCreates",
     "MatrixCells",
+    "StatisticsTableCreates",
+    "PivotTableWorker",
+    "DistrictTableWorker",
     "SummaryTableWorker",
     "WorksheetRanges",
 ]
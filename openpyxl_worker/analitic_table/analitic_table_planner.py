@@ -0,0 +1,467 @@
+"""Pure planning stage of the analytic table.
+
+The planner turns positions of a given table into an AnalyticTablePlan without
+touching openpyxl, so plans of many worksheets can be built in worker processes
+and then applied to the workbook one after another. Worksheets of the same shape
+share a LayoutTemplate, which is planned once and filled with student rows.
+"""
+
+import hashlib
+import json
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+from openpyxl.utils import get_column_letter
+
+from openpyxl_worker.analitic_table.layout_cache import LayoutCache
+from openpyxl_worker.constants import (
+    LAYOUT_VERSION,
+    STATISTICS_TABLE_HEADERS,
+    THEME_TABLE_HEADERS,
+)
+from openpyxl_worker.types import (
+    AnalyticTablePlan,
+    BlockPositions,
+    CellPosition,
+    CellRect,
+    CellStyle,
+    ColorRule,
+    GivenTableData,
+    LayoutTemplate,
+    LinePositions,
+    PlannedCell,
+    PlannedRule,
+    PlannedSharedFormula,
+    PlannedStyle,
+    ScoreStatistics,
+    WorksheetRanges,
+)
+
+PlanRequest = Tuple[str, GivenTableData]
+
+
+def layout_key(data: GivenTableData) -> str:
+    """Return the key of the layout shared by worksheets of the same shape.
+
+    The key is a hash of the parsed task header row (task numbers, max points and
+    point columns), the student count and the last row of the point range.
+
+    Args:
+        data (GivenTableData): Positions and task values of the given table.
+
+    Returns:
+        str: Hex digest identifying the layout.
+    """
+    shape = json.dumps(
+        [
+            LAYOUT_VERSION,
+            data.task_numbers,
+            data.max_points,
+            data.point_columns,
+            len(data.student_rows),
+            data.last_row,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(shape.encode("utf-8")).hexdigest()
+
+
+def plan_analytic_table(name: str, data: GivenTableData) -> AnalyticTablePlan:
+    """Lay out the analytic table of a worksheet.
+
+    Args:
+        name (str): Worksheet name.
+        data (GivenTableData): Positions and task values of the given table.
+
+    Returns:
+        AnalyticTablePlan: Values, styles and color rules of the analytic table.
+    """
+    return fill_layout(plan_layout(data), name, data.student_rows)
+
+
+def fill_layout(
+    template: LayoutTemplate, name: str, student_rows: Tuple[int, ...]
+) -> AnalyticTablePlan:
+    """Turn a layout template into the plan of a worksheet.
+
+    Args:
+        template (LayoutTemplate): Layout of worksheets with this shape.
+        name (str): Worksheet name.
+        student_rows (Tuple[int, ...]): Rows of students present at the test.
+
+    Returns:
+        AnalyticTablePlan: Values, styles and color rules of the analytic table.
+    """
+    values = list(template.values)
+    for column, student_row in enumerate(
+        student_rows, start=template.first_student_column
+    ):
+        row_number = str(student_row)
+        values.extend(
+            PlannedCell(row, column, prefix + row_number)
+            for row, prefix in template.student_references
+        )
+    return AnalyticTablePlan(
+        replace(template.ranges, name=name),
+        tuple(values),
+        template.styles,
+        template.borders,
+        template.rules,
+        template.shared_formulas,
+    )
+
+
+def plan_layout(data: GivenTableData) -> LayoutTemplate:
+    """Lay out the analytic table of worksheets with the shape of the given table.
+
+    Args:
+        data (GivenTableData): Positions and task values of the given table.
+
+    Returns:
+        LayoutTemplate: Layout without references to the student rows.
+    """
+    student_count = len(data.student_rows)
+    task_count = len(data.task_numbers)
+    header_row = data.last_row + 2
+    first_task_row = header_row + 1
+    last_task_row = header_row + task_count
+    sum_row = last_task_row + 1
+    first_student_column = 4
+    last_student_column = first_student_column + student_count - 1
+    average_column = last_student_column + 1
+    percentage_column = average_column + 1
+    max_point_letter = get_column_letter(3)
+    average_letter = get_column_letter(average_column)
+
+    values: List[PlannedCell] = [
+        PlannedCell(header_row, column, header)
+        for column, header in enumerate(THEME_TABLE_HEADERS[:3], start=1)
+    ]
+    values.extend(
+        PlannedCell(header_row, column, header)
+        for column, header in enumerate(THEME_TABLE_HEADERS[3:], start=average_column)
+    )
+    student_references = (
+        (header_row, "=A"),
+        *[
+            (first_task_row + index, f"={get_column_letter(point_column)}")
+            for index, point_column in enumerate(data.point_columns)
+        ],
+    )
+
+    for index, (task_number, max_point) in enumerate(
+        zip(data.task_numbers, data.max_points)
+    ):
+        row = first_task_row + index
+        values.append(PlannedCell(row, 1, task_number))
+        values.append(PlannedCell(row, 3, max_point))
+
+    first_student_letter = get_column_letter(first_student_column)
+    last_student_letter = get_column_letter(last_student_column)
+    shared_formulas = (
+        PlannedSharedFormula(
+            CellRect(sum_row, first_student_column, sum_row, last_student_column),
+            f"=SUM({first_student_letter}{first_task_row}"
+            f":{first_student_letter}{last_task_row})",
+        ),
+        PlannedSharedFormula(
+            CellRect(
+                sum_row + 1, first_student_column, sum_row + 1, last_student_column
+            ),
+            f"={first_student_letter}{sum_row}/${max_point_letter}${sum_row}",
+        ),
+        PlannedSharedFormula(
+            CellRect(first_task_row, average_column, last_task_row, average_column),
+            f"=AVERAGE({first_student_letter}{first_task_row}"
+            f":{last_student_letter}{first_task_row})",
+        ),
+        PlannedSharedFormula(
+            CellRect(
+                first_task_row, percentage_column, last_task_row, percentage_column
+            ),
+            f"={average_letter}{first_task_row}/{max_point_letter}{first_task_row}",
+        ),
+    )
+
+    values.append(
+        PlannedCell(
+            sum_row,
+            3,
+            f"=SUM({max_point_letter}{first_task_row}:{max_point_letter}{last_task_row})",
+        )
+    )
+    values.append(
+        PlannedCell(
+            sum_row,
+            average_column,
+            f"=AVERAGE({average_letter}{first_task_row}:{average_letter}{last_task_row})",
+        )
+    )
+    values.append(
+        PlannedCell(
+            sum_row,
+            percentage_column,
+            f"=AVERAGE({first_student_letter}{sum_row}:{last_student_letter}{sum_row})"
+            f"/{max_point_letter}{sum_row}",
+        )
+    )
+
+    ranges = WorksheetRanges(
+        "",
+        LinePositions(header_row, 1, percentage_column, False),
+        LinePositions(first_task_row, 1, task_count, True),
+        BlockPositions(first_task_row, first_student_column, task_count, student_count),
+        LinePositions(first_task_row, average_column, task_count, True),
+        LinePositions(first_task_row, percentage_column, task_count, True),
+        LinePositions(first_task_row, 3, task_count, True),
+        CellPosition(sum_row, average_column),
+        CellPosition(sum_row, percentage_column),
+        LinePositions(sum_row + 1, first_student_column, student_count, False),
+        LinePositions(first_task_row, 2, task_count, True),
+    )
+    styles = (
+        PlannedStyle(
+            CellStyle.TABLE_HEADER,
+            CellRect(header_row, 1, header_row, percentage_column),
+        ),
+        PlannedStyle(CellStyle.NUMBER, CellRect(first_task_row, 1, last_task_row, 1)),
+        PlannedStyle(
+            CellStyle.POINT,
+            CellRect(
+                first_task_row, first_student_column, last_task_row, last_student_column
+            ),
+        ),
+        PlannedStyle(
+            CellStyle.AVERAGE,
+            CellRect(first_task_row, average_column, sum_row, average_column),
+        ),
+        PlannedStyle(
+            CellStyle.PERCENTAGE,
+            CellRect(first_task_row, percentage_column, sum_row, percentage_column),
+        ),
+        PlannedStyle(
+            CellStyle.PERCENTAGE,
+            CellRect(
+                sum_row + 1, first_student_column, sum_row + 1, last_student_column
+            ),
+        ),
+    )
+    rules = (
+        PlannedRule(
+            ColorRule.PERCENTAGE,
+            CellRect(
+                sum_row + 1, first_student_column, sum_row + 1, last_student_column
+            ),
+        ),
+        PlannedRule(
+            ColorRule.PERCENTAGE,
+            CellRect(first_task_row, percentage_column, sum_row, percentage_column),
+        ),
+        *[
+            PlannedRule(
+                ColorRule.POINT,
+                CellRect(
+                    first_task_row + index,
+                    first_student_column,
+                    first_task_row + index,
+                    last_student_column,
+                ),
+                max_point,
+            )
+            for index, max_point in enumerate(data.max_points)
+        ],
+    )
+    return LayoutTemplate(
+        ranges,
+        tuple(values),
+        student_references,
+        first_student_column,
+        styles,
+        CellRect(header_row, 1, sum_row + 1, percentage_column),
+        rules,
+        shared_formulas,
+    )
+
+
+def plan_aggregate_table(
+    name: str, data: GivenTableData, statistics: ScoreStatistics
+) -> AnalyticTablePlan:
+    """Lay out the aggregate analytic table of a worksheet.
+
+    The aggregate layout has one row per task with static values: max score,
+    average score, percentage of completion and the number of students for every
+    score. Its size depends on the number of tasks only, not on the students.
+
+    Args:
+        name (str): Worksheet name.
+        data (GivenTableData): Positions and task values of the given table.
+        statistics (ScoreStatistics): Statistics computed from the scores.
+
+    Returns:
+        AnalyticTablePlan: Values, styles and color rules of the analytic table.
+    """
+    task_count = len(data.task_numbers)
+    header_row = data.last_row + 2
+    first_task_row = header_row + 1
+    last_task_row = header_row + task_count
+    sum_row = last_task_row + 1
+    average_column = 4
+    percentage_column = 5
+    first_count_column = 6
+    width = max((len(counts) for counts in statistics.histograms), default=0)
+    last_column = max(percentage_column, first_count_column + width - 1)
+
+    headers = (
+        *THEME_TABLE_HEADERS,
+        *[f"{STATISTICS_TABLE_HEADERS.points}: {point}" for point in range(width)],
+    )
+    values: List[PlannedCell] = [
+        PlannedCell(header_row, column, header)
+        for column, header in enumerate(headers, start=1)
+    ]
+    for index, (task_number, max_point, average, counts) in enumerate(
+        zip(
+            data.task_numbers,
+            data.max_points,
+            statistics.averages,
+            statistics.histograms,
+        )
+    ):
+        row = first_task_row + index
+        values.append(PlannedCell(row, 1, task_number))
+        values.append(PlannedCell(row, 3, max_point))
+        values.append(PlannedCell(row, average_column, _static_number(average)))
+        values.append(
+            PlannedCell(
+                row,
+                percentage_column,
+                _static_number(average / max_point) if max_point else None,
+            )
+        )
+        values.extend(
+            PlannedCell(row, column, count)
+            for column, count in enumerate(counts, start=first_count_column)
+        )
+
+    max_total = sum(data.max_points)
+    averages = [value for value in statistics.averages if not math.isnan(value)]
+    totals = statistics.student_totals
+    values.append(PlannedCell(sum_row, 3, max_total))
+    values.append(
+        PlannedCell(
+            sum_row,
+            average_column,
+            sum(averages) / len(averages) if averages else None,
+        )
+    )
+    values.append(
+        PlannedCell(
+            sum_row,
+            percentage_column,
+            sum(totals) / len(totals) / max_total if totals and max_total else None,
+        )
+    )
+
+    ranges = WorksheetRanges(
+        name,
+        LinePositions(header_row, 1, len(headers), False),
+        LinePositions(first_task_row, 1, task_count, True),
+        BlockPositions(first_task_row, first_count_column, task_count, 0),
+        LinePositions(first_task_row, average_column, task_count, True),
+        LinePositions(first_task_row, percentage_column, task_count, True),
+        LinePositions(first_task_row, 3, task_count, True),
+        CellPosition(sum_row, average_column),
+        CellPosition(sum_row, percentage_column),
+        LinePositions(sum_row + 1, average_column, 0, False),
+        LinePositions(first_task_row, 2, task_count, True),
+    )
+    styles = (
+        PlannedStyle(
+            CellStyle.TABLE_HEADER, CellRect(header_row, 1, header_row, last_column)
+        ),
+        PlannedStyle(CellStyle.NUMBER, CellRect(first_task_row, 1, last_task_row, 1)),
+        PlannedStyle(
+            CellStyle.AVERAGE,
+            CellRect(first_task_row, average_column, sum_row, average_column),
+        ),
+        PlannedStyle(
+            CellStyle.PERCENTAGE,
+            CellRect(first_task_row, percentage_column, sum_row, percentage_column),
+        ),
+        PlannedStyle(
+            CellStyle.POINT,
+            CellRect(first_task_row, first_count_column, last_task_row, last_column),
+        ),
+    )
+    rules = (
+        PlannedRule(
+            ColorRule.PERCENTAGE,
+            CellRect(first_task_row, percentage_column, sum_row, percentage_column),
+        ),
+    )
+    return AnalyticTablePlan(
+        ranges,
+        tuple(values),
+        styles,
+        CellRect(header_row, 1, sum_row, last_column),
+        rules,
+    )
+
+
+def _static_number(value: float) -> Optional[float]:
+    """Return None for NaN so that the cell stays empty."""
+    return None if math.isnan(value) else value
+
+
+def plan_analytic_tables(
+    requests: List[PlanRequest],
+    workers: int = 1,
+    cache: Optional[LayoutCache] = None,
+) -> List[AnalyticTablePlan]:
+    """Lay out analytic tables of several worksheets, in worker processes if asked.
+
+    Every distinct worksheet shape is laid out once: layouts are taken from the
+    cache when possible, the missing ones are planned (in worker processes when
+    asked) and stored in the cache, and each worksheet only fills its template.
+
+    Args:
+        requests (List[PlanRequest]): Worksheet names with their given table data.
+        workers (int): Number of worker processes; 1 plans in the current process.
+        cache (Optional[LayoutCache]): Cache of layouts kept between workbooks.
+
+    Returns:
+        List[AnalyticTablePlan]: Plans in the order of the requests.
+    """
+    keys = [layout_key(data) for _, data in requests]
+    templates: Dict[str, LayoutTemplate] = {}
+    missing: Dict[str, GivenTableData] = {}
+    for key, (_, data) in zip(keys, requests):
+        if key in templates or key in missing:
+            continue
+        template = cache.get(key) if cache else None
+        if template is None:
+            missing[key] = data
+        else:
+            templates[key] = template
+
+    if workers <= 1 or len(missing) <= 1:
+        built = [plan_layout(data) for data in missing.values()]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as executor:
+            built = list(executor.map(plan_layout, missing.values()))
+        logging.info("Planned %d layouts on %d processes.", len(built), workers)
+
+    for key, template in zip(missing, built):
+        templates[key] = template
+        if cache:
+            cache.put(key, template)
+    logging.info(
+        "Laid out %d analytic tables with %d new layouts.", len(requests), len(built)
+    )
+    return [
+        fill_layout(templates[key], name, data.student_rows)
+        for key, (name, data) in zip(keys, requests)
+    ]
@@ -0,0 +1,188 @@
+"""Cache of analytic table layouts in memory and on disk.
+
+Almost every school file is made from the same form, so worksheets of the same
+shape get the same layout. The cache keeps compiled layouts by layout key in an
+LRU dictionary and, when a directory is given, as JSON files shared by runs and
+processes.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from atomic_file import atomic_write
+from openpyxl_worker.constants import LAYOUT_CACHE_SIZE
+from openpyxl_worker.types import (
+    BlockPositions,
+    CellPosition,
+    CellRect,
+    CellStyle,
+    ColorRule,
+    LayoutTemplate,
+    LinePositions,
+    PlannedCell,
+    PlannedRule,
+    PlannedSharedFormula,
+    PlannedStyle,
+    WorksheetRanges,
+)
+
+Position = Union[CellPosition, LinePositions, BlockPositions]
+
+_POSITION_TYPES = {
+    cls.__name__: cls for cls in (CellPosition, LinePositions, BlockPositions)
+}
+
+
+class LayoutCache:
+    """Thread-safe cache of layout templates by layout key."""
+
+    def __init__(
+        self, directory: Optional[Path] = None, size: int = LAYOUT_CACHE_SIZE
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory (Optional[Path]): Directory of cached layout files; None keeps
+                layouts in memory only.
+            size (int): Number of layouts kept in memory.
+        """
+        self.directory = directory
+        self.size = size
+        self._templates: "OrderedDict[str, LayoutTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[LayoutTemplate]:
+        """Return the cached layout, loading it from disk when it is not in memory.
+
+        Args:
+            key (str): Layout key.
+
+        Returns:
+            Optional[LayoutTemplate]: The layout, None if it is not cached.
+        """
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                return template
+
+        template = self._load(key)
+        if template is not None:
+            self._remember(key, template)
+        return template
+
+    def put(self, key: str, template: LayoutTemplate) -> None:
+        """Store a layout in memory and on disk.
+
+        Args:
+            key (str): Layout key.
+            template (LayoutTemplate): The compiled layout.
+        """
+        self._remember(key, template)
+        self._store(key, template)
+
+    def _remember(self, key: str, template: LayoutTemplate) -> None:
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.size:
+                self._templates.popitem(last=False)
+
+    def _path(self, key: str) -> Optional[Path]:
+        return self.directory / f"{key}.json" if self.directory else None
+
+    def _load(self, key: str) -> Optional[LayoutTemplate]:
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                template = template_from_json(json.load(file))
+        except (OSError, ValueError, KeyError, TypeError):
+            logging.warning("Ignoring unreadable cached layout %s", path)
+            return None
+        logging.info("Loaded cached layout %s", path)
+        return template
+
+    def _store(self, key: str, template: LayoutTemplate) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            # Replace the file atomically so concurrent readers never see a
+            # partial layout.
+            with atomic_write(path) as file:
+                json.dump(template_to_json(template), file, ensure_ascii=False)
+        except OSError:
+            logging.exception("Failed to write cached layout %s", path)
+            return
+        logging.info("Cached layout %s", path)
+
+
+def template_to_json(template: LayoutTemplate) -> Dict[str, Any]:
+    """Convert a layout template into JSON-compatible values."""
+    return {
+        "ranges": {
+            field.name: _position_to_json(getattr(template.ranges, field.name))
+            for field in fields(WorksheetRanges)
+            if field.name != "name"
+        },
+        "values": [list(cell) for cell in template.values],
+        "student_references": [list(item) for item in template.student_references],
+        "first_student_column": template.first_student_column,
+        "styles": [[style.style, *style.rect] for style in template.styles],
+        "borders": list(template.borders),
+        "rules": [[rule.kind, *rule.rect, rule.max_point] for rule in template.rules],
+        "shared_formulas": [
+            [*shared.rect, shared.formula] for shared in template.shared_formulas
+        ],
+    }
+
+
+def template_from_json(data: Dict[str, Any]) -> LayoutTemplate:
+    """Restore a layout template converted with template_to_json.
+
+    Raises:
+        KeyError: If a field or position type is missing.
+        ValueError: If a style or color rule is unknown.
+    """
+    ranges = WorksheetRanges(
+        "",
+        **{name: _position_from_json(value) for name, value in data["ranges"].items()},
+    )
+    return LayoutTemplate(
+        ranges,
+        tuple(PlannedCell(*cell) for cell in data["values"]),
+        tuple((row, prefix) for row, prefix in data["student_references"]),
+        data["first_student_column"],
+        tuple(
+            PlannedStyle(CellStyle(style), CellRect(*rect))
+            for style, *rect in data["styles"]
+        ),
+        CellRect(*data["borders"]),
+        tuple(
+            PlannedRule(ColorRule(kind), CellRect(*rect), max_point)
+            for kind, *rect, max_point in data["rules"]
+        ),
+        tuple(
+            PlannedSharedFormula(CellRect(*rect), formula)
+            for *rect, formula in data["shared_formulas"]
+        ),
+    )
+
+
+def _position_to_json(position: Position) -> list:
+    return [
+        type(position).__name__,
+        *[getattr(position, slot) for slot in type(position).__slots__],
+    ]
+
+
+def _position_from_json(value: list) -> Position:
+    name, *args = value
+    return _POSITION_TYPES[name](*args)
@@ -0,0 +1,58 @@
+"""Excel shared formulas for openpyxl worksheets.
+
+openpyxl writes every formula as its own string. A shared formula is stored
+once in the top left cell of its range; the other cells only point to it by
+index, which keeps the worksheet XML small and saves Excel from parsing the
+same formula again for every cell.
+"""
+
+from typing import Iterator, Optional, Tuple
+
+from openpyxl.worksheet.formula import ArrayFormula
+from openpyxl.worksheet.worksheet import Worksheet
+
+from openpyxl_worker.types import CellRect
+
+
+class SharedFormula(ArrayFormula):
+    """Cell value written as ``<f t="shared">``.
+
+    openpyxl serializes array formulas from their attributes and text, so the
+    shared formula reuses that path: the master cell has the range and the
+    formula text, the other cells only the shared index.
+    """
+
+    t = "shared"
+
+    def __init__(
+        self, si: int, ref: Optional[str] = None, text: Optional[str] = None
+    ) -> None:
+        super().__init__(ref, text)
+        self.si = si
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        yield "t", self.t
+        if self.ref:
+            yield "ref", self.ref
+        yield "si", str(self.si)
+
+
+def write_shared_formula(ws: Worksheet, rect: CellRect, formula: str, si: int) -> None:
+    """Fill a rectangle of a worksheet with a shared formula.
+
+    Args:
+        ws (Worksheet): The worksheet to write to.
+        rect (CellRect): Cells of the formula; the top left cell holds its text.
+        formula (str): Formula of the top left cell, starting with "=".
+        si (int): Shared formula index, unique within the worksheet.
+    """
+    if rect.max_row < rect.min_row or rect.max_column < rect.min_column:
+        return
+    if (rect.min_row, rect.min_column) == (rect.max_row, rect.max_column):
+        ws.cell(rect.min_row, rect.min_column, formula)
+        return
+    dependent = SharedFormula(si)
+    for row in range(rect.min_row, rect.max_row + 1):
+        for column in range(rect.min_column, rect.max_column + 1):
+            ws.cell(row, column).value = dependent
+    ws.cell(rect.min_row, rect.min_column).value = SharedFormula(si, rect.ref, formula)
@@ -3,9 +3,27 @@
 This module defines reusable constants for table headers, cell alignments, colors, and borders used in Excel workbook processing.
 """
 
+from typing import Dict, Tuple
+
 from openpyxl.styles.borders import BORDER_THIN, Border, Side
 
-from openpyxl_worker.types import AlignmentCell, ResultTableHeaders, TableHeader
+from openpyxl_worker.types import (
+    AlignmentCell,
+    CellStyle,
+    Compression,
+    DashboardLabels,
+    DistrictTableHeaders,
+    FeedbackLabels,
+    FeedbackStyle,
+    FeedbackTableHeaders,
+    FormatArgs,
+    GradeTableHeaders,
+    NumberFormatCell,
+    PivotTableHeaders,
+    ResultTableHeaders,
+    StatisticsTableHeaders,
+    TableHeader,
+)
 
 THEME_TABLE_HEADERS: TableHeader = TableHeader(
     "№",
@@ -24,12 +42,46 @@ THEME_RESULT_TABLE_HEADERS: ResultTableHeaders = ResultTableHeaders(
 )
 """Default headers for result tables by theme."""
 
+STATISTICS_TABLE_HEADERS: StatisticsTableHeaders = StatisticsTableHeaders(
+    "№",
+    "Медиана",
+    "Нижний квартиль",
+    "Верхний квартиль",
+    "Баллов",
+)
+"""Default headers for score statistics tables."""
+
+GRADE_TABLE_HEADERS: GradeTableHeaders = GradeTableHeaders(
+    "Лист",
+    "Медиана суммы баллов",
+    "Отметка",
+    "Учеников",
+)
+"""Default headers for grade distribution tables."""
+
+VARIANT_TABLE_HEADER: str = "Вариант"
+"""Header prefix of the per-variant completion columns."""
+
+GRADES: Tuple[int, ...] = (2, 3, 4, 5)
+"""Official grade bands, lowest first."""
+
 LEFT_TOP_ALIGN: AlignmentCell = AlignmentCell("left", "top")
 """Cell alignment: left horizontally, top vertically."""
 
 RIGHT_TOP_ALIGN: AlignmentCell = AlignmentCell("right", "top")
 """Cell alignment: right horizontally, top vertically."""
 
+CELL_STYLES: Dict[CellStyle, FormatArgs] = {
+    CellStyle.TABLE_HEADER: FormatArgs(LEFT_TOP_ALIGN, wrap_text=True),
+    CellStyle.NUMBER: FormatArgs(LEFT_TOP_ALIGN),
+    CellStyle.POINT: FormatArgs(RIGHT_TOP_ALIGN),
+    CellStyle.AVERAGE: FormatArgs(RIGHT_TOP_ALIGN, NumberFormatCell.FORMAT_NUMBER_00),
+    CellStyle.PERCENTAGE: FormatArgs(
+        RIGHT_TOP_ALIGN, NumberFormatCell.FORMAT_PERCENTAGE_00
+    ),
+}
+"""Formatting arguments for every style identifier used in analytic table plans."""
+
 LIME_COLOR: str = "81d41a"
 """Hex color code for lime highlight."""
 
@@ -49,3 +101,109 @@ THIN_BORDER: Border = Border(
 
 SUMMARY_TABLE_TITLE: str = "Общие_результаты"
 """Default title for summary tables."""
+
+PIVOT_TABLE_TITLE: str = "Сравнение_классов"
+"""Default title for task × class pivot tables."""
+
+PIVOT_TABLE_HEADERS: PivotTableHeaders = PivotTableHeaders(
+    "Номер задания",
+    "Минимум",
+    "Максимум",
+    "Разброс",
+)
+"""Default headers for task × class pivot tables; class columns are named after worksheets."""
+
+DISTRICT_TABLE_TITLE: str = "Процентили_района"
+"""Default title for district percentile rank tables."""
+
+DISTRICT_TABLE_HEADERS: DistrictTableHeaders = DistrictTableHeaders(
+    "Класс",
+    "Ученик",
+    "Первичный балл",
+    "Учеников",
+    "Медиана балла",
+    "Процентиль в районе",
+)
+"""Default headers for district percentile rank tables."""
+
+COMPRESSION_LEVELS: Dict[Compression, int] = {
+    Compression.STORE: 0,
+    Compression.FAST: 1,
+    Compression.DEFAULT: 6,
+    Compression.BEST: 9,
+}
+"""Zlib compression level for each compression preset (0 means stored)."""
+
+LAYOUT_VERSION = 2
+"""Version of the analytic table layout; cached layouts of other versions are ignored."""
+
+LAYOUT_CACHE_SIZE = 64
+"""Number of layouts kept in memory by a layout cache."""
+
+FEEDBACK_TABLE_HEADERS: FeedbackTableHeaders = FeedbackTableHeaders(
+    "№",
+    "Проверяемые требования",
+    "Максимальный балл",
+    "Балл ученика",
+    "Выполнение ученика",
+    "Выполнение класса",
+)
+"""Default headers for the task table of feedback reports."""
+
+FEEDBACK_LABELS: FeedbackLabels = FeedbackLabels(
+    "Ученик",
+    "Класс",
+    "Сумма баллов",
+    "Максимальный балл",
+    "Отметка",
+)
+"""Labels of the title rows of feedback reports."""
+
+DASHBOARD_LABELS: DashboardLabels = DashboardLabels(
+    "Классы",
+    "Задания",
+    "Все классы",
+    "Процент выполнения",
+    "Результаты по школам",
+)
+"""Section titles and headers of HTML dashboards."""
+
+DASHBOARD_BAR_WIDTH = 100
+"""Width in pixels of the completion bars of HTML dashboards."""
+
+FEEDBACK_SHEET_TITLE = "Отзыв"
+"""Title of the worksheet in feedback reports."""
+
+FEEDBACK_COLUMN_WIDTHS: Tuple[float, ...] = (8, 50, 12, 12, 12, 12)
+"""Widths of the feedback report columns A to F."""
+
+FEEDBACK_STYLES: Dict[FeedbackStyle, FormatArgs] = {
+    FeedbackStyle.LABEL: FormatArgs(LEFT_TOP_ALIGN),
+    FeedbackStyle.VALUE: FormatArgs(LEFT_TOP_ALIGN),
+    FeedbackStyle.TABLE_HEADER: FormatArgs(LEFT_TOP_ALIGN, wrap_text=True),
+    FeedbackStyle.NUMBER: FormatArgs(LEFT_TOP_ALIGN),
+    FeedbackStyle.TEXT: FormatArgs(LEFT_TOP_ALIGN, wrap_text=True),
+    FeedbackStyle.POINT: FormatArgs(RIGHT_TOP_ALIGN),
+    FeedbackStyle.PERCENTAGE: FormatArgs(
+        RIGHT_TOP_ALIGN, NumberFormatCell.FORMAT_PERCENTAGE_00
+    ),
+}
+"""Formatting arguments of every feedback report cell style."""
+
+FINGERPRINT_NAME = "_vpr_fingerprint"
+"""Hidden worksheet-scoped defined name holding the fingerprint of the last run."""
+
+FINGERPRINT_VERSION = 2
+"""Version of worksheet fingerprints; a new version rebuilds every worksheet once."""
+
+USED_RANGE_SLACK_ROWS = 1000
+"""Stored rows past the last data row above which a worksheet counts as bloated."""
+
+USED_RANGE_SLACK_COLUMNS = 100
+"""Stored columns past the last data column above which a worksheet counts as bloated."""
+
+SCORE_CACHE_VERSION = 2
+"""Version of score cache entries; entries of other versions are not found."""
+
+QUANTILE_SKETCH_K = 200
+"""Top compactor capacity of district quantile sketches (rank error about 1%)."""
@@ -0,0 +1,264 @@
+"""Static HTML dashboards of processed workbooks.
+
+A dashboard shows the completion of every class and of every task by class,
+the same aggregates as the summary and pivot sheets, as one self-contained page
+with inline SVG bars coloured by the brick, yellow and lime scale of the
+workbook. Pages are rendered from templates compiled once at import and
+written to the file row by row, so no page is ever held in memory as a whole.
+"""
+
+import logging
+import math
+from html import escape
+from pathlib import Path
+from string import Template
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from atomic_file import atomic_write
+from openpyxl_worker.constants import (
+    BRICK_COLOR,
+    DASHBOARD_BAR_WIDTH,
+    DASHBOARD_LABELS,
+    GRADE_TABLE_HEADERS,
+    GRADES,
+    LIME_COLOR,
+    PIVOT_TABLE_HEADERS,
+    THEME_TABLE_HEADERS,
+    YELLOW_COLOR,
+)
+from openpyxl_worker.statistics_table.score_statistics import answered_totals
+from openpyxl_worker.types import SheetScores
+
+INDEX_NAME = "index.html"
+"""File name of the page linking the dashboards of a directory."""
+
+_PAGE_START = Template("""<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+body{font-family:sans-serif;margin:1.5em;color:#222}
+table{border-collapse:collapse;margin-bottom:2em}
+th,td{border:1px solid #999;padding:2px 6px;vertical-align:top}
+th{background:#eee;text-align:left}
+td.n{text-align:right;white-space:nowrap}
+svg{vertical-align:middle;margin-right:4px}
+</style>
+</head>
+<body>
+<h1>$title</h1>
+""")
+_PAGE_END = "</body>\n</html>\n"
+_SECTION = Template("<h2>$title</h2>\n<table>\n<tr>$headers</tr>\n")
+_SECTION_END = "</table>\n"
+_HEADER = Template("<th>$text</th>")
+_CELL = Template("<td>$text</td>")
+_NUMBER = Template('<td class="n">$text</td>')
+_BAR = Template(
+    '<td class="n"><svg width="$full" height="12">'
+    '<rect width="$full" height="12" fill="#eeeeee"/>'
+    '<rect width="$width" height="12" fill="#$color"/></svg>$text</td>'
+)
+_ROW = Template("<tr>$cells</tr>\n")
+_LINK = Template('<li><a href="$href">$text</a></li>\n')
+
+_SCALE = tuple(
+    tuple(int(color[index : index + 2], 16) for index in (0, 2, 4))
+    for color in (BRICK_COLOR, YELLOW_COLOR, LIME_COLOR)
+)
+
+
+def scale_color(share: float) -> str:
+    """Return the colour of a completion share on the brick-yellow-lime scale.
+
+    Args:
+        share (float): Completion from 0 to 1; values outside are clipped.
+
+    Returns:
+        str: Hex colour without the leading "#".
+    """
+    position = min(max(share, 0.0), 1.0) * (len(_SCALE) - 1)
+    index = min(int(position), len(_SCALE) - 2)
+    low, high = _SCALE[index], _SCALE[index + 1]
+    weight = position - index
+    return "".join(
+        f"{round(start + (end - start) * weight):02x}" for start, end in zip(low, high)
+    )
+
+
+def write_dashboard(sheets: List[SheetScores], path: Path, title: str) -> None:
+    """Write the dashboard of a workbook.
+
+    The page is written to a temporary file and moved into place, so an open
+    dashboard is never replaced by a partial page.
+
+    Args:
+        sheets (List[SheetScores]): Scores of the processed worksheets.
+        path (Path): HTML file of the dashboard.
+        title (str): Title of the page.
+    """
+    with atomic_write(path) as file:
+        file.writelines(render_dashboard(sheets, title))
+    logging.info("Wrote dashboard of %d worksheets to %s", len(sheets), path)
+
+
+def render_dashboard(sheets: List[SheetScores], title: str) -> Iterator[str]:
+    """Yield the pieces of the dashboard page of a workbook.
+
+    Args:
+        sheets (List[SheetScores]): Scores of the processed worksheets.
+        title (str): Title of the page.
+
+    Yields:
+        str: Consecutive pieces of the HTML page.
+    """
+    yield _PAGE_START.substitute(title=escape(title))
+    yield from _class_section(sheets)
+    yield from _task_section(sheets)
+    yield _PAGE_END
+
+
+def _class_section(sheets: List[SheetScores]) -> Iterator[str]:
+    """Yield the table of the completion, median and grades of every class."""
+    with_grades = any(sheet.statistics.grade_counts for sheet in sheets)
+    headers = [
+        GRADE_TABLE_HEADERS.sheet_name,
+        GRADE_TABLE_HEADERS.students,
+        DASHBOARD_LABELS.completion,
+        GRADE_TABLE_HEADERS.median_total,
+    ]
+    if with_grades:
+        headers.extend(f"{GRADE_TABLE_HEADERS.grade} {grade}" for grade in GRADES)
+    yield _section(DASHBOARD_LABELS.classes, headers)
+
+    for sheet in sheets:
+        scores = _score_matrix(sheet)
+        totals = answered_totals(scores, len(sheet.max_points))
+        max_total = sum(sheet.max_points)
+        # Averaged over every student row, absent ones included, like the
+        # percentage of the analytic table.
+        completion = (
+            float(np.nansum(scores, axis=1).mean()) / max_total
+            if scores.shape[0] and max_total
+            else None
+        )
+        cells = [
+            _CELL.substitute(text=escape(sheet.name)),
+            _NUMBER.substitute(text=totals.size),
+            _bar(completion),
+            _NUMBER.substitute(text=_number(sheet.statistics.median_total)),
+        ]
+        if with_grades:
+            counts = sheet.statistics.grade_counts or (None,) * len(GRADES)
+            cells.extend(
+                _NUMBER.substitute(text="" if count is None else count)
+                for count in counts
+            )
+        yield _ROW.substitute(cells="".join(cells))
+    yield _SECTION_END
+
+
+def _task_section(sheets: List[SheetScores]) -> Iterator[str]:
+    """Yield the table of the completion of every task by class and overall."""
+    # Task number -> requirement text and score sum and max point sum over
+    # answered cells of all classes.
+    tasks: Dict[str, Tuple[str, float, float]] = {}
+    completion: List[Dict[str, Optional[float]]] = []
+    for sheet in sheets:
+        scores = _score_matrix(sheet)
+        answered = ~np.isnan(scores)
+        sums = np.nansum(scores, axis=0)
+        counts = answered.sum(axis=0)
+        sheet_completion: Dict[str, Optional[float]] = {}
+        for index, (number, max_point) in enumerate(
+            zip(sheet.statistics.task_numbers, sheet.max_points)
+        ):
+            task = str(number).strip()
+            description = (
+                sheet.task_descriptions[index]
+                if index < len(sheet.task_descriptions)
+                else ""
+            )
+            text, score_sum, max_sum = tasks.get(task, ("", 0.0, 0.0))
+            tasks[task] = (
+                text or description,
+                score_sum + float(sums[index]),
+                max_sum + float(counts[index]) * max_point,
+            )
+            average = sheet.statistics.averages[index]
+            sheet_completion[task] = (
+                average / max_point if max_point and not math.isnan(average) else None
+            )
+        completion.append(sheet_completion)
+
+    yield _section(
+        DASHBOARD_LABELS.tasks,
+        [
+            PIVOT_TABLE_HEADERS.task_number,
+            THEME_TABLE_HEADERS[1],
+            *[sheet.name for sheet in sheets],
+            DASHBOARD_LABELS.all_classes,
+        ],
+    )
+    for task, (text, score_sum, max_sum) in tasks.items():
+        cells = [
+            _CELL.substitute(text=escape(task)),
+            _CELL.substitute(text=escape(text)),
+            *[_bar(sheet_completion.get(task)) for sheet_completion in completion],
+            _bar(score_sum / max_sum if max_sum else None),
+        ]
+        yield _ROW.substitute(cells="".join(cells))
+    yield _SECTION_END
+
+
+def write_dashboard_index(directory: Path) -> None:
+    """Write the page linking every dashboard of a directory.
+
+    Args:
+        directory (Path): Directory of the dashboards.
+    """
+    pages = sorted(path for path in directory.glob("*.html") if path.name != INDEX_NAME)
+    with atomic_write(directory / INDEX_NAME) as file:
+        file.write(_PAGE_START.substitute(title=escape(DASHBOARD_LABELS.index)))
+        file.write("<ul>\n")
+        file.writelines(
+            _LINK.substitute(href=escape(page.name), text=escape(page.stem))
+            for page in pages
+        )
+        file.write("</ul>\n")
+        file.write(_PAGE_END)
+
+
+def _section(title: str, headers: List[str]) -> str:
+    return _SECTION.substitute(
+        title=escape(title),
+        headers="".join(_HEADER.substitute(text=escape(header)) for header in headers),
+    )
+
+
+def _bar(share: Optional[float]) -> str:
+    """Return a cell with a completion bar, empty when there is no completion."""
+    if share is None or math.isnan(share):
+        return _CELL.substitute(text="")
+    clipped = min(max(share, 0.0), 1.0)
+    return _BAR.substitute(
+        full=DASHBOARD_BAR_WIDTH,
+        width=round(clipped * DASHBOARD_BAR_WIDTH, 1),
+        color=scale_color(share),
+        text=_number(share * 100) + "%",
+    )
+
+
+def _number(value: float) -> str:
+    """Format a number with two decimals and a decimal comma, empty for NaN."""
+    if math.isnan(value):
+        return ""
+    return f"{value:.2f}".replace(".", ",")
+
+
+def _score_matrix(sheet: SheetScores) -> np.ndarray:
+    shape = (len(sheet.students), len(sheet.max_points))
+    return np.array(sheet.scores, dtype=np.float64).reshape(shape)
@@ -0,0 +1,191 @@
+"""Precompiled xlsx package of per-student feedback reports.
+
+A template workbook is built with openpyxl once and serialized into package
+parts. Every part except the worksheet is deflated once and reused; for each
+report only the worksheet XML is rendered from string pieces, compressed and
+written together with the shared parts by the raw zip writer.
+"""
+
+import math
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from xml.etree.ElementTree import fromstring
+from xml.sax.saxutils import escape
+from zipfile import ZIP_STORED
+
+from openpyxl import Workbook
+from openpyxl.formatting.rule import Rule
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+from openpyxl_worker.constants import (
+    COMPRESSION_LEVELS,
+    FEEDBACK_COLUMN_WIDTHS,
+    FEEDBACK_SHEET_TITLE,
+    FEEDBACK_STYLES,
+)
+from openpyxl_worker.summary_table.formatting import (
+    format_point_cells,
+    generate_percentage_color_rule,
+    set_borders,
+)
+from openpyxl_worker.types import Compression, FeedbackStyle
+from openpyxl_worker.workbook_saver import (
+    SaveTarget,
+    ZipPart,
+    compress_part,
+    serialize_parts,
+    write_archive,
+)
+
+SHEET_PART = "xl/worksheets/sheet1.xml"
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_DIMENSION = re.compile(r'<dimension ref="[^"]*"\s*/>')
+_SHEET_DATA = re.compile(r"<sheetData>.*</sheetData>|<sheetData\s*/>", re.DOTALL)
+_PLACEHOLDER_RANGE = "Z1:Z2"
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+ReportRow = Tuple[Tuple[FeedbackStyle, Any], ...]
+
+
+class FeedbackTemplate:
+    """Renders feedback reports into xlsx files from a precompiled package."""
+
+    def __init__(self, compression: Compression = Compression.DEFAULT) -> None:
+        """Build the template workbook and compress its shared parts.
+
+        Args:
+            compression (Compression): Zip compression preset of the reports.
+        """
+        self.level = COMPRESSION_LEVELS[compression]
+        parts = serialize_parts(_template_workbook())
+        self._sheet_index = next(
+            index for index, part in enumerate(parts) if part.name == SHEET_PART
+        )
+        sheet_part = parts[self._sheet_index]
+        self._sheet_date_time = sheet_part.date_time
+        sheet_xml = sheet_part.data.decode("utf-8")
+        self.styles = _read_styles(sheet_xml)
+
+        match = _SHEET_DATA.search(sheet_xml)
+        if match is None:
+            raise ValueError("Template worksheet has no sheetData")
+        self._prefix = _DIMENSION.sub(
+            '<dimension ref="{dimension}"/>', sheet_xml[: match.start()]
+        )
+        self._suffix = sheet_xml[match.end() :]
+        self._parts = [
+            part if index == self._sheet_index else self._compress(part)
+            for index, part in enumerate(parts)
+        ]
+
+    def _compress(self, part: ZipPart) -> ZipPart:
+        return compress_part(part, self.level) if self.level else part
+
+    def render(self, rows: List[ReportRow], color_range: Optional[str]) -> bytes:
+        """Render the worksheet XML of a report.
+
+        Args:
+            rows (List[ReportRow]): Styled values of every row; an empty row is skipped.
+            color_range (Optional[str]): Range of the percentage color scale.
+
+        Returns:
+            bytes: The worksheet part.
+        """
+        xml_rows: List[str] = []
+        width = 1
+        for row_index, row in enumerate(rows, start=1):
+            if not row:
+                continue
+            width = max(width, len(row))
+            cells = "".join(
+                self._cell(f"{get_column_letter(column)}{row_index}", style, value)
+                for column, (style, value) in enumerate(row, start=1)
+            )
+            xml_rows.append(f'<row r="{row_index}">{cells}</row>')
+
+        dimension = f"A1:{get_column_letter(width)}{max(len(rows), 1)}"
+        suffix = self._suffix.replace(_PLACEHOLDER_RANGE, color_range or "")
+        if color_range is None:
+            suffix = re.sub(
+                r"<conditionalFormatting.*?</conditionalFormatting>", "", suffix
+            )
+        return (
+            self._prefix.replace("{dimension}", dimension)
+            + "<sheetData>"
+            + "".join(xml_rows)
+            + "</sheetData>"
+            + suffix
+        ).encode("utf-8")
+
+    def write(
+        self, rows: List[ReportRow], color_range: Optional[str], target: SaveTarget
+    ) -> None:
+        """Render a report and write it as an xlsx file.
+
+        Args:
+            rows (List[ReportRow]): Styled values of every row.
+            color_range (Optional[str]): Range of the percentage color scale.
+            target (SaveTarget): Path or binary stream of the report.
+        """
+        data = self.render(rows, color_range)
+        sheet = self._compress(
+            ZipPart(
+                SHEET_PART,
+                self._sheet_date_time,
+                zlib.crc32(data),
+                len(data),
+                ZIP_STORED,
+                data,
+            )
+        )
+        parts = list(self._parts)
+        parts[self._sheet_index] = sheet
+        write_archive(parts, target)
+
+    def _cell(self, ref: str, style: FeedbackStyle, value: Any) -> str:
+        s = self.styles[style]
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return f'<c r="{ref}" s="{s}"/>'
+        if isinstance(value, bool):
+            return f'<c r="{ref}" s="{s}" t="b"><v>{int(value)}</v></c>'
+        if isinstance(value, (int, float)):
+            return f'<c r="{ref}" s="{s}"><v>{value!r}</v></c>'
+        text = escape(_ILLEGAL_XML.sub("", str(value)))
+        return (
+            f'<c r="{ref}" s="{s}" t="inlineStr">'
+            f'<is><t xml:space="preserve">{text}</t></is></c>'
+        )
+
+
+def _template_workbook() -> Workbook:
+    """Build a workbook with one example cell of every feedback style in row 1."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = FEEDBACK_SHEET_TITLE
+    for column, width in enumerate(FEEDBACK_COLUMN_WIDTHS, start=1):
+        ws.column_dimensions[get_column_letter(column)].width = width
+
+    for column, style in enumerate(FeedbackStyle, start=1):
+        cell = ws.cell(1, column, style.value)
+        format_point_cells((cell,), FEEDBACK_STYLES[style])
+        if style is FeedbackStyle.LABEL:
+            cell.font = Font(bold=True)
+        elif style is not FeedbackStyle.VALUE:
+            set_borders(((cell,),))
+
+    rule: Rule = generate_percentage_color_rule()
+    ws.conditional_formatting.add(_PLACEHOLDER_RANGE, rule)
+    return wb
+
+
+def _read_styles(sheet_xml: str) -> Dict[FeedbackStyle, int]:
+    """Map every feedback style to its cell format index in the template."""
+    root = fromstring(sheet_xml)
+    styles: Dict[FeedbackStyle, int] = {}
+    for column, style in enumerate(FeedbackStyle, start=1):
+        ref = f"{get_column_letter(column)}1"
+        cell = root.find(f".//{{{_MAIN_NS}}}c[@r='{ref}']")
+        styles[style] = int(cell.get("s", 0)) if cell is not None else 0
+    return styles
@@ -0,0 +1,139 @@
+import logging
+import math
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from openpyxl_worker.constants import FEEDBACK_LABELS, FEEDBACK_TABLE_HEADERS
+from openpyxl_worker.feedback_report.feedback_template import (
+    FeedbackTemplate,
+    ReportRow,
+)
+from openpyxl_worker.types import Compression, FeedbackStyle, SheetScores
+
+_UNSAFE_FILE_CHARS = re.compile(r'[\\/:*?"<>|\s]+')
+
+TABLE_ROW = 7
+"""Row of the task table header in feedback reports."""
+
+
+def report_rows(sheet: SheetScores, index: int) -> Tuple[List[ReportRow], str]:
+    """Lay out the feedback report of a student.
+
+    Args:
+        sheet (SheetScores): Scores of the student's class.
+        index (int): Index of the student in the class.
+
+    Returns:
+        Tuple[List[ReportRow], str]: Rows of the report and the range of its
+            percentage columns.
+    """
+    statistics = sheet.statistics
+    scores = sheet.scores[index]
+    max_total = sum(sheet.max_points)
+    rows: List[ReportRow] = [
+        (
+            (FeedbackStyle.LABEL, FEEDBACK_LABELS.student),
+            (FeedbackStyle.VALUE, sheet.students[index]),
+        ),
+        (
+            (FeedbackStyle.LABEL, FEEDBACK_LABELS.class_name),
+            (FeedbackStyle.VALUE, sheet.name),
+        ),
+        (
+            (FeedbackStyle.LABEL, FEEDBACK_LABELS.total),
+            (FeedbackStyle.VALUE, statistics.student_totals[index]),
+        ),
+        (
+            (FeedbackStyle.LABEL, FEEDBACK_LABELS.max_total),
+            (FeedbackStyle.VALUE, max_total),
+        ),
+        (
+            (
+                (FeedbackStyle.LABEL, FEEDBACK_LABELS.grade),
+                (FeedbackStyle.VALUE, statistics.grades[index]),
+            )
+            if statistics.grades
+            else ()
+        ),
+        (),
+        tuple(
+            (FeedbackStyle.TABLE_HEADER, header) for header in FEEDBACK_TABLE_HEADERS
+        ),
+    ]
+    for task, (number, max_point) in enumerate(
+        zip(statistics.task_numbers, sheet.max_points)
+    ):
+        score = scores[task] if task < len(scores) else math.nan
+        average = statistics.averages[task]
+        rows.append(
+            (
+                (FeedbackStyle.NUMBER, str(number).strip()),
+                (
+                    FeedbackStyle.TEXT,
+                    sheet.task_descriptions[task]
+                    if task < len(sheet.task_descriptions)
+                    else None,
+                ),
+                (FeedbackStyle.POINT, max_point),
+                (FeedbackStyle.POINT, score),
+                (FeedbackStyle.PERCENTAGE, _share(score, max_point)),
+                (FeedbackStyle.PERCENTAGE, _share(average, max_point)),
+            )
+        )
+    last_row = TABLE_ROW + len(statistics.task_numbers)
+    return rows, f"E{TABLE_ROW + 1}:F{last_row}"
+
+
+def write_feedback_reports(
+    sheets: List[SheetScores],
+    directory: Path,
+    compression: Compression = Compression.DEFAULT,
+    template: Optional[FeedbackTemplate] = None,
+) -> int:
+    """Write one feedback report file per student of every worksheet.
+
+    Reports are written one after another from the precompiled template, so
+    only a single report is held in memory at a time.
+
+    Args:
+        sheets (List[SheetScores]): Scores of the processed worksheets.
+        directory (Path): Directory of the reports; every worksheet gets a subdirectory.
+        compression (Compression): Zip compression preset of the reports.
+        template (Optional[FeedbackTemplate]): Template to reuse across workbooks.
+
+    Returns:
+        int: Number of written reports.
+    """
+    template = template or FeedbackTemplate(compression)
+    written = 0
+    for sheet in sheets:
+        sheet_directory = directory / safe_file_name(sheet.name)
+        sheet_directory.mkdir(parents=True, exist_ok=True)
+        digits = max(3, len(str(len(sheet.students))))
+        for index, student in enumerate(sheet.students):
+            rows, color_range = report_rows(sheet, index)
+            path = (
+                sheet_directory
+                / f"{index + 1:0{digits}d}_{safe_file_name(student)}.xlsx"
+            )
+            template.write(rows, color_range, path)
+            written += 1
+        logging.info(
+            "Wrote %d feedback reports for worksheet %s to %s",
+            len(sheet.students),
+            sheet.name,
+            sheet_directory,
+        )
+    return written
+
+
+def safe_file_name(name: str) -> str:
+    """Replace characters that are not allowed in file names."""
+    return _UNSAFE_FILE_CHARS.sub("_", name).strip("._") or "_"
+
+
+def _share(value: float, max_point: int) -> Optional[float]:
+    if not max_point or math.isnan(value):
+        return None
+    return value / max_point
@@ -0,0 +1,118 @@
+"""Fingerprints of worksheets for incremental runs.
+
+A fingerprint is a hash of everything the generated tables of a worksheet are
+made from: the task header row, the score rectangle, the variant cells, the
+analytic table layout and the grade thresholds. It is stored in the workbook as a hidden
+worksheet-scoped defined name, so the next run over the same file can leave
+worksheets with an unchanged fingerprint as they are.
+"""
+
+import hashlib
+import json
+from typing import List, Optional
+
+import numpy as np
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.worksheet import Worksheet
+
+from openpyxl_worker.constants import (
+    FINGERPRINT_NAME,
+    FINGERPRINT_VERSION,
+    LAYOUT_VERSION,
+)
+from openpyxl_worker.types import (
+    GivenTableCells,
+    GradeThresholds,
+    TableLayout,
+    WorksheetRanges,
+)
+
+
+def sheet_fingerprint(
+    cells: GivenTableCells,
+    scores: np.ndarray,
+    layout: TableLayout,
+    grade_thresholds: GradeThresholds = (),
+) -> str:
+    """Return the fingerprint of a worksheet's given table.
+
+    Args:
+        cells (GivenTableCells): Extracted given table cells.
+        scores (np.ndarray): Score matrix of the given table.
+        layout (TableLayout): Layout of the analytic table.
+        grade_thresholds (GradeThresholds): Grade thresholds of the subject.
+
+    Returns:
+        str: Hex digest of the worksheet's inputs.
+    """
+    digest = hashlib.sha256()
+    header = json.dumps(
+        [
+            FINGERPRINT_VERSION,
+            LAYOUT_VERSION,
+            layout.value,
+            list(grade_thresholds),
+            [(cell.coordinate, _json_value(cell.value)) for cell in cells.task_cells],
+            [cell.row for cell in cells.student_cells],
+            [cell.column for cell in cells.point_cells[0]] if cells.point_cells else [],
+            cells.last_row,
+            scores.shape,
+            [[_json_value(cell.value) for cell in row] for row in cells.variant_cells],
+            list(cells.task_variants),
+        ],
+        ensure_ascii=False,
+    )
+    digest.update(header.encode("utf-8"))
+    digest.update(np.ascontiguousarray(scores, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def summary_fingerprint(summary_table_data: List[WorksheetRanges]) -> str:
+    """Return the fingerprint of the summary table rows.
+
+    Rows of the summary table only reference worksheets by name and cell
+    coordinates, so equal fingerprints mean the rows stay in place.
+
+    Args:
+        summary_table_data (List[WorksheetRanges]): Ranges of every worksheet.
+
+    Returns:
+        str: Hex digest of the summary table layout.
+    """
+    shape = json.dumps(
+        [
+            FINGERPRINT_VERSION,
+            [
+                (
+                    ranges.name,
+                    [cell.coordinate for cell in ranges.task_cells],
+                    [
+                        cell.coordinate
+                        for cell in ranges.percentage_of_completion_formulas
+                    ],
+                )
+                for ranges in summary_table_data
+            ],
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(shape.encode("utf-8")).hexdigest()
+
+
+def read_fingerprint(ws: Worksheet) -> Optional[str]:
+    """Return the fingerprint stored in a worksheet, None if there is none."""
+    defined_name = ws.defined_names.get(FINGERPRINT_NAME)
+    if defined_name is None or not defined_name.attr_text:
+        return None
+    return defined_name.attr_text.strip('"')
+
+
+def write_fingerprint(ws: Worksheet, fingerprint: str) -> None:
+    """Store a fingerprint in a worksheet as a hidden defined name."""
+    ws.defined_names[FINGERPRINT_NAME] = DefinedName(
+        FINGERPRINT_NAME, attr_text=f'"{fingerprint}"', hidden=True
+    )
+
+
+def _json_value(value: object) -> object:
+    return value if isinstance(value, (str, int, float, bool)) else str(value)
@@ -1,10 +1,11 @@
 import logging
+from bisect import bisect_left
 from typing import List, Tuple
 
 from openpyxl.cell.cell import Cell
 from openpyxl.worksheet.worksheet import Worksheet
 
-from openpyxl_worker.given_table.constants import EMPTY_STUDENT, REPLACE_VALUES
+from openpyxl_worker.given_table.constants import EMPTY_STUDENT
 from openpyxl_worker.types import (
     FilledRows,
     FinderCells,
@@ -48,23 +49,6 @@ def get_nonempty_rows(ws: Worksheet, cell_range: Range) -> FilledRows:
     return FilledRows(tuple(rows), last_row_number)
 
 
-def replace_cells_with_zero(cell_range: MatrixCells) -> MatrixCells:
-    """Replace cells with values in REPLACE_VALUES with 0 in the given matrix.
-
-    Args:
-        cell_range (MatrixCells): The matrix of cells to process.
-
-    Returns:
-        MatrixCells: The updated matrix with replacements.
-    """
-    for row in cell_range:
-        for cell in row:
-            if cell.value in REPLACE_VALUES:
-                cell.value = 0
-    logging.info("Replaced X cells in matrix.")
-    return cell_range
-
-
 def remove_variant_columns(
     ws: Worksheet, cell_range: MatrixCells, variant_str: str
 ) -> MatrixCells:
@@ -95,6 +79,68 @@ def remove_variant_columns(
     return tuple(matrix_cells)
 
 
+def find_variant_columns(
+    ws: Worksheet, end_column: int, variant_str: str
+) -> Tuple[int, ...]:
+    """Find columns up to end_column whose header contains the variant string.
+
+    Variant columns left of the point range count too: the variant of the first
+    part of the work usually precedes the first task.
+
+    Args:
+        ws (Worksheet): The worksheet to process.
+        end_column (int): Last column of the point range.
+        variant_str (str): The string to identify variant columns.
+
+    Returns:
+        Tuple[int, ...]: Indices of the variant columns in ascending order.
+    """
+    return tuple(
+        cell.column
+        for cell in ws[1][:end_column]
+        if isinstance(cell.value, str) and variant_str in cell.value.lower()
+    )
+
+
+def extract_variant_cells(
+    ws: Worksheet, cell_range: MatrixCells, variant_columns: Tuple[int, ...]
+) -> MatrixCells:
+    """Extract the variant cells of every row in the matrix.
+
+    Args:
+        ws (Worksheet): The worksheet to process.
+        cell_range (MatrixCells): The matrix of cells, one row per student.
+        variant_columns (Tuple[int, ...]): Indices of the variant columns.
+
+    Returns:
+        MatrixCells: Variant cells, one row per student.
+    """
+    return tuple(
+        tuple(ws.cell(row[0].row, column) for column in variant_columns)
+        for row in cell_range
+    )
+
+
+def assign_variant_columns(
+    point_cells: MatrixCells, variant_columns: Tuple[int, ...]
+) -> Tuple[int, ...]:
+    """Assign every point column the nearest variant column on its left.
+
+    Args:
+        point_cells (MatrixCells): The matrix of point cells.
+        variant_columns (Tuple[int, ...]): Indices of the variant columns in ascending order.
+
+    Returns:
+        Tuple[int, ...]: Position in variant_columns for every point column, -1 if
+            no variant column precedes it.
+    """
+    if not point_cells:
+        return ()
+    return tuple(
+        bisect_left(variant_columns, cell.column) - 1 for cell in point_cells[0]
+    )
+
+
 def extract_student_cells(ws: Worksheet, point_cells: MatrixCells) -> LineCells:
     """Extract student cells for each row in the matrix.
 
@@ -1,12 +1,17 @@
 import logging
+from functools import lru_cache
+from typing import Any, Tuple
 
 from openpyxl.worksheet.worksheet import Worksheet
 
+from openpyxl_worker.constants import LAYOUT_CACHE_SIZE
 from openpyxl_worker.given_table.cell_utils import (
+    assign_variant_columns,
     extract_student_and_task_cells,
+    extract_variant_cells,
+    find_variant_columns,
     get_nonempty_rows,
     remove_variant_columns,
-    replace_cells_with_zero,
 )
 from openpyxl_worker.types import (
     GivenTableCells,
@@ -19,7 +24,8 @@ from openpyxl_worker.types import (
 class GivenTableWorker:
     """
     Worker class for extracting and processing given table data from an Excel worksheet.
-    Handles filled row selection, cell value replacement, variant column skipping, and cell range finding.
+    Handles filled row selection, variant column separation, and cell range finding.
+    Score values are cleaned later by the score cleaner.
     """
 
     OPEN_SCORE = "("
@@ -42,8 +48,10 @@ class GivenTableWorker:
             GivenTableCells: Named tuple containing all relevant cell ranges and values.
         """
         filled_rows = get_nonempty_rows(self.ws, self.point_range)
-        point_cells = replace_cells_with_zero(filled_rows.rows)
-        point_cells = remove_variant_columns(self.ws, point_cells, self.VARIANT)
+        point_cells = remove_variant_columns(self.ws, filled_rows.rows, self.VARIANT)
+        variant_columns = find_variant_columns(
+            self.ws, self.ws[self.point_range.end].column, self.VARIANT
+        )
         cells = extract_student_and_task_cells(self.ws, filled_rows.rows)
         task_values = self.select_task_values(cells.task_cells)
         logging.info("Extracted cell ranges for given table.")
@@ -54,38 +62,60 @@ class GivenTableWorker:
             task_values.numbers,
             task_values.max_points,
             filled_rows.last_row_number,
+            extract_variant_cells(self.ws, filled_rows.rows, variant_columns),
+            assign_variant_columns(point_cells, variant_columns),
         )
 
     def select_task_values(self, cell_range: LineCells) -> TaskValues:
         """Extract task numbers and max scores from the task cell range.
 
+        Worksheets made from the same form share the header row, so parsed
+        headers are memoized by their coordinates and values. Cells that
+        cannot be parsed are logged for every worksheet, memoized or not.
+
         Args:
             cell_range (LineCells): The line of task cells to process.
 
         Returns:
             TaskValues: Named tuple of task numbers and max scores.
         """
-        numbers = []
-        max_scores = []
-
-        for cell in cell_range:
-            if isinstance(cell.value, str):
-                if self.VARIANT in cell.value.lower():
-                    continue
-                strip_str = cell.value.strip()
-                try:
-                    score_index = strip_str.index(self.OPEN_SCORE)
-                    number = strip_str[:score_index]
-                    max_score = strip_str[score_index + 1 : -2]
-                    numbers.append(number)
-                    max_scores.append(int(max_score))
-                except (ValueError, IndexError):
-                    logging.error(
-                        "Failed to parse task value from cell '%s': %s",
-                        cell.coordinate,
-                        cell.value,
-                    )
-                    continue
-
-        logging.info("Selected %d task values.", len(numbers))
-        return TaskValues(tuple(numbers), tuple(max_scores))
+        task_values = parse_task_header(
+            tuple((cell.coordinate, cell.value) for cell in cell_range)
+        )
+        for coordinate, value in task_values.unparsed:
+            logging.error(
+                "Failed to parse task value from cell '%s': %s", coordinate, value
+            )
+        logging.info("Selected %d task values.", len(task_values.numbers))
+        return task_values
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def parse_task_header(header: Tuple[Tuple[str, Any], ...]) -> TaskValues:
+    """Parse task numbers and max scores from coordinates and values of task cells.
+
+    Args:
+        header (Tuple[Tuple[str, Any], ...]): Coordinate and value of every task cell.
+
+    Returns:
+        TaskValues: Named tuple of task numbers, max scores and unparsed cells.
+    """
+    numbers = []
+    max_scores = []
+    unparsed = []
+
+    for coordinate, value in header:
+        if isinstance(value, str):
+            if GivenTableWorker.VARIANT in value.lower():
+                continue
+            strip_str = value.strip()
+            try:
+                score_index = strip_str.index(GivenTableWorker.OPEN_SCORE)
+                number = strip_str[:score_index]
+                max_score = strip_str[score_index + 1 : -2]
+                numbers.append(number)
+                max_scores.append(int(max_score))
+            except (ValueError, IndexError):
+                unparsed.append((coordinate, value))
+
+    return TaskValues(tuple(numbers), tuple(max_scores), tuple(unparsed))
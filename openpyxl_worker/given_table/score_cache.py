@@ -0,0 +1,271 @@
+"""On-disk cache of extracted worksheet scores.
+
+Every worksheet is stored as two files: the score matrix as a ``.npy`` array and
+the header metadata and student list as JSON. Entries are keyed by a hash of
+the extracted scores, students and task header, not of the file, so saving a
+workbook again with the same scores keeps its entry. The matrix is opened
+memory-mapped, so analysis runs over archived files read the scores without
+copying them and without parsing the xlsx again.
+
+A record under ``sources`` maps every source file and worksheet to the digest
+of the file and the key of its scores. A file whose digest changed misses the
+cache until it is extracted again, and the entry its record no longer points
+to is removed, so the cache holds one version of every worksheet.
+"""
+
+import hashlib
+import json
+import logging
+import weakref
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from atomic_file import atomic_write
+from openpyxl_worker.constants import SCORE_CACHE_VERSION
+from openpyxl_worker.given_table.given_table_worker import GivenTableWorker
+from openpyxl_worker.given_table.score_cleaner import clean_scores
+from openpyxl_worker.table_worker import WorkbookContainer
+from openpyxl_worker.types import CachedSheet, Range
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file."""
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def scores_key(sheet: CachedSheet) -> str:
+    """Return the cache key of extracted scores.
+
+    Args:
+        sheet (CachedSheet): Extracted scores of a worksheet.
+
+    Returns:
+        str: Hex digest of the scores, the students and the task header.
+    """
+    scores = np.ascontiguousarray(sheet.scores, dtype=np.float64)
+    digest = hashlib.sha256(
+        json.dumps(
+            [
+                SCORE_CACHE_VERSION,
+                sheet.name,
+                list(sheet.students),
+                list(sheet.task_numbers),
+                list(sheet.max_points),
+                list(scores.shape),
+            ],
+            ensure_ascii=False,
+        ).encode("utf-8")
+    )
+    digest.update(scores.tobytes())
+    return digest.hexdigest()[:32]
+
+
+class ScoreCache:
+    """Cache of extracted worksheet scores by their content."""
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory (Path): Directory of the cached files.
+        """
+        self.directory = directory
+        # Matrices handed out by get, by entry key. Windows cannot remove a
+        # mapped file, so their entries are removed once they are released.
+        self._mapped: "weakref.WeakValueDictionary[str, np.ndarray]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._stale: Set[str] = set()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / "scores" / key
+
+    def _source_path(self, source: Path, sheet: str, point_range: Range) -> Path:
+        name = hashlib.sha256(
+            json.dumps(
+                [
+                    SCORE_CACHE_VERSION,
+                    str(source.resolve()),
+                    sheet,
+                    point_range.start,
+                    point_range.end,
+                ],
+                ensure_ascii=False,
+            ).encode("utf-8")
+        ).hexdigest()[:32]
+        return self.directory / "sources" / f"{name}.json"
+
+    def get(
+        self, digest: str, sheet: str, point_range: Range, source: Path
+    ) -> Optional[CachedSheet]:
+        """Return the cached scores of a worksheet.
+
+        Args:
+            digest (str): Digest of the source file.
+            sheet (str): Worksheet name.
+            point_range (Range): Point range of the worksheet.
+            source (Path): Path of the source file.
+
+        Returns:
+            Optional[CachedSheet]: The scores with a memory-mapped matrix, None if
+                they are not cached for this version of the file.
+        """
+        record = _read_record(self._source_path(source, sheet, point_range))
+        if record is None or record["digest"] != digest:
+            return None
+        path = self._entry_path(record["key"])
+        try:
+            with open(path.with_suffix(".json"), "r", encoding="utf-8") as file:
+                meta = json.load(file)
+            scores = np.load(path.with_suffix(".npy"), mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            logging.warning("Ignoring unreadable cached scores %s", path)
+            return None
+        self._mapped[record["key"]] = scores
+        return CachedSheet(
+            meta["name"],
+            tuple(meta["students"]),
+            tuple(meta["task_numbers"]),
+            tuple(meta["max_points"]),
+            scores,
+        )
+
+    def put(
+        self, digest: str, point_range: Range, sheet: CachedSheet, source: Path
+    ) -> None:
+        """Store the scores of a worksheet and point its source record at them.
+
+        An entry with the same scores is kept as it is. A new matrix is written
+        before its metadata, and both are replaced atomically, so a reader
+        never sees metadata without its matrix. The entry the record pointed
+        to before is removed.
+
+        Args:
+            digest (str): Digest of the source file.
+            point_range (Range): Point range of the worksheet.
+            sheet (CachedSheet): Extracted scores of the worksheet.
+            source (Path): Path of the source file.
+        """
+        key = scores_key(sheet)
+        path = self._entry_path(key)
+        source_path = self._source_path(source, sheet.name, point_range)
+        record = {"digest": digest, "key": key}
+        try:
+            if not path.with_suffix(".json").exists():
+                with atomic_write(path.with_suffix(".npy"), "wb") as file:
+                    np.save(file, np.ascontiguousarray(sheet.scores, dtype=np.float64))
+                with atomic_write(path.with_suffix(".json")) as file:
+                    json.dump(
+                        {
+                            "name": sheet.name,
+                            "students": list(sheet.students),
+                            "task_numbers": list(sheet.task_numbers),
+                            "max_points": list(sheet.max_points),
+                        },
+                        file,
+                        ensure_ascii=False,
+                    )
+            previous = _read_record(source_path)
+            if previous == record:
+                return
+            with atomic_write(source_path) as file:
+                json.dump(record, file)
+            if previous is not None and previous["key"] != key:
+                self._stale.add(previous["key"])
+            self._remove_stale()
+        except OSError:
+            logging.exception("Failed to write cached scores %s", path)
+
+    def _remove_stale(self) -> None:
+        """Remove entries no record points to, once this process has released them.
+
+        Raises:
+            OSError: If an entry cannot be removed.
+        """
+        for key in sorted(self._stale):
+            if key in self._mapped:
+                continue
+            path = self._entry_path(key)
+            for suffix in (".npy", ".json"):
+                path.with_suffix(suffix).unlink(missing_ok=True)
+            self._stale.discard(key)
+            logging.info("Removed cached scores %s", path)
+
+
+def _read_record(path: Path) -> Optional[Dict[str, str]]:
+    """Return the digest and entry key recorded for a source worksheet."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            record = json.load(file)
+        return {"digest": str(record["digest"]), "key": str(record["key"])}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        logging.warning("Ignoring unreadable score cache record %s", path)
+        return None
+
+
+def extract_scores(
+    wb_container: WorkbookContainer, sheet: str, point_range: Range
+) -> CachedSheet:
+    """Extract and clean the scores of a worksheet of a loaded workbook.
+
+    Args:
+        wb_container (WorkbookContainer): The loaded workbook.
+        sheet (str): Worksheet name.
+        point_range (Range): Point range of the worksheet.
+
+    Returns:
+        CachedSheet: Extracted scores of the worksheet.
+    """
+    ws = wb_container.activate_sheet(sheet).ws
+    given_ranges = GivenTableWorker(ws, point_range).get_cell_ranges()
+    scores, _ = clean_scores(
+        ws.title, given_ranges.point_cells, given_ranges.max_points
+    )
+    return CachedSheet(
+        ws.title,
+        tuple(str(cell.value) for cell in given_ranges.student_cells),
+        given_ranges.task_numbers,
+        given_ranges.max_points,
+        scores,
+    )
+
+
+def load_scores(
+    table_path: Path,
+    worksheets: List[Tuple[str, Range]],
+    cache: Optional[ScoreCache] = None,
+) -> List[CachedSheet]:
+    """Return the scores of worksheets of a file, parsing it only on a cache miss.
+
+    Args:
+        table_path (Path): Path of the source file.
+        worksheets (List[Tuple[str, Range]]): Name and point range of every worksheet.
+        cache (Optional[ScoreCache]): Cache of extracted scores.
+
+    Returns:
+        List[CachedSheet]: Scores of the worksheets in the given order.
+    """
+    digest = file_digest(table_path)
+    sheets: List[Optional[CachedSheet]] = [
+        cache.get(digest, name, point_range, table_path) if cache else None
+        for name, point_range in worksheets
+    ]
+    if all(sheet is not None for sheet in sheets):
+        logging.info("Read scores of %s from the score cache", table_path)
+        return [sheet for sheet in sheets if sheet is not None]
+
+    wb_container = WorkbookContainer(table_path)
+    for index, (name, point_range) in enumerate(worksheets):
+        if sheets[index] is None:
+            sheet = extract_scores(wb_container, name, point_range)
+            if cache:
+                cache.put(digest, point_range, sheet, table_path)
+            sheets[index] = sheet
+    return [sheet for sheet in sheets if sheet is not None]
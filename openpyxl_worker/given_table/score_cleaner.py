@@ -0,0 +1,191 @@
+"""Vectorised cleaning and validation of score rectangles.
+
+Cell values are read once into an object matrix; everything after that works
+on whole NumPy arrays: text is stripped and checked against the cross marks,
+decimal commas are parsed once per distinct string, and every score is checked
+against the max score of its task in a single comparison.
+"""
+
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Any, Iterable, List, Tuple
+
+import numpy as np
+
+from atomic_file import atomic_write
+from openpyxl_worker.given_table.constants import REPLACE_VALUES
+from openpyxl_worker.types import AnomalyKind, MatrixCells, ScoreAnomaly
+
+_BLANK, _NUMBER, _TEXT, _OTHER, _FORMULA = range(5)
+_TYPE_CODES = {type(None): _BLANK, int: _NUMBER, float: _NUMBER, str: _TEXT}
+_value_types = np.frompyfunc(lambda value: _TYPE_CODES.get(type(value), _OTHER), 1, 1)
+
+
+def _parse_number(text: str) -> float:
+    try:
+        value = float(text)
+    except ValueError:
+        return math.nan
+    return value if math.isfinite(value) else math.nan
+
+
+def clean_scores(
+    sheet: str,
+    point_cells: MatrixCells,
+    max_points: Tuple[int, ...],
+) -> Tuple[np.ndarray, Tuple[ScoreAnomaly, ...]]:
+    """Clean a score rectangle in place and return its score matrix.
+
+    Cross marks (REPLACE_VALUES) become 0, numbers stored as text (with a dot
+    or a decimal comma) become numbers and whitespace-only text becomes empty.
+    Text that is not a number, negative scores and scores above the max score
+    of the task are masked in the returned score matrix only and reported
+    together with the coerced text numbers; the cells keep the values typed
+    by the teacher. Formula cells are never changed; they are left out of the
+    matrix and reported as well, and so are values in columns without a task
+    in max_points, which an empty or unparsable header cell leaves behind.
+
+    Args:
+        sheet (str): Worksheet name used in the anomaly report.
+        point_cells (MatrixCells): Point cells, one row per student, one column per task.
+        max_points (Tuple[int, ...]): Max score of every task.
+
+    Returns:
+        Tuple[np.ndarray, Tuple[ScoreAnomaly, ...]]: Float matrix of cleaned
+            scores with one column per task of max_points (NaN where a cell
+            is empty or missing) and the found anomalies.
+    """
+    shape = (len(point_cells), len(point_cells[0]) if point_cells else 0)
+    raw = np.empty(shape, dtype=object)
+    raw[...] = [[cell._value for cell in row] for row in point_cells]
+    if raw.size == 0:
+        return np.full((shape[0], len(max_points)), np.nan), ()
+    value_types = _value_types(raw).astype(np.int8)
+    formulas = np.array(
+        [[cell.data_type == "f" for cell in row] for row in point_cells], dtype=bool
+    )
+    value_types[formulas] = _FORMULA
+
+    scores = np.full(shape, np.nan)
+    numbers = value_types == _NUMBER
+    scores[numbers] = raw[numbers].astype(np.float64)
+
+    texts = value_types == _TEXT
+    text_numbers = np.zeros(shape, dtype=bool)
+    not_numbers = value_types == _OTHER
+    if texts.any():
+        stripped = np.char.strip(raw[texts].astype(str))
+        crosses = np.isin(stripped, REPLACE_VALUES)
+        blanks = stripped == ""
+        distinct, inverse = np.unique(
+            np.char.replace(stripped, ",", "."), return_inverse=True
+        )
+        parsed = np.array([_parse_number(text) for text in distinct], dtype=np.float64)[
+            inverse.reshape(-1)
+        ]
+        parsed[crosses] = 0.0
+        scores[texts] = parsed
+        text_numbers[texts] = ~crosses & ~blanks & ~np.isnan(parsed)
+        not_numbers[texts] = ~crosses & ~blanks & np.isnan(parsed)
+
+    # Columns without a parsed task header have no max score; their values
+    # are kept out of the matrix and reported.
+    known = min(len(max_points), shape[1])
+    limits = np.full(shape[1], np.nan)
+    limits[:known] = max_points[:known]
+    no_task = np.zeros(shape, dtype=bool)
+    no_task[:, known:] = ~np.isnan(scores[:, known:]) | not_numbers[:, known:]
+    not_numbers[:, known:] = False
+    scores[:, known:] = np.nan
+    with np.errstate(invalid="ignore"):
+        negative = scores < 0
+        above_max = scores > limits
+    rejected = not_numbers | negative | above_max | no_task
+    scores[rejected] = np.nan
+
+    found: List[Tuple[int, int, ScoreAnomaly]] = []
+    for kind, mask in (
+        (AnomalyKind.TEXT_NUMBER, text_numbers & ~rejected),
+        (AnomalyKind.NOT_A_NUMBER, not_numbers),
+        (AnomalyKind.NEGATIVE, negative),
+        (AnomalyKind.ABOVE_MAX, above_max),
+        (AnomalyKind.FORMULA, formulas),
+        (AnomalyKind.NO_TASK, no_task),
+    ):
+        found.extend(
+            (
+                row,
+                column,
+                ScoreAnomaly(
+                    sheet,
+                    point_cells[row][column].coordinate,
+                    raw[row, column],
+                    kind,
+                    None if column >= known else int(limits[column]),
+                ),
+            )
+            for row, column in np.argwhere(mask)
+        )
+    found.sort(key=lambda item: item[:2])
+    anomalies = tuple(anomaly for *_, anomaly in found)
+
+    _write_back(point_cells, scores, texts & ~rejected)
+    if anomalies:
+        logging.warning(
+            "Found %d score anomalies in worksheet %s", len(anomalies), sheet
+        )
+    logging.info("Cleaned %d score cells in worksheet %s", raw.size, sheet)
+    task_scores = np.full((shape[0], len(max_points)), np.nan)
+    task_scores[:, :known] = scores[:, :known]
+    return task_scores, anomalies
+
+
+def _write_back(point_cells: MatrixCells, scores: np.ndarray, mask: np.ndarray) -> None:
+    """Store cleaned scores in the cells selected by the mask."""
+    for row, column in np.argwhere(mask):
+        # Plain Python numbers: NumPy scalars would be read back as other values.
+        score = float(scores[row, column])
+        point_cells[row][column].value = (
+            None if math.isnan(score) else int(score) if score.is_integer() else score
+        )
+
+
+def write_anomaly_report(
+    path: Path, workbook: str, anomalies: Iterable[ScoreAnomaly]
+) -> None:
+    """Write the score anomalies of a workbook as a JSON file.
+
+    The report is replaced atomically, and written even without anomalies so
+    a report of a previous run never outlives the problems it lists.
+
+    Args:
+        path (Path): Path of the report.
+        workbook (str): Name of the workbook.
+        anomalies (Iterable[ScoreAnomaly]): Anomalies of every worksheet.
+    """
+    report = {
+        "workbook": workbook,
+        "anomalies": [
+            {
+                "sheet": anomaly.sheet,
+                "cell": anomaly.cell,
+                "value": _json_value(anomaly.value),
+                "kind": anomaly.kind.value,
+                "max_point": anomaly.max_point,
+            }
+            for anomaly in anomalies
+        ],
+    }
+    with atomic_write(path) as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    logging.info("Wrote %d score anomalies to %s", len(report["anomalies"]), path)
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (str, int, bool)) or value is None:
+        return value
+    if isinstance(value, float):
+        return value if math.isfinite(value) else str(value)
+    return str(value)
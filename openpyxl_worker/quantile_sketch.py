@@ -0,0 +1,220 @@
+"""Mergeable streaming quantile sketch of student totals.
+
+District percentiles are taken over the totals of hundreds of thousands of
+students from workbooks processed at different times and by different
+workers, so the totals are summarized by a KLL sketch (Karnin, Lang and
+Liberty, 2016) instead of being collected and sorted. A sketch keeps a stack of
+compactors; level h holds items of weight 2**h, and a full level is sorted and
+every other item, starting at a random offset, moves up one level. Memory stays
+O(k log(n / k)) and the rank error about 1.7 / k regardless of the number of
+students; sketches of any number of workbooks merge into one with the same
+guarantee.
+"""
+
+import json
+import logging
+import math
+import random
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from atomic_file import atomic_write
+from openpyxl_worker.constants import QUANTILE_SKETCH_K
+from openpyxl_worker.types import AssessmentKey
+
+_CAPACITY_RATIO = 2 / 3
+"""Ratio of the capacities of neighbouring compactors."""
+
+
+class KllSketch:
+    """KLL quantile sketch of a stream of numbers."""
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K, seed: Optional[int] = 0) -> None:
+        """Initialize an empty sketch.
+
+        Args:
+            k (int): Capacity of the top compactor; the rank error is about 1.7 / k.
+            seed (Optional[int]): Seed of the compaction offsets; a fixed seed
+                makes sketches of the same stream identical.
+        """
+        if k < 8:
+            raise ValueError(f"Sketch parameter k must be at least 8, got {k}")
+        self.k = k
+        self.count = 0
+        self.compactors: List[List[float]] = [[]]
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(int(math.ceil(self.k * _CAPACITY_RATIO**depth)), 2)
+
+    def _size(self) -> int:
+        return sum(len(compactor) for compactor in self.compactors)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def update(self, value: float) -> None:
+        """Add one value; NaN is ignored."""
+        self.extend((value,))
+
+    def extend(self, values: Iterable[float]) -> None:
+        """Add values to the sketch; NaN values are ignored.
+
+        Args:
+            values (Iterable[float]): Values to add.
+        """
+        array = np.asarray(list(values), dtype=np.float64).ravel()
+        array = array[~np.isnan(array)]
+        if not array.size:
+            return
+        self.compactors[0].extend(array.tolist())
+        self.count += int(array.size)
+        self._compress()
+
+    def merge(self, other: "KllSketch") -> None:
+        """Add every value summarized by another sketch.
+
+        Args:
+            other (KllSketch): The sketch to merge into this one.
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self._compress()
+
+    def _compress(self) -> None:
+        """Compact full levels until the sketch fits its capacity."""
+        while self._size() > self._max_size():
+            for level in range(len(self.compactors)):
+                compactor = self.compactors[level]
+                if len(compactor) < self._capacity(level):
+                    continue
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                compactor.sort()
+                # An odd item stays on its level so no weight is lost.
+                kept = [compactor.pop()] if len(compactor) % 2 else []
+                offset = self._random.randint(0, 1)
+                self.compactors[level + 1].extend(compactor[offset::2])
+                self.compactors[level] = kept
+                break
+
+    def _weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the sorted items and their cumulative weights."""
+        items = np.fromiter(
+            (item for compactor in self.compactors for item in compactor),
+            dtype=np.float64,
+        )
+        weights = np.concatenate(
+            [
+                np.full(len(compactor), 2**level, dtype=np.int64)
+                for level, compactor in enumerate(self.compactors)
+            ]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def ranks(self, values: Iterable[float]) -> np.ndarray:
+        """Return the percentile rank of every value within the sketched stream.
+
+        Ties count half, so a value equal to every item has rank 0.5.
+
+        Args:
+            values (Iterable[float]): Values to rank.
+
+        Returns:
+            np.ndarray: Share of the stream below each value, 0 to 1; NaN for
+                NaN values and for an empty sketch.
+        """
+        array = np.asarray(list(values), dtype=np.float64).ravel()
+        if not self.count:
+            return np.full(array.shape, np.nan)
+        items, cumulative = self._weighted()
+        total = float(cumulative[-1])
+        cumulative = np.concatenate(([0], cumulative))
+        below = cumulative[np.searchsorted(items, array, side="left")]
+        not_above = cumulative[np.searchsorted(items, array, side="right")]
+        return np.where(np.isnan(array), np.nan, (below + not_above) / (2 * total))
+
+    def quantile(self, q: float) -> float:
+        """Return the approximate q-quantile of the stream, NaN for an empty sketch.
+
+        Args:
+            q (float): Quantile between 0 and 1.
+        """
+        if not self.count:
+            return float("nan")
+        items, cumulative = self._weighted()
+        index = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(items[min(int(index), len(items) - 1)])
+
+    def to_json(self) -> Dict[str, Any]:
+        """Convert the sketch into JSON-compatible values."""
+        return {"k": self.k, "count": self.count, "compactors": self.compactors}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "KllSketch":
+        """Restore a sketch converted with to_json.
+
+        Raises:
+            KeyError: If a field is missing.
+            ValueError: If k is too small.
+        """
+        sketch = cls(int(data["k"]))
+        sketch.count = int(data["count"])
+        sketch.compactors = [
+            [float(item) for item in compactor] for compactor in data["compactors"]
+        ] or [[]]
+        return sketch
+
+
+def write_sketch(path: Path, key: AssessmentKey, sketch: KllSketch) -> None:
+    """Write the sketch of a workbook, replacing the sketch of a previous run.
+
+    The file is replaced atomically, so workers merging sketches on a shared
+    directory never read a partial file.
+
+    Args:
+        path (Path): Sketch file of the workbook.
+        key (AssessmentKey): Assessment of the workbook.
+        sketch (KllSketch): Totals of the students of the workbook.
+    """
+    with atomic_write(path) as file:
+        json.dump({"key": list(key), **sketch.to_json()}, file, ensure_ascii=False)
+    logging.info("Wrote quantile sketch of %d totals to %s", len(sketch), path)
+
+
+def merge_sketches(paths: Iterable[Path]) -> Dict[AssessmentKey, KllSketch]:
+    """Merge workbook sketches by assessment, reading one file at a time.
+
+    Missing and unreadable files are skipped with a warning.
+
+    Args:
+        paths (Iterable[Path]): Sketch files of the workbooks.
+
+    Returns:
+        Dict[AssessmentKey, KllSketch]: Merged sketch of every assessment.
+    """
+    sketches: Dict[AssessmentKey, KllSketch] = {}
+    for path in paths:
+        if not path.exists():
+            logging.warning("No quantile sketch %s", path)
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            key = AssessmentKey(*data["key"])
+            sketch = KllSketch.from_json(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            logging.warning("Ignoring unreadable quantile sketch %s", path)
+            continue
+        sketches.setdefault(key, KllSketch(sketch.k)).merge(sketch)
+    return sketches
@@ -0,0 +1,95 @@
+"""Input readers turning CSV, ODS and xlsx protocols into openpyxl workbooks.
+
+Readers stream their input into an in-memory workbook with the same sheet layout
+as the xlsx form, so GivenTableWorker and the rest of the pipeline work on them
+unchanged. The result is always saved as xlsx next to the input file.
+"""
+
+import logging
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Union
+
+from openpyxl import Workbook, load_workbook
+
+from metrics.run_metrics import BLOATED_SHEETS
+from openpyxl_worker.readers.csv_reader import read_csv, read_csv_file
+from openpyxl_worker.readers.ods_reader import read_ods
+from openpyxl_worker.readers.used_range import (
+    is_bloated,
+    report_bloat,
+    scan_used_ranges,
+    trim_workbook,
+)
+
+Reader = Callable[[Path], Workbook]
+
+READERS: Dict[str, Reader] = {
+    ".csv": read_csv_file,
+    ".ods": read_ods,
+}
+"""Readers by lower-case file suffix; other files are loaded as xlsx."""
+
+
+def register_reader(suffix: str, reader: Reader) -> None:
+    """Add or replace the reader of files with the given suffix.
+
+    Args:
+        suffix (str): File suffix with the dot, for example ".csv".
+        reader (Reader): Function reading a file into a workbook.
+    """
+    READERS[suffix.lower()] = reader
+
+
+def load_source(
+    source: Union[Path, BinaryIO], trim_used_range: bool = False
+) -> Workbook:
+    """Load a workbook with the reader matching the file suffix.
+
+    The used range of every xlsx worksheet is scanned first and bloated
+    worksheets are reported; with trim_used_range they are also cut down to
+    their data before openpyxl loads them.
+
+    Args:
+        source (Union[Path, BinaryIO]): Path of the input file or a binary stream
+            with an xlsx workbook.
+        trim_used_range (bool): Whether to drop empty styled rows and columns
+            past the data of bloated worksheets.
+
+    Returns:
+        Workbook: The loaded workbook.
+    """
+    if isinstance(source, Path):
+        reader = READERS.get(source.suffix.lower())
+        if reader is not None:
+            logging.info("Reading %s with %s", source, reader.__name__)
+            return reader(source)
+
+    ranges = scan_used_ranges(source)
+    report_bloat(source, ranges)
+    BLOATED_SHEETS.inc(sum(is_bloated(used_range) for used_range in ranges))
+    if not isinstance(source, Path):
+        source.seek(0)
+    if trim_used_range and any(is_bloated(used_range) for used_range in ranges):
+        trimmed, _ = trim_workbook(source, ranges)
+        return load_workbook(trimmed)
+    return load_workbook(source)
+
+
+def xlsx_path(source: Path) -> Path:
+    """Return where the analytics of an input file are saved."""
+    if source.suffix.lower() in READERS:
+        return source.with_suffix(".xlsx")
+    return source
+
+
+__all__ = [
+    "READERS",
+    "Reader",
+    "load_source",
+    "read_csv",
+    "read_ods",
+    "register_reader",
+    "scan_used_ranges",
+    "trim_workbook",
+    "xlsx_path",
+]
@@ -0,0 +1,86 @@
+import codecs
+import csv
+import io
+import logging
+from pathlib import Path
+from typing import BinaryIO, Type
+
+from openpyxl import Workbook
+
+from openpyxl_worker.readers.sheet_builder import (
+    SheetBuilder,
+    parse_value,
+    paused_gc,
+)
+
+SAMPLE_SIZE = 64 * 1024
+"""Bytes read ahead to detect the encoding and the delimiter."""
+
+DELIMITERS = ";,\t"
+"""Delimiters tried when sniffing the CSV dialect; the portal exports use ';'."""
+
+
+class PortalDialect(csv.excel):
+    """Dialect of the results portal exports, used when sniffing fails."""
+
+    delimiter = ";"
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Return utf-8-sig when the sample is valid UTF-8, otherwise cp1251."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        decoder.decode(sample, final=False)
+    except UnicodeDecodeError:
+        return "cp1251"
+    return "utf-8-sig"
+
+
+def read_csv(stream: BinaryIO, sheet_name: str) -> Workbook:
+    """Stream a CSV protocol into a new workbook with a single worksheet.
+
+    Rows are parsed one by one with the csv module; numbers (also with a decimal
+    comma) become numeric cells and the rest stays text.
+
+    Args:
+        stream (BinaryIO): Binary stream with the CSV file.
+        sheet_name (str): Title of the created worksheet.
+
+    Returns:
+        Workbook: Workbook with the protocol worksheet.
+    """
+    buffered = io.BufferedReader(stream, SAMPLE_SIZE)  # type: ignore[arg-type]
+    sample = buffered.peek(SAMPLE_SIZE)[:SAMPLE_SIZE]
+    encoding = detect_encoding(sample)
+    text = io.TextIOWrapper(buffered, encoding=encoding, newline="")
+    # Sniff complete lines only, the sample may end in the middle of a row.
+    lines = sample.decode(encoding, errors="ignore").rsplit("\n", 1)[0]
+    dialect: Type[csv.Dialect]
+    try:
+        dialect = csv.Sniffer().sniff(lines, DELIMITERS)
+    except csv.Error:
+        dialect = PortalDialect
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = sheet_name
+    builder = SheetBuilder(ws)
+    with paused_gc():
+        for row in csv.reader(text, dialect):
+            builder.append([parse_value(value) for value in row])
+    text.detach()
+
+    logging.info(
+        "Read %d CSV rows into worksheet %s (%s, '%s')",
+        builder.rows,
+        sheet_name,
+        encoding,
+        dialect.delimiter,
+    )
+    return wb
+
+
+def read_csv_file(path: Path) -> Workbook:
+    """Read a CSV file into a workbook whose worksheet is named after the file."""
+    with open(path, "rb") as stream:
+        return read_csv(stream, path.stem[:31])
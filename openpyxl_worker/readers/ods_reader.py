@@ -0,0 +1,117 @@
+import logging
+import zipfile
+from pathlib import Path
+from typing import Any, BinaryIO, List, Optional, Union
+from xml.etree.ElementTree import Element, iterparse
+
+from openpyxl import Workbook
+
+from openpyxl_worker.readers.sheet_builder import SheetBuilder, paused_gc
+
+OFFICE_NS = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+TABLE_NS = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+
+TABLE = f"{{{TABLE_NS}}}table"
+ROW = f"{{{TABLE_NS}}}table-row"
+CELL = f"{{{TABLE_NS}}}table-cell"
+COVERED_CELL = f"{{{TABLE_NS}}}covered-table-cell"
+PARAGRAPH = f"{{{TEXT_NS}}}p"
+SPACE = f"{{{TEXT_NS}}}s"
+TAB = f"{{{TEXT_NS}}}tab"
+LINE_BREAK = f"{{{TEXT_NS}}}line-break"
+NUMBER_TYPES = ("float", "percentage", "currency")
+
+
+def element_text(element: Element) -> str:
+    """Return the text of an ODS text element with spaces, tabs and breaks expanded.
+
+    ODS keeps only one of several consecutive spaces in the text and stores the
+    rest as <text:s text:c="N"/>, so joining the text nodes would lose them.
+    """
+    parts = [element.text or ""]
+    for child in element:
+        if child.tag == SPACE:
+            parts.append(" " * int(child.get(f"{{{TEXT_NS}}}c", 1)))
+        elif child.tag == TAB:
+            parts.append("\t")
+        elif child.tag == LINE_BREAK:
+            parts.append("\n")
+        else:
+            parts.append(element_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def cell_value(cell: Element) -> Any:
+    """Return the value of an ODS cell: a number, a boolean, a date string or text."""
+    value_type = cell.get(f"{{{OFFICE_NS}}}value-type")
+    if value_type in NUMBER_TYPES:
+        number = float(cell.get(f"{{{OFFICE_NS}}}value", "nan"))
+        return int(number) if number.is_integer() else number
+    if value_type == "boolean":
+        return cell.get(f"{{{OFFICE_NS}}}boolean-value") == "true"
+    if value_type == "date":
+        return cell.get(f"{{{OFFICE_NS}}}date-value")
+    if value_type == "time":
+        return cell.get(f"{{{OFFICE_NS}}}time-value")
+    paragraphs = [element_text(p) for p in cell.iter(PARAGRAPH)]
+    return "\n".join(paragraphs) if paragraphs else None
+
+
+def read_ods(source: Union[Path, BinaryIO]) -> Workbook:
+    """Stream the sheets of an ODS file into a new workbook.
+
+    content.xml is parsed incrementally with iterparse and every row is released
+    once it is appended, so memory does not grow with the document tree.
+    Repeated rows and columns are expanded only when they hold values.
+
+    Args:
+        source (Union[Path, BinaryIO]): Path or binary stream of the ODS file.
+
+    Returns:
+        Workbook: Workbook with a worksheet for every ODS table.
+    """
+    wb = Workbook()
+    wb.remove(wb.active)
+    builder: Optional[SheetBuilder] = None
+    row: List[Any] = []
+    pending_blank_cells = 0
+
+    with (
+        zipfile.ZipFile(source) as archive,
+        archive.open("content.xml") as content,
+        paused_gc(),
+    ):
+        for event, element in iterparse(content, events=("start", "end")):
+            if event == "start":
+                if element.tag == TABLE:
+                    builder = SheetBuilder(
+                        wb.create_sheet(element.get(f"{{{TABLE_NS}}}name"))
+                    )
+                elif element.tag == ROW:
+                    row = []
+                    pending_blank_cells = 0
+                continue
+
+            if element.tag in (CELL, COVERED_CELL):
+                repeat = int(element.get(f"{{{TABLE_NS}}}number-columns-repeated", 1))
+                value = cell_value(element) if element.tag == CELL else None
+                if value is None:
+                    pending_blank_cells += repeat
+                else:
+                    row.extend([None] * pending_blank_cells)
+                    row.extend([value] * repeat)
+                    pending_blank_cells = 0
+            elif element.tag == ROW and builder is not None:
+                repeat = int(element.get(f"{{{TABLE_NS}}}number-rows-repeated", 1))
+                builder.append(row, repeat)
+                element.clear()
+            elif element.tag == TABLE and builder is not None:
+                logging.info(
+                    "Read %d ODS rows into worksheet %s", builder.rows, builder.ws.title
+                )
+                builder = None
+                element.clear()
+
+    return wb
@@ -0,0 +1,243 @@
+"""Detection and trimming of bloated used ranges in xlsx inputs.
+
+Some teacher files carry formatting down to the last row of the sheet or across
+thousands of empty columns. openpyxl creates a cell or a row dimension for each
+of those styled elements, which makes loading crawl and inflates the saved
+file. The sheet XML is scanned before loading to find the real data extent of
+every sheet, and bloated sheets can be cut down to it.
+"""
+
+import logging
+import posixpath
+import re
+import zipfile
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+from xml.etree.ElementTree import iterparse
+
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from openpyxl_worker.constants import USED_RANGE_SLACK_COLUMNS, USED_RANGE_SLACK_ROWS
+from openpyxl_worker.types import UsedRange
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_DIMENSION_REF = re.compile(rb'<dimension\b[^>]*?\sref="([^"]*)"')
+_ROW_REFERENCES = re.compile(rb'<row\b[^>]*?\sr="(\d+)"')
+_CELL_REFERENCES = re.compile(rb'<c\b[^>]*?\sr="([A-Z]+)\d+"')
+# A cell with a formula, an inline string or a non-empty value right after its tag.
+_DATA_CELL_REFERENCES = re.compile(
+    rb'<c\b[^>]*?\sr="([A-Z]+)(\d+)"[^>]*(?<!/)>(?:<f\b|<is\b|<v>[^<])'
+)
+_SHEET_DATA = re.compile(rb"<sheetData\b[^>]*>.*?</sheetData>", re.DOTALL)
+_ROW_ELEMENT = re.compile(rb"<row\b[^>]*?(?:/>|>.*?</row>)", re.DOTALL)
+_CELL_ELEMENT = re.compile(rb"<c\b[^>]*?(?:/>|>.*?</c>)", re.DOTALL)
+_ROW_NUMBER = re.compile(rb'\sr="(\d+)"')
+_CELL_COLUMN = re.compile(rb'\sr="([A-Z]+)\d+"')
+_DIMENSION_ELEMENT = re.compile(rb"<dimension\b[^>]*/>")
+
+
+def sheet_parts(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """Map worksheet names of an xlsx package to their part names.
+
+    Args:
+        archive (zipfile.ZipFile): The opened xlsx package.
+
+    Returns:
+        Dict[str, str]: Part name of every worksheet by its name.
+    """
+    with archive.open("xl/_rels/workbook.xml.rels") as rels:
+        targets = {
+            element.get("Id"): element.get("Target", "")
+            for _, element in iterparse(rels)
+            if element.tag == f"{{{PACKAGE_REL_NS}}}Relationship"
+        }
+    parts: Dict[str, str] = {}
+    with archive.open("xl/workbook.xml") as workbook:
+        for _, element in iterparse(workbook):
+            if element.tag != f"{{{MAIN_NS}}}sheet":
+                continue
+            target = targets.get(element.get(f"{{{REL_NS}}}id"), "")
+            if target.startswith("/"):
+                parts[element.get("name", "")] = target.lstrip("/")
+            elif target:
+                parts[element.get("name", "")] = posixpath.normpath(
+                    posixpath.join("xl", target)
+                )
+    return parts
+
+
+def scan_sheet(sheet: str, part: str, data: bytes) -> UsedRange:
+    """Find the declared, stored and data extents of a worksheet XML part.
+
+    The part is scanned with byte regular expressions instead of an XML parser:
+    only references of rows, cells and cells with a value or formula are
+    collected, so empty styled elements cost next to nothing.
+
+    Args:
+        sheet (str): Worksheet name.
+        part (str): Part name of the worksheet in the package.
+        data (bytes): The worksheet XML.
+
+    Returns:
+        UsedRange: Extents of the worksheet.
+    """
+    dimension = _DIMENSION_REF.search(data)
+    rows = data.count(b"<row ") + data.count(b"<row>")
+    cells = data.count(b"<c ") + data.count(b"<c>")
+    row_numbers = _ROW_REFERENCES.findall(data)
+    cell_columns = _CELL_REFERENCES.findall(data)
+    data_cells = _DATA_CELL_REFERENCES.findall(data)
+    data_columns = {column for column, _ in data_cells}
+    return UsedRange(
+        sheet,
+        part,
+        dimension.group(1).decode() if dimension else None,
+        rows,
+        cells,
+        max(map(int, row_numbers), default=0),
+        _max_column(set(cell_columns)),
+        max((int(row) for _, row in data_cells), default=0),
+        _max_column(data_columns),
+        len(row_numbers) == rows and len(cell_columns) == cells,
+    )
+
+
+def _max_column(columns: Iterable[bytes]) -> int:
+    return max(
+        (column_index_from_string(column.decode()) for column in columns), default=0
+    )
+
+
+def scan_used_ranges(source: Union[Path, BinaryIO]) -> List[UsedRange]:
+    """Scan the extents of every worksheet of an xlsx file.
+
+    Args:
+        source (Union[Path, BinaryIO]): Path or binary stream of the xlsx file.
+
+    Returns:
+        List[UsedRange]: Extents of the worksheets in workbook order.
+    """
+    with zipfile.ZipFile(source) as archive:
+        ranges = []
+        for sheet, part in sheet_parts(archive).items():
+            ranges.append(scan_sheet(sheet, part, archive.read(part)))
+    return ranges
+
+
+def is_bloated(used_range: UsedRange) -> bool:
+    """Whether a worksheet stores far more rows or columns than its data needs."""
+    return (
+        used_range.max_row - used_range.data_max_row > USED_RANGE_SLACK_ROWS
+        or used_range.max_column - used_range.data_max_column > USED_RANGE_SLACK_COLUMNS
+    )
+
+
+def report_bloat(source: Union[Path, BinaryIO], ranges: List[UsedRange]) -> None:
+    """Log a warning for every bloated worksheet."""
+    for used_range in ranges:
+        if is_bloated(used_range):
+            logging.warning(
+                "Worksheet '%s' of %s stores %d rows and %d cells up to %s%d "
+                "(dimension %s), but its data ends at %s",
+                used_range.sheet,
+                source,
+                used_range.rows,
+                used_range.cells,
+                get_column_letter(max(used_range.max_column, 1)),
+                used_range.max_row,
+                used_range.dimension,
+                data_extent(used_range),
+            )
+
+
+def data_extent(used_range: UsedRange) -> str:
+    """Return the range from A1 to the last row and column holding data."""
+    if not used_range.data_max_row:
+        return "A1"
+    return (
+        f"A1:{get_column_letter(used_range.data_max_column)}{used_range.data_max_row}"
+    )
+
+
+def trim_sheet_xml(data: bytes, used_range: UsedRange) -> bytes:
+    """Drop rows and cells past the data extent from worksheet XML.
+
+    Only empty styled elements lie past the data extent, so values, formulas
+    and everything outside sheetData are kept as they are.
+
+    Args:
+        data (bytes): The worksheet XML.
+        used_range (UsedRange): Extents found by scan_sheet.
+
+    Returns:
+        bytes: The trimmed worksheet XML.
+    """
+    last_row = used_range.data_max_row
+    last_column = used_range.data_max_column
+
+    def trim_cell(match: "re.Match[bytes]") -> bytes:
+        column = _CELL_COLUMN.search(match.group(0))
+        if column and column_index_from_string(column.group(1).decode()) > last_column:
+            return b""
+        return match.group(0)
+
+    def trim_row(match: "re.Match[bytes]") -> bytes:
+        row = match.group(0)
+        number = _ROW_NUMBER.search(row[: row.find(b">") + 1])
+        if number is None or int(number.group(1)) > last_row:
+            return b""
+        if used_range.max_column > last_column:
+            return _CELL_ELEMENT.sub(trim_cell, row)
+        return row
+
+    def trim_sheet_data(match: "re.Match[bytes]") -> bytes:
+        return _ROW_ELEMENT.sub(trim_row, match.group(0))
+
+    data = _SHEET_DATA.sub(trim_sheet_data, data, count=1)
+    dimension = data_extent(used_range).encode()
+    return _DIMENSION_ELEMENT.sub(
+        b'<dimension ref="' + dimension + b'"/>', data, count=1
+    )
+
+
+def trim_workbook(
+    source: Union[Path, BinaryIO], ranges: List[UsedRange]
+) -> Tuple[BytesIO, int]:
+    """Copy an xlsx file into memory with its bloated worksheets trimmed.
+
+    Args:
+        source (Union[Path, BinaryIO]): Path or binary stream of the xlsx file.
+        ranges (List[UsedRange]): Extents found by scan_used_ranges.
+
+    Returns:
+        Tuple[BytesIO, int]: The trimmed package, stored without compression,
+            and the number of trimmed worksheets.
+    """
+    bloated = {
+        used_range.part: used_range
+        for used_range in ranges
+        if is_bloated(used_range) and used_range.explicit_references
+    }
+    output = BytesIO()
+    with (
+        zipfile.ZipFile(source) as archive,
+        zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) as trimmed,
+    ):
+        for info in archive.infolist():
+            data = archive.read(info)
+            used_range: Optional[UsedRange] = bloated.get(info.filename)
+            if used_range is not None:
+                data = trim_sheet_xml(data, used_range)
+                logging.info(
+                    "Trimmed worksheet '%s' to %s",
+                    used_range.sheet,
+                    data_extent(used_range),
+                )
+            info.compress_type = zipfile.ZIP_STORED
+            trimmed.writestr(info, data)
+    output.seek(0)
+    return output, len(bloated)
@@ -0,0 +1,185 @@
+"""Catalog of the verifiable requirements of every task.
+
+Requirements are published once per subject, grade and year, so they are kept
+in YAML or CSV files of a catalog directory instead of being typed into every
+worksheet. The files are read into a hash index on the first lookup and the
+index is shared by all workbooks of the run.
+
+YAML files hold a list of requirement sets::
+
+    requirements:
+      - subject: Математика
+        grade: 5
+        year: 2024
+        tasks:
+          1: Развитие представлений о числе и числовых системах
+
+CSV files have the columns subject, grade, year, task and requirement. A set
+without a year applies to every year that has no set of its own.
+"""
+
+import csv
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from openpyxl.worksheet.worksheet import Worksheet
+from yaml import YAMLError, safe_load
+
+from openpyxl_worker.readers.csv_reader import DELIMITERS, PortalDialect
+from openpyxl_worker.student_profiles import assessment_key, normalize_key
+from openpyxl_worker.types import AssessmentKey, LinePositions
+
+Requirements = Dict[str, str]
+"""Requirement text by normalized task number."""
+
+CATALOG_SUFFIXES = (".yaml", ".yml", ".csv")
+"""Suffixes of the files read from a catalog directory."""
+
+CSV_COLUMNS = ("subject", "grade", "year", "task", "requirement")
+"""Columns of catalog CSV files."""
+
+
+class RequirementsCatalog:
+    """Thread-safe index of task requirements read lazily from a directory."""
+
+    def __init__(self, directory: Optional[Path]) -> None:
+        """Initialize the catalog.
+
+        Args:
+            directory (Optional[Path]): Directory of catalog files; None or a
+                missing directory gives an empty catalog.
+        """
+        self.directory = directory
+        self._index: Optional[Dict[AssessmentKey, Requirements]] = None
+        self._lock = threading.Lock()
+
+    def lookup(self, subject: Any, grade: Any, year: Any) -> Requirements:
+        """Return the requirements of a subject, grade and year.
+
+        Args:
+            subject (Any): Subject name.
+            grade (Any): Grade of the students.
+            year (Any): Year of the assessment.
+
+        Returns:
+            Requirements: Requirement text by normalized task number; tasks of
+                the set without a year are overridden by the set of the year.
+        """
+        index = self._load()
+        key = assessment_key(subject, grade, year)
+        return {**index.get(key._replace(year=""), {}), **index.get(key, {})}
+
+    def _load(self) -> Dict[AssessmentKey, Requirements]:
+        with self._lock:
+            if self._index is None:
+                self._index = self._read_directory()
+            return self._index
+
+    def _read_directory(self) -> Dict[AssessmentKey, Requirements]:
+        """Read every catalog file of the directory into an index.
+
+        Raises:
+            ValueError: If a catalog file is malformed.
+            OSError: If a catalog file cannot be read.
+        """
+        index: Dict[AssessmentKey, Requirements] = {}
+        if self.directory is None or not self.directory.is_dir():
+            return index
+
+        paths = sorted(
+            path
+            for path in self.directory.iterdir()
+            if path.suffix.lower() in CATALOG_SUFFIXES
+        )
+        count = 0
+        for path in paths:
+            try:
+                rows = list(
+                    _read_csv(path)
+                    if path.suffix.lower() == ".csv"
+                    else _read_yaml(path)
+                )
+            except (OSError, YAMLError, KeyError, TypeError, ValueError) as exc:
+                logging.exception("Failed to read requirements catalog %s", path)
+                raise ValueError(f"Invalid requirements catalog: '{path}'") from exc
+            for key, task, text in rows:
+                tasks = index.setdefault(key, {})
+                if tasks.get(task, text) != text:
+                    logging.warning(
+                        "Requirement of task %s for %s is redefined in %s",
+                        task,
+                        "/".join(key),
+                        path,
+                    )
+                tasks[task] = text
+                count += 1
+
+        logging.info(
+            "Read %d task requirements of %d sets from %s",
+            count,
+            len(index),
+            self.directory,
+        )
+        return index
+
+
+def _read_yaml(path: Path) -> Iterator[Tuple[AssessmentKey, str, str]]:
+    with open(path, "r", encoding="utf-8") as file:
+        data = safe_load(file) or {}
+    for entry in data.get("requirements", []):
+        key = assessment_key(entry["subject"], entry["grade"], entry.get("year"))
+        for task, text in entry["tasks"].items():
+            yield key, normalize_key(task), str(text).strip()
+
+
+def _read_csv(path: Path) -> Iterator[Tuple[AssessmentKey, str, str]]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        sample = file.read(64 * 1024)
+        file.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, DELIMITERS)
+        except csv.Error:
+            dialect = PortalDialect
+        for row in csv.DictReader(file, dialect=dialect):
+            if not row.get("task"):
+                continue
+            missing = [column for column in CSV_COLUMNS if column not in row]
+            if missing:
+                raise KeyError(", ".join(missing))
+            key = assessment_key(row["subject"], row["grade"], row["year"])
+            yield key, normalize_key(row["task"]), (row["requirement"] or "").strip()
+
+
+def fill_requirements(
+    ws: Worksheet,
+    cells: LinePositions,
+    task_numbers: Sequence[str],
+    requirements: Requirements,
+) -> int:
+    """Write catalog requirements into the empty requirement cells of a table.
+
+    Text typed by teachers is kept; only empty cells are filled.
+
+    Args:
+        ws (Worksheet): The worksheet.
+        cells (LinePositions): Requirement cells of the analytic table, one per task.
+        task_numbers (Sequence[str]): Task numbers in the order of the cells.
+        requirements (Requirements): Requirements of the subject, grade and year.
+
+    Returns:
+        int: Number of filled cells.
+    """
+    filled = 0
+    for position, task_number in zip(cells, task_numbers):
+        text = requirements.get(normalize_key(task_number))
+        if not text:
+            continue
+        cell = ws.cell(position.row, position.column)
+        if cell.value is None or (
+            isinstance(cell.value, str) and not cell.value.strip()
+        ):
+            cell.value = text
+            filled += 1
+    return filled
@@ -0,0 +1,212 @@
+import logging
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from openpyxl_worker.constants import GRADES
+from openpyxl_worker.types import (
+    GradeThresholds,
+    MatrixCells,
+    ScoreStatistics,
+    VariantStatistics,
+)
+
+
+def score_matrix(point_cells: MatrixCells) -> np.ndarray:
+    """Convert a matrix of point cells into a students × tasks score matrix.
+
+    Args:
+        point_cells (MatrixCells): Point cells, one row per student.
+
+    Returns:
+        np.ndarray: Float matrix, NaN where the cell holds no number.
+    """
+    return np.array(
+        [
+            [
+                cell.value
+                if isinstance(cell.value, (int, float))
+                and not isinstance(cell.value, bool)
+                else np.nan
+                for cell in row
+            ]
+            for row in point_cells
+        ],
+        dtype=np.float64,
+    ).reshape(len(point_cells), -1)
+
+
+def compute_statistics(
+    name: str,
+    scores: np.ndarray,
+    task_numbers: Tuple[str, ...],
+    max_points: Tuple[int, ...],
+    grade_thresholds: GradeThresholds = (),
+) -> ScoreStatistics:
+    """Compute averages, quartiles, histograms and grade bands in one pass over the scores.
+
+    Student totals count empty cells as 0, like the sums of the analytic table.
+    The median total and the grades only cover students with at least one
+    filled score, the same students as answered_totals; absent students get
+    no grade.
+
+    Args:
+        name (str): Worksheet name.
+        scores (np.ndarray): Students × tasks score matrix.
+        task_numbers (Tuple[str, ...]): Task numbers in column order.
+        max_points (Tuple[int, ...]): Max score of every task.
+        grade_thresholds (GradeThresholds): Minimal total score for grades 3, 4 and 5.
+
+    Returns:
+        ScoreStatistics: Statistics of the worksheet.
+    """
+    task_count = len(max_points)
+    scores = scores[:, :task_count]
+    max_array = np.asarray(max_points, dtype=np.int64)
+    answered = ~np.isnan(scores)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        quartiles = np.nanpercentile(scores, (25, 50, 75), axis=0).reshape(
+            3, task_count
+        )
+        averages = np.nanmean(scores, axis=0).reshape(task_count)
+
+    width = int(max_array.max(initial=0)) + 1
+    points = np.clip(np.floor(np.nan_to_num(scores)), 0, max_array).astype(np.int64)
+    bins = np.arange(task_count) * width + points
+    counts = np.bincount(bins[answered], minlength=task_count * width).reshape(
+        task_count, width
+    )
+    histograms = tuple(
+        tuple(int(count) for count in counts[index, : max_point + 1])
+        for index, max_point in enumerate(max_points)
+    )
+
+    totals = np.where(answered, scores, 0).sum(axis=1)
+    took_part = answered.any(axis=1)
+    taken_totals = totals[took_part]
+    median_total = float(np.median(taken_totals)) if taken_totals.size else float("nan")
+    grades: Tuple[Optional[int], ...] = ()
+    grade_counts: Tuple[int, ...] = ()
+    if grade_thresholds:
+        grade_array = GRADES[0] + np.searchsorted(
+            np.asarray(grade_thresholds), taken_totals, side="right"
+        )
+        student_grades: List[Optional[int]] = [None] * len(totals)
+        for row, grade in zip(np.flatnonzero(took_part), grade_array.tolist()):
+            student_grades[row] = int(grade)
+        grades = tuple(student_grades)
+        grade_counts = tuple(
+            int(count)
+            for count in np.bincount(grade_array - GRADES[0], minlength=len(GRADES))
+        )
+
+    logging.info("Computed score statistics for worksheet: %s", name)
+    return ScoreStatistics(
+        name,
+        task_numbers,
+        tuple(float(value) for value in averages),
+        tuple(float(value) for value in quartiles[1]),
+        tuple(float(value) for value in quartiles[0]),
+        tuple(float(value) for value in quartiles[2]),
+        histograms,
+        tuple(float(total) for total in totals),
+        median_total,
+        grades,
+        grade_counts,
+    )
+
+
+def answered_totals(scores: np.ndarray, task_count: int) -> np.ndarray:
+    """Return the total score of every student with at least one filled score.
+
+    Args:
+        scores (np.ndarray): Students × tasks score matrix.
+        task_count (int): Number of task columns.
+
+    Returns:
+        np.ndarray: Totals of the students who took the work, in row order.
+    """
+    scores = np.asarray(scores, dtype=np.float64)[:, :task_count]
+    answered = ~np.isnan(scores).all(axis=1)
+    return np.nansum(scores[answered], axis=1)
+
+
+def compute_variant_statistics(
+    name: str,
+    scores: np.ndarray,
+    variant_cells: MatrixCells,
+    task_variants: Tuple[int, ...],
+    max_points: Tuple[int, ...],
+) -> Optional[VariantStatistics]:
+    """Compute the completion of every task per variant in one grouped pass.
+
+    Every score is binned by its (variant, task) pair, where the variant is taken
+    from the variant column of the task's part of the work, and one bincount sums
+    the scores and another counts the answers of all bins at once.
+
+    Args:
+        name (str): Worksheet name.
+        scores (np.ndarray): Students × tasks score matrix.
+        variant_cells (MatrixCells): Variant cells, one row per student.
+        task_variants (Tuple[int, ...]): Variant column of every task, -1 if none.
+        max_points (Tuple[int, ...]): Max score of every task.
+
+    Returns:
+        Optional[VariantStatistics]: Completion per task and variant, None if the
+            worksheet has no filled variant cells.
+    """
+    labels = [[_variant_label(cell.value) for cell in row] for row in variant_cells]
+    variants = sorted(
+        {label for row in labels for label in row if label is not None},
+        key=_variant_order,
+    )
+    if not variants:
+        return None
+
+    task_count = len(max_points)
+    scores = scores[:, :task_count]
+    indices: Dict[str, int] = {variant: index for index, variant in enumerate(variants)}
+    codes = np.array(
+        [[indices.get(label, -1) for label in row] for row in labels],
+        dtype=np.int64,
+    ).reshape(len(labels), -1)
+    columns = np.full(task_count, -1, dtype=np.int64)
+    columns[: len(task_variants)] = task_variants[:task_count]
+
+    keys = np.where(columns >= 0, codes[:, np.maximum(columns, 0)], -1)
+    answered = (keys >= 0) & ~np.isnan(scores)
+    bins = (keys * task_count + np.arange(task_count))[answered]
+    size = len(variants) * task_count
+    sums = np.bincount(bins, weights=scores[answered], minlength=size)
+    counts = np.bincount(bins, minlength=size)
+    max_array = np.asarray(max_points, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        completion = (
+            sums.reshape(len(variants), task_count)
+            / counts.reshape(len(variants), task_count)
+            / np.where(max_array > 0, max_array, np.nan)
+        )
+
+    logging.info(
+        "Computed completion of %d variants for worksheet: %s", len(variants), name
+    )
+    return VariantStatistics(
+        tuple(variants),
+        tuple(tuple(float(value) for value in task) for task in completion.T),
+    )
+
+
+def _variant_label(value: Any) -> Optional[str]:
+    """Return the variant label of a cell value, None for an empty cell."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    label = str(value).strip() if value is not None else ""
+    return label or None
+
+
+def _variant_order(label: str) -> Tuple[bool, int, str]:
+    """Sort numeric variants by number, before other labels."""
+    return (not label.isdigit(), int(label) if label.isdigit() else 0, label)
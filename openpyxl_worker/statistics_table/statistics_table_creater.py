@@ -0,0 +1,174 @@
+import logging
+import math
+from typing import List, Optional
+
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.worksheet import Worksheet
+
+from openpyxl_worker.constants import (
+    GRADE_TABLE_HEADERS,
+    GRADES,
+    LEFT_TOP_ALIGN,
+    RIGHT_TOP_ALIGN,
+    STATISTICS_TABLE_HEADERS,
+    VARIANT_TABLE_HEADER,
+)
+from openpyxl_worker.summary_table.formatting import (
+    apply_percentage_color_formatting,
+    format_point_cells,
+    set_borders,
+)
+from openpyxl_worker.types import (
+    FormatArgs,
+    LineCells,
+    NumberFormatCell,
+    ScoreStatistics,
+    VariantStatistics,
+    WorksheetRanges,
+)
+
+
+class StatisticsTableCreates:
+    """Class for writing score distribution statistics under the analytic table.
+
+    All values are static: they are computed with NumPy, not with Excel formulas.
+    """
+
+    def __init__(
+        self,
+        ws: Worksheet,
+        worksheet_ranges: WorksheetRanges,
+        statistics: ScoreStatistics,
+        variants: Optional[VariantStatistics] = None,
+    ) -> None:
+        """Initialize StatisticsTableCreates.
+
+        Args:
+            ws (Worksheet): The worksheet with the analytic table.
+            worksheet_ranges (WorksheetRanges): Ranges of the analytic table.
+            statistics (ScoreStatistics): Statistics to write.
+            variants (Optional[VariantStatistics]): Completion per variant, None
+                if the worksheet has no variant columns.
+        """
+        self.ws = ws
+        self.worksheet_ranges = worksheet_ranges
+        self.statistics = statistics
+        self.variants = variants
+
+    def create(self) -> None:
+        """Write student grades, the statistics block and the variant block.
+
+        Grades are skipped when the analytic table has no student columns.
+        """
+        last_row = self.worksheet_ranges.percentage_of_points.row
+        if self.statistics.grades and len(self.worksheet_ranges.percentage_of_points):
+            self.fill_grades(last_row + 1)
+        last_row = self.fill_statistics(last_row + 3)
+        if self.variants is not None:
+            self.fill_variants(last_row + 2)
+        logging.info("Created statistics table for worksheet: %s", self.ws.title)
+
+    def fill_grades(self, row: int) -> LineCells:
+        """Write the grade of every student under their percentage of points."""
+        self.ws.cell(row, 2, GRADE_TABLE_HEADERS.grade)
+        filled_cells = tuple(
+            self.ws.cell(row, cell.column, grade)
+            for cell, grade in zip(
+                self.worksheet_ranges.percentage_of_points, self.statistics.grades
+            )
+        )
+        format_point_cells(filled_cells, FormatArgs(RIGHT_TOP_ALIGN))
+        set_borders((filled_cells,))
+        return filled_cells
+
+    def fill_statistics(self, start_row: int) -> int:
+        """Write quartiles and histograms per task, then grade counts.
+
+        Returns:
+            int: The last written row.
+        """
+        width = max((len(counts) for counts in self.statistics.histograms), default=0)
+        headers = (
+            *STATISTICS_TABLE_HEADERS[:-1],
+            *[f"{STATISTICS_TABLE_HEADERS.points}: {point}" for point in range(width)],
+        )
+        rows: List[LineCells] = [self._fill_row(start_row, headers)]
+
+        for index, task_number in enumerate(self.statistics.task_numbers):
+            values = (
+                task_number,
+                _excel_number(self.statistics.medians[index]),
+                _excel_number(self.statistics.first_quartiles[index]),
+                _excel_number(self.statistics.third_quartiles[index]),
+                *self.statistics.histograms[index],
+            )
+            rows.append(self._fill_row(start_row + index + 1, values))
+
+        format_point_cells(rows[0], FormatArgs(LEFT_TOP_ALIGN, wrap_text=True))
+        for row in rows[1:]:
+            format_point_cells(row[:1], FormatArgs(LEFT_TOP_ALIGN))
+            format_point_cells(
+                row[1:4],
+                FormatArgs(RIGHT_TOP_ALIGN, NumberFormatCell.FORMAT_NUMBER_00),
+            )
+        set_borders(tuple(rows))
+        last_row = start_row + len(rows) - 1
+
+        if self.statistics.grade_counts:
+            grade_row = start_row + len(rows) + 1
+            grade_rows = (
+                self._fill_row(grade_row, (GRADE_TABLE_HEADERS.grade, *GRADES)),
+                self._fill_row(
+                    grade_row + 1,
+                    (GRADE_TABLE_HEADERS.students, *self.statistics.grade_counts),
+                ),
+            )
+            set_borders(grade_rows)
+            last_row = grade_row + 1
+        return last_row
+
+    def fill_variants(self, start_row: int) -> None:
+        """Write the completion of every task per variant, one column per variant."""
+        headers = (
+            STATISTICS_TABLE_HEADERS.number,
+            *[
+                f"{VARIANT_TABLE_HEADER} {variant}"
+                for variant in self.variants.variants
+            ],
+        )
+        rows: List[LineCells] = [self._fill_row(start_row, headers)]
+        for index, (task_number, completion) in enumerate(
+            zip(self.statistics.task_numbers, self.variants.completion), start=1
+        ):
+            rows.append(
+                self._fill_row(
+                    start_row + index,
+                    (task_number, *(_excel_number(value) for value in completion)),
+                )
+            )
+
+        format_point_cells(rows[0], FormatArgs(LEFT_TOP_ALIGN, wrap_text=True))
+        for row in rows[1:]:
+            format_point_cells(row[:1], FormatArgs(LEFT_TOP_ALIGN))
+            format_point_cells(
+                row[1:],
+                FormatArgs(RIGHT_TOP_ALIGN, NumberFormatCell.FORMAT_PERCENTAGE_00),
+            )
+        set_borders(tuple(rows))
+        if len(rows) > 1:
+            apply_percentage_color_formatting(
+                self.ws,
+                f"B{start_row + 1}",
+                f"{get_column_letter(len(headers))}{start_row + len(rows) - 1}",
+            )
+
+    def _fill_row(self, row: int, values: tuple) -> LineCells:
+        return tuple(
+            self.ws.cell(row, column, value)
+            for column, value in enumerate(values, start=1)
+        )
+
+
+def _excel_number(value: float) -> Optional[float]:
+    """Return None for NaN so that the cell stays empty."""
+    return None if math.isnan(value) else value
@@ -0,0 +1,113 @@
+"""Join of student results across the workbooks of different subjects.
+
+Every subject arrives as a separate workbook, and the same child appears in each
+of them under the same code in the same class. A hash index of normalized
+(school, class, student) keys maps every student to one profile, so workbooks
+are added one at a time and only the profiles stay in memory.
+"""
+
+import logging
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from openpyxl_worker.types import (
+    AssessmentKey,
+    CachedSheet,
+    StudentKey,
+    StudentProfile,
+)
+
+
+def normalize_key(value: Any) -> str:
+    """Normalize a part of a student key for matching across workbooks.
+
+    Whole numbers lose their fractional part, whitespace is dropped and letters
+    are case-folded, so "5 А", "5а" and codes read as 40001 or 40001.0 match.
+
+    Args:
+        value (Any): School, class or student cell value.
+
+    Returns:
+        str: The normalized key part.
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = "" if value is None else str(value)
+    return "".join(text.split()).casefold().replace("ё", "е")
+
+
+def student_key(school: Any, class_name: Any, student: Any) -> StudentKey:
+    """Return the normalized key of a student."""
+    return StudentKey(
+        normalize_key(school), normalize_key(class_name), normalize_key(student)
+    )
+
+
+def assessment_key(subject: Any, grade: Any, year: Any) -> AssessmentKey:
+    """Return the normalized key of an assessment."""
+    return AssessmentKey(
+        normalize_key(subject), normalize_key(grade), normalize_key(year)
+    )
+
+
+class ProfileIndex:
+    """Hash index of student profiles built from one worksheet at a time."""
+
+    def __init__(self) -> None:
+        self._positions: Dict[StudentKey, int] = {}
+        self._profiles: List[StudentProfile] = []
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __iter__(self) -> Iterator[StudentProfile]:
+        return iter(self._profiles)
+
+    def get(self, key: StudentKey) -> StudentProfile:
+        """Return the profile of a key, creating an empty one for a new student."""
+        position = self._positions.get(key)
+        if position is None:
+            position = self._positions[key] = len(self._profiles)
+            self._profiles.append(StudentProfile(key))
+        return self._profiles[position]
+
+    def add_sheet(
+        self, school: str, class_name: str, subject: str, sheet: CachedSheet
+    ) -> None:
+        """Add the completion of every student of a worksheet to their profiles.
+
+        Completion is the share of the max points a student scored; students
+        without a single score get NaN. A student listed twice for the same
+        subject keeps the first result.
+
+        Args:
+            school (str): School of the workbook.
+            class_name (str): Class of the worksheet.
+            subject (str): Subject of the workbook.
+            sheet (CachedSheet): Scores of the worksheet.
+        """
+        max_total = float(sum(sheet.max_points))
+        scores = np.asarray(sheet.scores, dtype=np.float64)[:, : len(sheet.max_points)]
+        answered = ~np.isnan(scores).all(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            completion = np.where(
+                answered & (max_total > 0),
+                np.nansum(scores, axis=1) / max_total,
+                np.nan,
+            )
+
+        for student, value in zip(sheet.students, completion.tolist()):
+            profile = self.get(student_key(school, class_name, student))
+            if subject in profile.completion:
+                self.duplicates += 1
+                logging.warning(
+                    "Student %s of %s %s is listed twice for %s",
+                    student,
+                    school,
+                    class_name,
+                    subject,
+                )
+                continue
+            profile.completion[subject] = value
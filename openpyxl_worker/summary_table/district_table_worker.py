@@ -0,0 +1,138 @@
+import logging
+import math
+from typing import List, Tuple
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from openpyxl_worker.constants import CELL_STYLES, DISTRICT_TABLE_HEADERS
+from openpyxl_worker.quantile_sketch import KllSketch
+from openpyxl_worker.statistics_table.score_statistics import answered_totals
+from openpyxl_worker.summary_table.formatting import (
+    apply_percentage_color_formatting,
+    format_point_cells,
+    set_borders,
+)
+from openpyxl_worker.types import CachedSheet, CellStyle
+
+ClassRow = Tuple[str, int, float, float]
+StudentRow = Tuple[str, str, float, float]
+
+
+class DistrictTableWorker:
+    """
+    A worker class creating the district percentile rank table.
+    The first table places the median total of every class within the district,
+    the second one the total of every student who took the work. Ranks come
+    from the merged quantile sketch of all workbooks of the assessment and are
+    written as static values.
+    """
+
+    PERCENTILE_COLUMN = 4
+
+    def __init__(self, wb: Workbook, sheet_name: str) -> None:
+        """
+        Initialize the DistrictTableWorker, replacing a rank sheet of a previous run.
+
+        Args:
+            wb: The workbook to work with
+            sheet_name: Name of the worksheet to create
+        """
+        self.wb = wb
+        index = None
+        if sheet_name in wb.sheetnames:
+            index = wb.sheetnames.index(sheet_name)
+            wb.remove(wb[sheet_name])
+        self.ws = wb.create_sheet(sheet_name, index)
+
+    def create(
+        self, class_sheets: List[Tuple[str, CachedSheet]], sketch: KllSketch
+    ) -> None:
+        """
+        Rank the class medians and student totals and write both tables.
+
+        Args:
+            class_sheets: Class name and scores of every worksheet
+            sketch: Merged sketch of the totals of the district
+        """
+        classes: List[ClassRow] = []
+        students: List[StudentRow] = []
+        for class_name, sheet in class_sheets:
+            task_count = len(sheet.max_points)
+            scores = np.asarray(sheet.scores, dtype=np.float64)[:, :task_count]
+            answered = ~np.isnan(scores).all(axis=1)
+            totals = answered_totals(scores, task_count)
+            median = float(np.median(totals)) if totals.size else float("nan")
+            ranks = sketch.ranks([median, *totals.tolist()]).tolist()
+            classes.append((class_name, int(totals.size), median, ranks[0]))
+            names = [name for name, took in zip(sheet.students, answered) if took]
+            students.extend(
+                zip([class_name] * len(names), names, totals.tolist(), ranks[1:])
+            )
+
+        last_row = self._write_table(
+            1,
+            (
+                DISTRICT_TABLE_HEADERS.class_name,
+                DISTRICT_TABLE_HEADERS.students,
+                DISTRICT_TABLE_HEADERS.median,
+                DISTRICT_TABLE_HEADERS.percentile,
+            ),
+            (CellStyle.NUMBER, CellStyle.POINT, CellStyle.AVERAGE),
+            classes,
+        )
+        self._write_table(
+            last_row + 2,
+            (
+                DISTRICT_TABLE_HEADERS.class_name,
+                DISTRICT_TABLE_HEADERS.student,
+                DISTRICT_TABLE_HEADERS.total,
+                DISTRICT_TABLE_HEADERS.percentile,
+            ),
+            (CellStyle.NUMBER, CellStyle.NUMBER, CellStyle.AVERAGE),
+            students,
+        )
+        logging.info(
+            "Created district percentile table of %d classes and %d students.",
+            len(classes),
+            len(students),
+        )
+
+    def _write_table(
+        self,
+        header_row: int,
+        headers: Tuple[str, ...],
+        styles: Tuple[CellStyle, ...],
+        rows: List[Tuple[object, ...]],
+    ) -> int:
+        """Write one table with formatting and return its last row.
+
+        The last column holds percentile ranks; the other columns get the
+        given styles. NaN values stay empty cells.
+        """
+        for column, header in enumerate(headers, start=1):
+            self.ws.cell(row=header_row, column=column, value=header)
+        for row, values in enumerate(rows, start=header_row + 1):
+            for column, value in enumerate(values, start=1):
+                if not (isinstance(value, float) and math.isnan(value)):
+                    self.ws.cell(row=row, column=column, value=value)
+
+        last_row = header_row + len(rows)
+        cells = tuple(
+            self.ws.iter_rows(
+                min_row=header_row, max_row=last_row, max_col=len(headers)
+            )
+        )
+        format_point_cells(cells[0], CELL_STYLES[CellStyle.TABLE_HEADER])
+        columns = tuple(zip(*cells[1:]))
+        for column, style in zip(columns, (*styles, CellStyle.PERCENTAGE)):
+            format_point_cells(column, CELL_STYLES[style])
+        set_borders(cells)
+
+        if rows:
+            percentile = get_column_letter(self.PERCENTILE_COLUMN)
+            apply_percentage_color_formatting(
+                self.ws, f"{percentile}{header_row + 1}", f"{percentile}{last_row}"
+            )
+        return last_row
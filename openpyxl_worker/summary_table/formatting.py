@@ -1,7 +1,20 @@
+"""Cell styling shared by the generated tables.
+
+Styles are stamped rather than assigned cell by cell: the alignment, number
+format and border of a style are registered in the workbook once per call, and
+only their indices are copied into the style array of every cell. Assigning
+openpyxl style objects would hash and look up the same object for each cell.
+"""
+
 import logging
+from typing import Iterable, Optional
 
+from openpyxl.cell.cell import Cell
 from openpyxl.formatting.rule import ColorScale, FormatObject, Rule
 from openpyxl.styles import Alignment, Color
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE, BUILTIN_FORMATS_REVERSE
+from openpyxl.workbook.workbook import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
 
 from openpyxl_worker.constants import BRICK_COLOR, LIME_COLOR, THIN_BORDER, YELLOW_COLOR
@@ -15,14 +28,21 @@ def format_point_cells(cells: LineCells, format_args: FormatArgs) -> None:
         cells (LineCells): The cells to format.
         format_args (FormatArgs): Formatting arguments (alignment, number format, wrap).
     """
-    for cell in cells:
-        cell.alignment = Alignment(
+    if not cells:
+        return
+    wb: Workbook = cells[0].parent.parent
+    alignment_id = wb._alignments.add(
+        Alignment(
             horizontal=format_args.alignment.horizontal,
             vertical=format_args.alignment.vertical,
             wrap_text=format_args.wrap_text,
         )
-        if format_args.number_format.value:
-            cell.number_format = format_args.number_format.value
+    )
+    number_format_id = number_format_index(wb, format_args.number_format.value)
+    for style in _style_arrays(cells):
+        style.alignmentId = alignment_id
+        if number_format_id is not None:
+            style.numFmtId = number_format_id
 
 
 def set_borders(cells: MatrixCells) -> None:
@@ -31,9 +51,38 @@ def set_borders(cells: MatrixCells) -> None:
     Args:
         cells (MatrixCells): Matrix of cells to apply borders to.
     """
+    first_row = next((row for row in cells if row), None)
+    if first_row is None:
+        return
+    border_id = first_row[0].parent.parent._borders.add(THIN_BORDER)
     for row in cells:
-        for cell in row:
-            cell.border = THIN_BORDER
+        for style in _style_arrays(row):
+            style.borderId = border_id
+
+
+def number_format_index(wb: Workbook, number_format: Optional[str]) -> Optional[int]:
+    """Return the style index of a number format, registering it in the workbook.
+
+    Args:
+        wb (Workbook): The workbook.
+        number_format (Optional[str]): The number format, None for none.
+
+    Returns:
+        Optional[int]: The index, None when no number format is given.
+    """
+    if not number_format:
+        return None
+    if number_format in BUILTIN_FORMATS_REVERSE:
+        return BUILTIN_FORMATS_REVERSE[number_format]
+    return wb._number_formats.add(number_format) + BUILTIN_FORMATS_MAX_SIZE
+
+
+def _style_arrays(cells: Iterable[Cell]) -> Iterable[StyleArray]:
+    """Yield the style array of every cell, creating it for unstyled cells."""
+    for cell in cells:
+        if cell._style is None:
+            cell._style = StyleArray()
+        yield cell._style
 
 
 def generate_percentage_color_rule() -> Rule:
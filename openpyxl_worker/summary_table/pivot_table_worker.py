@@ -0,0 +1,124 @@
+import logging
+import math
+from typing import Dict, List
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from openpyxl_worker.constants import (
+    CELL_STYLES,
+    PIVOT_TABLE_HEADERS,
+)
+from openpyxl_worker.summary_table.formatting import (
+    apply_percentage_color_formatting,
+    format_point_cells,
+    set_borders,
+)
+from openpyxl_worker.types import CellStyle, SheetScores
+
+
+class PivotTableWorker:
+    """
+    A worker class creating the task × class pivot table.
+    Tasks are rows, class worksheets are columns and cells hold the completion
+    percentage of the task, followed by its minimum, maximum and spread across
+    classes. All values are static, so Excel does not resolve cross-sheet
+    formulas on open.
+    """
+
+    TASK_NUMBER_COLUMN = 1
+    FIRST_CLASS_COLUMN = 2
+
+    def __init__(self, wb: Workbook, sheet_name: str) -> None:
+        """
+        Initialize the PivotTableWorker, replacing a pivot sheet of a previous run.
+
+        Args:
+            wb: The workbook to work with
+            sheet_name: Name of the worksheet to create
+        """
+        self.wb = wb
+        index = None
+        if sheet_name in wb.sheetnames:
+            index = wb.sheetnames.index(sheet_name)
+            wb.remove(wb[sheet_name])
+        self.ws = wb.create_sheet(sheet_name, index)
+
+    def create(self, sheet_scores: List[SheetScores]) -> None:
+        """
+        Aggregate completion percentages of every worksheet and write the pivot table.
+
+        Args:
+            sheet_scores: Scores and statistics of every worksheet
+        """
+        tasks: Dict[str, int] = {}
+        for sheet in sheet_scores:
+            for number in sheet.statistics.task_numbers:
+                tasks.setdefault(str(number).strip(), len(tasks))
+
+        completion = np.full((len(tasks), len(sheet_scores)), np.nan)
+        for column, sheet in enumerate(sheet_scores):
+            rows = [
+                tasks[str(number).strip()] for number in sheet.statistics.task_numbers
+            ]
+            averages = np.asarray(sheet.statistics.averages, dtype=np.float64)
+            max_points = np.asarray(sheet.max_points, dtype=np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                completion[rows, column] = np.where(
+                    max_points > 0, averages / max_points, np.nan
+                )
+
+        has_values = ~np.isnan(completion).all(axis=1)
+        minimum = np.full(len(tasks), np.nan)
+        maximum = np.full(len(tasks), np.nan)
+        minimum[has_values] = np.nanmin(completion[has_values], axis=1)
+        maximum[has_values] = np.nanmax(completion[has_values], axis=1)
+        table = np.column_stack((completion, minimum, maximum, maximum - minimum))
+
+        self._write(list(tasks), [sheet.name for sheet in sheet_scores], table)
+        logging.info(
+            "Created pivot table of %d tasks and %d worksheets.",
+            len(tasks),
+            len(sheet_scores),
+        )
+
+    def _write(
+        self, tasks: List[str], sheet_names: List[str], table: np.ndarray
+    ) -> None:
+        """Write headers, task numbers and the aggregated values with formatting."""
+        headers = (
+            PIVOT_TABLE_HEADERS.task_number,
+            *sheet_names,
+            PIVOT_TABLE_HEADERS.minimum,
+            PIVOT_TABLE_HEADERS.maximum,
+            PIVOT_TABLE_HEADERS.spread,
+        )
+        for column, header in enumerate(headers, start=self.TASK_NUMBER_COLUMN):
+            self.ws.cell(row=1, column=column, value=header)
+
+        for row, (task, values) in enumerate(zip(tasks, table.tolist()), start=2):
+            self.ws.cell(row=row, column=self.TASK_NUMBER_COLUMN, value=task)
+            for column, value in enumerate(values, start=self.FIRST_CLASS_COLUMN):
+                if not math.isnan(value):  # NaN stays an empty cell
+                    self.ws.cell(row=row, column=column, value=value)
+
+        last_row = len(tasks) + 1
+        last_column = len(headers)
+        rows = tuple(
+            self.ws.iter_rows(min_row=1, max_row=last_row, max_col=last_column)
+        )
+        format_point_cells(rows[0], CELL_STYLES[CellStyle.TABLE_HEADER])
+        for cells in rows[1:]:
+            format_point_cells(cells[:1], CELL_STYLES[CellStyle.NUMBER])
+            format_point_cells(cells[1:], CELL_STYLES[CellStyle.PERCENTAGE])
+        set_borders(rows)
+
+        if tasks:
+            # Color the class columns and the minimum and maximum, not the spread.
+            apply_percentage_color_formatting(
+                self.ws,
+                f"{get_column_letter(self.FIRST_CLASS_COLUMN)}2",
+                f"{get_column_letter(last_column - 1)}{last_row}",
+            )
+        self.ws.freeze_panes = self.ws.cell(row=2, column=self.FIRST_CLASS_COLUMN)
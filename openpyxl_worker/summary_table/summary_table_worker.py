@@ -1,21 +1,32 @@
 import logging
-from typing import List
+import math
+from typing import List, Optional, Set, Tuple
 
 from openpyxl import Workbook
 from openpyxl.cell.cell import Cell
+from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
 
-from openpyxl_worker.constants import LEFT_TOP_ALIGN, THEME_RESULT_TABLE_HEADERS
+from openpyxl_worker.constants import (
+    GRADE_TABLE_HEADERS,
+    GRADES,
+    LEFT_TOP_ALIGN,
+    RIGHT_TOP_ALIGN,
+    THEME_RESULT_TABLE_HEADERS,
+)
 from openpyxl_worker.summary_table.formatting import (
     apply_percentage_color_formatting,
     format_point_cells,
     set_borders,
 )
 from openpyxl_worker.types import (
+    CellPosition,
     FormatArgs,
     MatrixCells,
+    NumberFormatCell,
     OverallResult,
     ResultCells,
+    ScoreStatistics,
     WorksheetRanges,
 )
 
@@ -31,6 +42,7 @@ class SummaryTableWorker:
     TASK_NUMBER_COLUMN = 2
     THEME_COLUMN = 3
     POINT_COLUMN = 4
+    STATISTICS_COLUMN = 6
 
     def __init__(self, wb: Workbook, sheet_name: str) -> None:
         """
@@ -51,17 +63,54 @@ class SummaryTableWorker:
         logging.info("Using existing worksheet: %s", name)
         return self.wb[name]
 
-    def create(self, summary_table_data: List[WorksheetRanges]) -> None:
+    def create(
+        self,
+        summary_table_data: List[WorksheetRanges],
+        statistics: Optional[List[ScoreStatistics]] = None,
+    ) -> None:
         """
         Create and format the summary table.
 
         Args:
             summary_table_data: List of worksheet ranges containing the data to summarize
+            statistics: Score statistics of every worksheet, reported next to the table
         """
         self._add_header()
         result_cells = self._fill_table(summary_table_data)
         self._format_worksheet(result_cells)
-        self._add_filter()
+        self._add_filter(len(result_cells.overall_result) + 1)
+        if statistics:
+            self._add_statistics(statistics)
+
+    def patch(
+        self,
+        summary_table_data: List[WorksheetRanges],
+        statistics: List[ScoreStatistics],
+        changed: Set[int],
+    ) -> None:
+        """
+        Rewrite the rows of changed worksheets in a summary table made by create.
+
+        The table must have been created from worksheet ranges with the same
+        summary fingerprint, so every worksheet keeps its rows and formatting.
+
+        Args:
+            summary_table_data: List of worksheet ranges of every worksheet
+            statistics: Score statistics of every worksheet
+            changed: Indexes of the worksheets to rewrite
+        """
+        current_row = 2
+        for index, worksheet_data in enumerate(summary_table_data):
+            if index in changed:
+                for task_index, task_cell in enumerate(worksheet_data.task_cells):
+                    self._create_row_data(
+                        worksheet_data, task_cell, task_index, current_row + task_index
+                    )
+                self._write_statistics_row(index + 2, statistics[index])
+            current_row += len(worksheet_data.task_cells)
+        logging.info(
+            "Patched summary rows of %d worksheets in %s.", len(changed), self.ws.title
+        )
 
     def _add_header(self) -> None:
         """Add headers to the worksheet."""
@@ -96,7 +145,7 @@ class SummaryTableWorker:
     def _create_row_data(
         self,
         worksheet_data: WorksheetRanges,
-        task_cell: Cell,
+        task_cell: CellPosition,
         index: int,
         row: int,
     ) -> OverallResult:
@@ -178,7 +227,51 @@ class SummaryTableWorker:
             )
         )
 
-    def _add_filter(self) -> None:
-        """Add auto-filter to the entire worksheet."""
-        self.ws.auto_filter.ref = self.ws.dimensions
+    def _add_filter(self, last_row: int) -> None:
+        """Add auto-filter to the summary table columns."""
+        self.ws.auto_filter.ref = f"A1:{get_column_letter(self.POINT_COLUMN)}{last_row}"
         logging.info("Added auto-filter to worksheet: %s", self.ws.title)
+
+    def _add_statistics(self, statistics: List[ScoreStatistics]) -> None:
+        """
+        Add the median total score and grade counts of every worksheet.
+
+        Args:
+            statistics: Score statistics of every worksheet
+        """
+        headers = (
+            GRADE_TABLE_HEADERS.sheet_name,
+            GRADE_TABLE_HEADERS.median_total,
+            *[f"{GRADE_TABLE_HEADERS.grade} {grade}" for grade in GRADES],
+        )
+        rows = [
+            tuple(
+                self.ws.cell(row=1, column=self.STATISTICS_COLUMN + index, value=header)
+                for index, header in enumerate(headers)
+            )
+        ]
+
+        for row, worksheet_statistics in enumerate(statistics, start=2):
+            rows.append(self._write_statistics_row(row, worksheet_statistics))
+            format_point_cells(
+                rows[-1][1:2],
+                FormatArgs(RIGHT_TOP_ALIGN, NumberFormatCell.FORMAT_NUMBER_00),
+            )
+
+        set_borders(tuple(rows))
+        logging.info("Added score statistics for %d worksheets.", len(statistics))
+
+    def _write_statistics_row(
+        self, row: int, statistics: ScoreStatistics
+    ) -> Tuple[Cell, ...]:
+        """Write the median total score and grade counts of a worksheet."""
+        median_total = statistics.median_total
+        values = (
+            statistics.name,
+            None if math.isnan(median_total) else median_total,
+            *statistics.grade_counts,
+        )
+        return tuple(
+            self.ws.cell(row=row, column=self.STATISTICS_COLUMN + index, value=value)
+            for index, value in enumerate(values)
+        )
@@ -1,10 +1,14 @@
 import logging
 from pathlib import Path
+from typing import BinaryIO, Union
 
-from openpyxl import load_workbook
 from openpyxl.workbook.workbook import Workbook
 from openpyxl.worksheet.worksheet import Worksheet as OpenpyxlWorksheet
 
+from openpyxl_worker.readers import load_source
+from openpyxl_worker.types import Compression
+from openpyxl_worker.workbook_saver import SaveTarget, save_workbook
+
 
 class WorkbookContainer:
     """Container for managing an Excel workbook and its worksheets.
@@ -12,21 +16,25 @@ class WorkbookContainer:
     Provides methods to load, activate, and save workbooks and worksheets for processing.
     """
 
-    path: Path
+    path: Union[Path, BinaryIO]
     wb: Workbook
     ws: OpenpyxlWorksheet
 
-    def __init__(self, file_path: Path) -> None:
+    def __init__(
+        self, file_path: Union[Path, BinaryIO], trim_used_range: bool = False
+    ) -> None:
         """Initialize the workbook container by loading the workbook.
 
         Args:
-            file_path (Path): Path to the Excel workbook file.
+            file_path (Union[Path, BinaryIO]): Path to the Excel workbook file or a binary stream with it.
+                CSV and ODS files are streamed in by the matching input reader.
+            trim_used_range (bool): Whether bloated worksheets are cut down to their data.
         Raises:
             Exception: If the workbook cannot be loaded.
         """
         self.path = file_path
         try:
-            self.wb = load_workbook(self.path)
+            self.wb = load_source(self.path, trim_used_range)
             self.ws = self.wb[self.wb.sheetnames[0]]
             logging.info("Loaded workbook: %s", self.path)
         except Exception:
@@ -54,16 +62,23 @@ class WorkbookContainer:
             raise
         return self
 
-    def save_table(self, file_path: Path) -> None:
+    def save_table(
+        self,
+        file_path: SaveTarget,
+        compression: Compression = Compression.DEFAULT,
+        workers: int = 1,
+    ) -> None:
         """Save the workbook to the specified file path.
 
         Args:
-            file_path (Path): Path to save the workbook.
+            file_path (SaveTarget): Path or binary stream to save the workbook to.
+            compression (Compression): Zip compression preset.
+            workers (int): Number of threads compressing workbook parts.
         Raises:
             Exception: If the workbook cannot be saved.
         """
         try:
-            self.wb.save(file_path)
+            save_workbook(self.wb, file_path, compression, workers)
             logging.info("Workbook saved to: %s", file_path)
         except Exception:
             logging.exception("Failed to save workbook to: %s", file_path)
@@ -1,11 +1,25 @@
-from dataclasses import dataclass
-from enum import Enum
-from typing import List, Literal, NamedTuple, Tuple
-
+from dataclasses import dataclass, field
+from enum import Enum, StrEnum
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
+
+import numpy as np
 from openpyxl.cell.cell import Cell
+from openpyxl.utils import get_column_letter
 
 LineCells = Tuple[Cell, ...]
 MatrixCells = Tuple[LineCells, ...]
+GradeThresholds = Tuple[float, ...]
 
 
 class TableHeader(NamedTuple):
@@ -18,6 +32,76 @@ class TableHeader(NamedTuple):
     percentage_of_completion: str
 
 
+class StatisticsTableHeaders(NamedTuple):
+    """Named tuple for score statistics table header fields."""
+
+    number: str
+    median: str
+    first_quartile: str
+    third_quartile: str
+    points: str
+
+
+class GradeTableHeaders(NamedTuple):
+    """Named tuple for grade distribution table header fields."""
+
+    sheet_name: str
+    median_total: str
+    grade: str
+    students: str
+
+
+class FeedbackTableHeaders(NamedTuple):
+    """Named tuple for feedback report table header fields."""
+
+    number: str
+    verifiable_requirements: str
+    max_point: str
+    student_point: str
+    student_percentage: str
+    class_percentage: str
+
+
+class FeedbackLabels(NamedTuple):
+    """Named tuple for labels of the feedback report title rows."""
+
+    student: str
+    class_name: str
+    total: str
+    max_total: str
+    grade: str
+
+
+class DashboardLabels(NamedTuple):
+    """Named tuple for section titles and headers of HTML dashboards."""
+
+    classes: str
+    tasks: str
+    all_classes: str
+    completion: str
+    index: str
+
+
+class PivotTableHeaders(NamedTuple):
+    """Named tuple for task × class pivot table header fields."""
+
+    task_number: str
+    minimum: str
+    maximum: str
+    spread: str
+
+
+class DistrictTableHeaders(NamedTuple):
+    """Named tuple for district percentile rank table header fields."""
+
+    class_name: str
+    student: str
+    total: str
+    students: str
+    median: str
+    percentile: str
+
+
 class ResultTableHeaders(NamedTuple):
     """Named tuple for result table header fields."""
 
@@ -35,6 +119,137 @@ class Range:
     end: str
 
 
+class UsedRange(NamedTuple):
+    """Extents of a worksheet found in its XML part.
+
+    Attributes:
+        sheet (str): Worksheet name.
+        part (str): Part name of the worksheet in the xlsx package.
+        dimension (Optional[str]): Range declared by the dimension element.
+        rows (int): Number of stored row elements.
+        cells (int): Number of stored cell elements, with or without values.
+        max_row (int): Last stored row.
+        max_column (int): Last stored column.
+        data_max_row (int): Last row with a value or a formula, 0 if there is none.
+        data_max_column (int): Last column with a value or a formula.
+        explicit_references (bool): Whether every row and cell has its reference.
+    """
+
+    sheet: str
+    part: str
+    dimension: Optional[str]
+    rows: int
+    cells: int
+    max_row: int
+    max_column: int
+    data_max_row: int
+    data_max_column: int
+    explicit_references: bool
+
+
+class Compression(StrEnum):
+    """Zip compression presets for saved workbooks."""
+
+    STORE = "store"
+    FAST = "fast"
+    DEFAULT = "default"
+    BEST = "best"
+
+
+class CellStyle(StrEnum):
+    """Style identifiers used in analytic table plans."""
+
+    TABLE_HEADER = "table_header"
+    NUMBER = "number"
+    POINT = "point"
+    AVERAGE = "average"
+    PERCENTAGE = "percentage"
+
+
+class TableLayout(StrEnum):
+    """Layouts of the analytic table."""
+
+    FULL = "full"
+    AGGREGATE = "aggregate"
+
+
+class FeedbackStyle(StrEnum):
+    """Style identifiers of cells in feedback reports."""
+
+    LABEL = "label"
+    VALUE = "value"
+    TABLE_HEADER = "table_header"
+    NUMBER = "number"
+    TEXT = "text"
+    POINT = "point"
+    PERCENTAGE = "percentage"
+
+
+class AnomalyKind(StrEnum):
+    """Kinds of problems found in score cells by the cleaning stage."""
+
+    TEXT_NUMBER = "text_number"
+    NOT_A_NUMBER = "not_a_number"
+    NEGATIVE = "negative"
+    ABOVE_MAX = "above_max"
+    FORMULA = "formula"
+    NO_TASK = "no_task"
+
+
+class ScoreAnomaly(NamedTuple):
+    """A score cell that was coerced or rejected by the cleaning stage.
+
+    Attributes:
+        sheet (str): Worksheet name.
+        cell (str): Coordinate of the cell.
+        value (Any): Original value of the cell.
+        kind (AnomalyKind): Kind of the problem.
+        max_point (Optional[int]): Max score of the cell's task, None for a
+            column without a parsed task header.
+    """
+
+    sheet: str
+    cell: str
+    value: Any
+    kind: AnomalyKind
+    max_point: Optional[int]
+
+
+class DiffKind(StrEnum):
+    """Kinds of differences between two processed workbooks."""
+
+    CHANGED = "changed"
+    ADDED = "added"
+    REMOVED = "removed"
+    SHEET_ADDED = "sheet_added"
+    SHEET_REMOVED = "sheet_removed"
+
+
+class CellDifference(NamedTuple):
+    """A cell that differs between two processed workbooks.
+
+    Attributes:
+        sheet (str): Worksheet name.
+        cell (str): Coordinate of the cell, empty for a whole worksheet.
+        kind (DiffKind): Kind of the difference.
+        old (Any): Value or formula in the old workbook, None if empty.
+        new (Any): Value or formula in the new workbook, None if empty.
+    """
+
+    sheet: str
+    cell: str
+    kind: DiffKind
+    old: Any
+    new: Any
+
+
+class ColorRule(StrEnum):
+    """Conditional color scale kinds used in analytic table plans."""
+
+    PERCENTAGE = "percentage"
+    POINT = "point"
+
+
 class NumberFormatCell(Enum):
     FORMAT_PERCENTAGE_00 = "0.00%"
     FORMAT_NUMBER_00 = "0.00"
@@ -58,21 +273,188 @@ class FormatArgs:
     wrap_text: bool = False
 
 
-@dataclass
+class CellPosition:
+    """Row and column of a single cell, formatted as an A1 reference on demand."""
+
+    __slots__ = ("row", "column")
+
+    def __init__(self, row: int, column: int) -> None:
+        self.row = row
+        self.column = column
+
+    @classmethod
+    def from_cell(cls, cell: Cell) -> "CellPosition":
+        """Take the position of an openpyxl cell without keeping the cell."""
+        return cls(cell.row, cell.column)
+
+    @property
+    def column_letter(self) -> str:
+        return get_column_letter(self.column)
+
+    @property
+    def coordinate(self) -> str:
+        return f"{get_column_letter(self.column)}{self.row}"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CellPosition):
+            return NotImplemented
+        return self.row == other.row and self.column == other.column
+
+    def __repr__(self) -> str:
+        return f"CellPosition({self.coordinate})"
+
+
+class LinePositions:
+    """Contiguous run of cells along a row or a column, stored as four integers."""
+
+    __slots__ = ("row", "column", "length", "vertical")
+
+    def __init__(self, row: int, column: int, length: int, vertical: bool) -> None:
+        self.row = row
+        self.column = column
+        self.length = length
+        self.vertical = vertical
+
+    @classmethod
+    def from_cells(cls, cells: LineCells) -> "LinePositions":
+        """Take the positions of a contiguous line of openpyxl cells.
+
+        Raises:
+            ValueError: If the cells do not form a contiguous row or column.
+        """
+        if not cells:
+            return cls(0, 0, 0, True)
+        first = cells[0]
+        vertical = len(cells) > 1 and cells[1].column == first.column
+        line = cls(first.row, first.column, len(cells), vertical)
+        if any(
+            (cell.row, cell.column) != (line[index].row, line[index].column)
+            for index, cell in enumerate(cells)
+        ):
+            raise ValueError("Cells do not form a contiguous line")
+        return line
+
+    @overload
+    def __getitem__(self, index: int) -> CellPosition: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Tuple[CellPosition, ...]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[CellPosition, Tuple[CellPosition, ...]]:
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(self.length)))
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("LinePositions index out of range")
+        if self.vertical:
+            return CellPosition(self.row + index, self.column)
+        return CellPosition(self.row, self.column + index)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LinePositions):
+            return NotImplemented
+        return (self.row, self.column, self.length, self.vertical) == (
+            other.row,
+            other.column,
+            other.length,
+            other.vertical,
+        )
+
+    def __iter__(self) -> Iterator[CellPosition]:
+        return (self[index] for index in range(self.length))
+
+    def __repr__(self) -> str:
+        if not self.length:
+            return "LinePositions()"
+        return f"LinePositions({self[0].coordinate}:{self[-1].coordinate})"
+
+
+class BlockPositions:
+    """Rectangular block of cells stored as a sequence of vertical lines."""
+
+    __slots__ = ("row", "column", "height", "width")
+
+    def __init__(self, row: int, column: int, height: int, width: int) -> None:
+        self.row = row
+        self.column = column
+        self.height = height
+        self.width = width
+
+    @classmethod
+    def from_cells(cls, cells: MatrixCells) -> "BlockPositions":
+        """Take the positions of a block given as a tuple of vertical lines.
+
+        Raises:
+            ValueError: If the lines do not form a contiguous block.
+        """
+        if not cells or not cells[0]:
+            return cls(0, 0, 0, 0)
+        first = cells[0][0]
+        block = cls(first.row, first.column, len(cells[0]), len(cells))
+        for index, line in enumerate(cells):
+            positions = LinePositions.from_cells(line)
+            if (positions.row, positions.column, len(positions)) != (
+                block.row,
+                block.column + index,
+                block.height,
+            ):
+                raise ValueError("Cells do not form a contiguous block")
+        return block
+
+    def __getitem__(self, index: int) -> LinePositions:
+        if index < 0:
+            index += self.width
+        if not 0 <= index < self.width:
+            raise IndexError("BlockPositions index out of range")
+        return LinePositions(self.row, self.column + index, self.height, True)
+
+    def __len__(self) -> int:
+        return self.width
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BlockPositions):
+            return NotImplemented
+        return (self.row, self.column, self.height, self.width) == (
+            other.row,
+            other.column,
+            other.height,
+            other.width,
+        )
+
+    def __iter__(self) -> Iterator[LinePositions]:
+        return (self[index] for index in range(self.width))
+
+    def __repr__(self) -> str:
+        if not self.width:
+            return "BlockPositions()"
+        return f"BlockPositions({self[0][0].coordinate}:{self[-1][-1].coordinate})"
+
+
+@dataclass(slots=True)
 class WorksheetRanges:
-    """Represents all relevant cell ranges for a worksheet."""
+    """Represents all relevant cell ranges for a worksheet.
+
+    Only row and column numbers are stored, so holding ranges of many worksheets
+    does not keep their openpyxl cells alive.
+    """
 
     name: str
-    table_headers: LineCells
-    task_cells: LineCells
-    point_formulas: MatrixCells
-    average_formulas: LineCells
-    percentage_of_completion_formulas: LineCells
-    max_point_cells: LineCells
-    average_point: Cell
-    average_percentage_of_completion: Cell
-    percentage_of_points: LineCells
-    task_discription_cells: LineCells
+    table_headers: LinePositions
+    task_cells: LinePositions
+    point_formulas: BlockPositions
+    average_formulas: LinePositions
+    percentage_of_completion_formulas: LinePositions
+    max_point_cells: LinePositions
+    average_point: CellPosition
+    average_percentage_of_completion: CellPosition
+    percentage_of_points: LinePositions
+    task_discription_cells: LinePositions
 
 
 @dataclass
@@ -95,7 +477,12 @@ class ResultCells:
 
 @dataclass
 class GivenTableCells:
-    """Represents all relevant cell ranges and values for a given table."""
+    """Represents all relevant cell ranges and values for a given table.
+
+    Variant columns are kept apart from the point cells: variant_cells holds the
+    variant cells of every student row and task_variants the index of the variant
+    column of every point column, -1 if no variant column precedes it.
+    """
 
     point_cells: MatrixCells
     student_cells: LineCells
@@ -103,6 +490,8 @@ class GivenTableCells:
     task_numbers: Tuple[str, ...]
     max_points: Tuple[int, ...]
     last_row: int
+    variant_cells: MatrixCells = ()
+    task_variants: Tuple[int, ...] = ()
 
 
 @dataclass
@@ -123,7 +512,240 @@ class FilledRows:
 
 @dataclass
 class TaskValues:
-    """Represents extracted task numbers and max points from task cells."""
+    """Represents extracted task numbers and max points from task cells.
+
+    Attributes:
+        numbers (Tuple[str, ...]): Task numbers in column order.
+        max_points (Tuple[int, ...]): Max score of every task.
+        unparsed (Tuple[Tuple[str, Any], ...]): Coordinate and value of every
+            task cell that could not be parsed.
+    """
 
     numbers: Tuple[str, ...]
     max_points: Tuple[int, ...]
+    unparsed: Tuple[Tuple[str, Any], ...] = ()
+
+
+@dataclass
+class ScoreStatistics:
+    """Represents score distribution statistics of a worksheet.
+
+    Grades are empty when no grade thresholds are configured for the subject;
+    students without any filled score have no grade and are left out of the
+    median total and the grade counts.
+    """
+
+    name: str
+    task_numbers: Tuple[str, ...]
+    averages: Tuple[float, ...]
+    medians: Tuple[float, ...]
+    first_quartiles: Tuple[float, ...]
+    third_quartiles: Tuple[float, ...]
+    histograms: Tuple[Tuple[int, ...], ...]
+    student_totals: Tuple[float, ...]
+    median_total: float
+    grades: Tuple[Optional[int], ...]
+    grade_counts: Tuple[int, ...]
+
+
+@dataclass
+class VariantStatistics:
+    """Represents the completion of every task per variant of a worksheet.
+
+    Attributes:
+        variants (Tuple[str, ...]): Variant labels in ascending order.
+        completion (Tuple[Tuple[float, ...], ...]): Completion share per task and
+            variant, NaN where no student of the variant answered the task.
+    """
+
+    variants: Tuple[str, ...]
+    completion: Tuple[Tuple[float, ...], ...]
+
+
+@dataclass
+class CachedSheet:
+    """Represents the extracted scores of a worksheet kept in the score cache.
+
+    Attributes:
+        name (str): Worksheet name.
+        students (Tuple[str, ...]): Student names or codes in row order.
+        task_numbers (Tuple[str, ...]): Task numbers in column order.
+        max_points (Tuple[int, ...]): Max score of every task.
+        scores (np.ndarray): Students × tasks score matrix, NaN where empty;
+            memory-mapped read-only when loaded from the cache.
+    """
+
+    name: str
+    students: Tuple[str, ...]
+    task_numbers: Tuple[str, ...]
+    max_points: Tuple[int, ...]
+    scores: np.ndarray
+
+
+@dataclass(frozen=True)
+class GivenTableData:
+    """Represents the position of a given table without openpyxl cells.
+
+    Attributes:
+        student_rows (Tuple[int, ...]): Rows of students present at the test.
+        point_columns (Tuple[int, ...]): Columns of task scores, variant columns excluded.
+        task_numbers (Tuple[str, ...]): Task numbers in column order.
+        max_points (Tuple[int, ...]): Max score of every task.
+        last_row (int): Last row of the point range.
+    """
+
+    student_rows: Tuple[int, ...]
+    point_columns: Tuple[int, ...]
+    task_numbers: Tuple[str, ...]
+    max_points: Tuple[int, ...]
+    last_row: int
+
+    @classmethod
+    def from_cells(cls, cells: GivenTableCells) -> "GivenTableData":
+        """Take positions and task values from extracted given table cells."""
+        return cls(
+            tuple(cell.row for cell in cells.student_cells),
+            tuple(cell.column for cell in cells.point_cells[0])
+            if cells.point_cells
+            else (),
+            cells.task_numbers,
+            cells.max_points,
+            cells.last_row,
+        )
+
+
+class CellRect(NamedTuple):
+    """Rectangle of cells given by its first and last row and column."""
+
+    min_row: int
+    min_column: int
+    max_row: int
+    max_column: int
+
+    @property
+    def ref(self) -> str:
+        start = f"{get_column_letter(self.min_column)}{self.min_row}"
+        end = f"{get_column_letter(self.max_column)}{self.max_row}"
+        return f"{start}:{end}"
+
+
+class PlannedCell(NamedTuple):
+    """Value or formula to be written into a cell."""
+
+    row: int
+    column: int
+    value: Union[str, int, float, None]
+
+
+class PlannedStyle(NamedTuple):
+    """Style to be applied to every cell of a rectangle."""
+
+    style: CellStyle
+    rect: CellRect
+
+
+class PlannedRule(NamedTuple):
+    """Conditional color scale to be added for a rectangle."""
+
+    kind: ColorRule
+    rect: CellRect
+    max_point: int = 1
+
+
+class PlannedSharedFormula(NamedTuple):
+    """Formula filling a rectangle, written as one Excel shared formula.
+
+    The formula is the one of the top left cell; other cells get it with
+    relative references shifted by their offset, as if it was copied there.
+    """
+
+    rect: CellRect
+    formula: str
+
+
+@dataclass
+class AnalyticTablePlan:
+    """Represents everything needed to write an analytic table into a worksheet.
+
+    A plan holds only plain values, so it can be built in a worker process,
+    cached and compared before it is applied to an openpyxl worksheet.
+    """
+
+    ranges: WorksheetRanges
+    values: Tuple[PlannedCell, ...]
+    styles: Tuple[PlannedStyle, ...]
+    borders: CellRect
+    rules: Tuple[PlannedRule, ...]
+    shared_formulas: Tuple[PlannedSharedFormula, ...] = ()
+
+
+@dataclass
+class LayoutTemplate:
+    """Represents the analytic table layout shared by worksheets of the same shape.
+
+    Worksheets with the same task header row, point columns, student count and
+    last row get the same layout; only the student references differ. Those are
+    kept as (row, formula prefix) pairs repeated in every student column, and the
+    student row number is appended when the template is filled.
+    """
+
+    ranges: WorksheetRanges
+    values: Tuple[PlannedCell, ...]
+    student_references: Tuple[Tuple[int, str], ...]
+    first_student_column: int
+    styles: Tuple[PlannedStyle, ...]
+    borders: CellRect
+    rules: Tuple[PlannedRule, ...]
+    shared_formulas: Tuple[PlannedSharedFormula, ...] = ()
+
+
+class StudentKey(NamedTuple):
+    """Normalized identity of a student shared by the workbooks of all subjects."""
+
+    school: str
+    class_name: str
+    student: str
+
+
+class AssessmentKey(NamedTuple):
+    """Normalized subject, grade and year of an assessment shared by its workbooks."""
+
+    subject: str
+    grade: str
+    year: str
+
+
+@dataclass
+class StudentProfile:
+    """Represents the results of one student across subjects.
+
+    Attributes:
+        key (StudentKey): Normalized school, class and student code.
+        completion (Dict[str, float]): Share of max points scored by subject.
+    """
+
+    key: StudentKey
+    completion: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class SheetScores:
+    """Represents the scores of one processed worksheet (class) for later stages.
+
+    Attributes:
+        name (str): Worksheet name.
+        students (Tuple[str, ...]): Student names or codes in row order.
+        scores (Tuple[Tuple[float, ...], ...]): Scores per student and task, NaN if empty.
+        max_points (Tuple[int, ...]): Max score of every task.
+        task_descriptions (Tuple[str, ...]): Verifiable requirements of every task.
+        statistics (ScoreStatistics): Statistics of the worksheet.
+        anomalies (Tuple[ScoreAnomaly, ...]): Score cells coerced or rejected by cleaning.
+    """
+
+    name: str
+    students: Tuple[str, ...]
+    scores: Tuple[Tuple[float, ...], ...]
+    max_points: Tuple[int, ...]
+    task_descriptions: Tuple[str, ...]
+    statistics: ScoreStatistics
+    anomalies: Tuple[ScoreAnomaly, ...] = ()
@@ -0,0 +1,300 @@
+"""Streaming comparison of two processed xlsx workbooks.
+
+The worksheet XML of both packages is read row by row at the same time and
+every row is dropped as soon as it is compared, so memory is bounded by one row
+and one read chunk of each sheet plus the shared string tables. Rows are cut
+out of the decompressed stream with regular expressions; byte-identical rows
+are skipped without parsing their cells.
+
+Cells are compared by their formula, with shared formulas expanded to the
+formula of every cell, or by their value when they hold no formula. Cells with
+neither are treated as empty, so differences in styling only are not reported.
+"""
+
+import re
+import zipfile
+from functools import lru_cache
+from html import unescape
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from openpyxl.formula.translate import Translator
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from openpyxl_worker.readers.used_range import sheet_parts
+from openpyxl_worker.types import CellDifference, DiffKind
+
+Source = Union[Path, BinaryIO]
+Row = Dict[int, Any]
+StreamedRow = Tuple[int, bytes, Optional[Row]]
+
+_CHUNK_SIZE = 1024 * 1024
+_ROW_ELEMENT = re.compile(rb"<row\b[^>]*?(?:/>|>.*?</row>)", re.DOTALL)
+_ROW_NUMBER = re.compile(rb'<row\b[^>]*?\sr="(\d+)"')
+_CELL_ELEMENT = re.compile(r"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.DOTALL)
+_REFERENCE = re.compile(r'\sr="([A-Z]+)\d+"')
+_TYPE = re.compile(r'\st="(\w+)"')
+_GROUP = re.compile(r'\ssi="(\d+)"')
+_FORMULA = re.compile(r"<f\b([^>]*?)(?:/>|>(.*?)</f>)", re.DOTALL)
+_VALUE = re.compile(r"<v>(.*?)</v>", re.DOTALL)
+_INLINE_STRING = re.compile(r"<is>(.*?)</is>", re.DOTALL)
+_STRING_ITEM = re.compile(r"<si>(.*?)</si>", re.DOTALL)
+_TEXT = re.compile(r"<t\b[^>]*>(.*?)</t>", re.DOTALL)
+_PHONETIC_RUN = re.compile(r"<rPh\b.*?</rPh>", re.DOTALL)
+_SHARED = 't="shared"'
+_SHARED_BYTES = _SHARED.encode()
+
+
+def diff_workbooks(
+    old: Source, new: Source, regions: Optional[Mapping[str, int]] = None
+) -> Iterator[CellDifference]:
+    """Compare cell values and formulas of two xlsx workbooks.
+
+    Args:
+        old (Source): Path or binary stream of the old workbook.
+        new (Source): Path or binary stream of the new workbook.
+        regions (Optional[Mapping[str, int]]): First compared row of every
+            compared worksheet; None compares every worksheet from the first row.
+
+    Yields:
+        CellDifference: Differences in worksheet order, then row and column order.
+    """
+    with zipfile.ZipFile(old) as old_archive, zipfile.ZipFile(new) as new_archive:
+        old_parts = sheet_parts(old_archive)
+        new_parts = sheet_parts(new_archive)
+        old_strings = read_shared_strings(old_archive)
+        new_strings = read_shared_strings(new_archive)
+
+        names = list(new_parts) + [name for name in old_parts if name not in new_parts]
+        for name in names:
+            if regions is not None and name not in regions:
+                continue
+            if name not in old_parts:
+                yield CellDifference(name, "", DiffKind.SHEET_ADDED, None, None)
+                continue
+            if name not in new_parts:
+                yield CellDifference(name, "", DiffKind.SHEET_REMOVED, None, None)
+                continue
+            first_row = regions[name] if regions is not None else 1
+            yield from _diff_rows(
+                name,
+                RowParser(old_strings, first_row),
+                stream_rows(old_archive, old_parts[name], first_row),
+                RowParser(new_strings, first_row),
+                stream_rows(new_archive, new_parts[name], first_row),
+            )
+
+
+def _diff_rows(
+    sheet: str,
+    old_parser: "RowParser",
+    old_rows: Iterator[Tuple[int, bytes]],
+    new_parser: "RowParser",
+    new_rows: Iterator[Tuple[int, bytes]],
+) -> Iterator[CellDifference]:
+    """Merge two row streams ordered by row number and compare matching rows."""
+    old_row = old_parser.next(old_rows)
+    new_row = new_parser.next(new_rows)
+    while old_row is not None or new_row is not None:
+        if new_row is None or (old_row is not None and old_row[0] < new_row[0]):
+            yield from _diff_cells(sheet, old_row[0], old_parser.cells(old_row), {})
+            old_row = old_parser.next(old_rows)
+        elif old_row is None or new_row[0] < old_row[0]:
+            yield from _diff_cells(sheet, new_row[0], {}, new_parser.cells(new_row))
+            new_row = new_parser.next(new_rows)
+        else:
+            # Equal rows without shared formulas cannot differ; children of a
+            # shared formula depend on their anchor, so such rows are compared.
+            if old_row[1] != new_row[1] or old_row[2] is not None:
+                yield from _diff_cells(
+                    sheet,
+                    new_row[0],
+                    old_parser.cells(old_row),
+                    new_parser.cells(new_row),
+                )
+            old_row = old_parser.next(old_rows)
+            new_row = new_parser.next(new_rows)
+
+
+def _diff_cells(sheet: str, row: int, old: Row, new: Row) -> Iterator[CellDifference]:
+    for column in sorted(old.keys() | new.keys()):
+        old_content = old.get(column)
+        new_content = new.get(column)
+        if old_content == new_content:
+            continue
+        if old_content is None:
+            kind = DiffKind.ADDED
+        elif new_content is None:
+            kind = DiffKind.REMOVED
+        else:
+            kind = DiffKind.CHANGED
+        yield CellDifference(
+            sheet, f"{get_column_letter(column)}{row}", kind, old_content, new_content
+        )
+
+
+def stream_rows(
+    archive: zipfile.ZipFile, part: str, first_row: int = 1
+) -> Iterator[Tuple[int, bytes]]:
+    """Stream the row elements of a worksheet part.
+
+    The part is decompressed in chunks and only complete row elements are cut
+    out of the buffer. Rows above first_row are skipped unless they hold shared
+    formulas, which later rows may refer to.
+
+    Args:
+        archive (zipfile.ZipFile): The opened xlsx package.
+        part (str): Part name of the worksheet.
+        first_row (int): First row of the compared region.
+
+    Yields:
+        Tuple[int, bytes]: Row number and the XML of the row element.
+    """
+    row_number = 0
+    buffer = b""
+    with archive.open(part) as stream:
+        while True:
+            chunk = stream.read(_CHUNK_SIZE)
+            buffer += chunk
+            consumed = 0
+            for match in _ROW_ELEMENT.finditer(buffer):
+                consumed = match.end()
+                element = match.group()
+                number = _ROW_NUMBER.match(element)
+                row_number = int(number.group(1)) if number else row_number + 1
+                if row_number >= first_row or _SHARED_BYTES in element:
+                    yield row_number, element
+            buffer = buffer[consumed:]
+            if not chunk:
+                break
+
+
+class RowParser:
+    """Parses the row elements of one worksheet, tracking its shared formulas."""
+
+    def __init__(self, shared_strings: List[str], first_row: int = 1) -> None:
+        """Initialize the parser.
+
+        Args:
+            shared_strings (List[str]): Shared string table of the package.
+            first_row (int): First row of the compared region.
+        """
+        self.shared_strings = shared_strings
+        self.first_row = first_row
+        # Anchor cell and text of every shared formula group of the worksheet.
+        self.shared_formulas: Dict[str, Tuple[str, str]] = {}
+
+    def next(self, rows: Iterator[Tuple[int, bytes]]) -> Optional[StreamedRow]:
+        """Return the next compared row of a stream.
+
+        Rows with shared formulas are parsed at once, in stream order, so every
+        anchor is known before its children are expanded; rows above the
+        compared region are only parsed for their anchors.
+
+        Args:
+            rows (Iterator[Tuple[int, bytes]]): Row elements from stream_rows.
+
+        Returns:
+            Optional[StreamedRow]: Row number, row element and the parsed cells
+                if the row holds shared formulas; None at the end of the stream.
+        """
+        for number, element in rows:
+            cells = self.parse(number, element) if _SHARED_BYTES in element else None
+            if number >= self.first_row:
+                return number, element, cells
+        return None
+
+    def cells(self, row: StreamedRow) -> Row:
+        """Return the content of the non-empty cells of a streamed row."""
+        number, element, cells = row
+        return cells if cells is not None else self.parse(number, element)
+
+    def parse(self, number: int, element: bytes) -> Row:
+        """Return the content of the non-empty cells of a row element by column index."""
+        row: Row = {}
+        column = 0
+        for attributes, body in _CELL_ELEMENT.findall(element.decode("utf-8")):
+            ref = _REFERENCE.search(attributes)
+            column = _column_index(ref.group(1)) if ref else column + 1
+            content = self._cell_content(attributes, body, column, number)
+            if content is not None:
+                row[column] = content
+        return row
+
+    def _cell_content(self, attributes: str, body: str, column: int, row: int) -> Any:
+        """Return the formula or the value of a cell, None if it is empty."""
+        formula = _FORMULA.search(body)
+        if formula is not None:
+            formula_attributes = formula.group(1)
+            text = unescape(formula.group(2) or "")
+            if _SHARED in formula_attributes:
+                ref = f"{get_column_letter(column)}{row}"
+                group = _attribute(_GROUP, formula_attributes)
+                if text:
+                    self.shared_formulas[group] = (ref, text)
+                elif group in self.shared_formulas:
+                    anchor, master = self.shared_formulas[group]
+                    translator = Translator(f"={master}", origin=anchor)
+                    text = translator.translate_formula(ref)[1:]
+            if text:
+                return f"={text}"
+
+        kind = _attribute(_TYPE, attributes) or "n"
+        if kind == "inlineStr":
+            inline = _INLINE_STRING.search(body)
+            return _string_item(inline.group(1)) if inline else None
+        value = _VALUE.search(body)
+        if value is None:
+            return None
+        text = value.group(1)
+        if kind == "s":
+            return self.shared_strings[int(text)]
+        if kind == "b":
+            return text == "1"
+        if kind == "n":
+            number = float(text)
+            return int(number) if number.is_integer() else number
+        return unescape(text)
+
+
+@lru_cache(maxsize=None)
+def _column_index(letters: str) -> int:
+    return column_index_from_string(letters)
+
+
+def _attribute(pattern: "re.Pattern[str]", attributes: str) -> str:
+    match = pattern.search(attributes)
+    return match.group(1) if match else ""
+
+
+def read_shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    """Read the shared string table of an xlsx package.
+
+    Args:
+        archive (zipfile.ZipFile): The opened xlsx package.
+
+    Returns:
+        List[str]: Text of every shared string, empty if the package has none.
+    """
+    try:
+        data = archive.read("xl/sharedStrings.xml").decode("utf-8")
+    except KeyError:
+        return []
+    return [_string_item(item) for item in _STRING_ITEM.findall(data)]
+
+
+def _string_item(item: str) -> str:
+    """Join the text runs of a string item, leaving out phonetic runs."""
+    return "".join(
+        unescape(text) for text in _TEXT.findall(_PHONETIC_RUN.sub("", item))
+    )
@@ -0,0 +1,221 @@
+"""Workbook saving with a configurable zip compression level.
+
+openpyxl deflates every part of the package at the default level on a single
+core. This module lets the caller pick the compression preset and, for large
+workbooks, compress the independent parts (mostly sheet XML) in a thread pool
+before the zip archive is assembled. Files are replaced atomically, so a
+worker killed while saving never leaves a truncated workbook behind.
+"""
+
+import datetime
+import logging
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, List, NamedTuple, Union
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from openpyxl.workbook.workbook import Workbook
+from openpyxl.writer.excel import ExcelWriter
+
+from atomic_file import atomic_write
+from openpyxl_worker.constants import COMPRESSION_LEVELS
+from openpyxl_worker.types import Compression
+
+SaveTarget = Union[Path, BinaryIO]
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_OF_DIRECTORY = struct.Struct("<IHHHHIIH")
+_ZIP_VERSION = 20
+_ZIP_LIMIT = 0xFFFFFFFF
+_FILE_ATTRIBUTES = 0o600 << 16
+
+
+class ZipPart(NamedTuple):
+    """A single part of the xlsx package ready to be written to the archive."""
+
+    name: str
+    date_time: tuple
+    crc: int
+    size: int
+    method: int
+    data: bytes
+
+
+def save_workbook(
+    wb: Workbook,
+    target: SaveTarget,
+    compression: Compression = Compression.DEFAULT,
+    workers: int = 1,
+) -> None:
+    """Save the workbook with the given compression preset.
+
+    Args:
+        wb (Workbook): The workbook to save.
+        target (SaveTarget): Path or binary stream to write the xlsx package to.
+        compression (Compression): Compression preset for the zip archive.
+        workers (int): Number of threads compressing parts in parallel.
+    """
+    if isinstance(target, Path):
+        with atomic_write(target, "wb") as stream:
+            save_workbook(wb, stream, compression, workers)
+        return
+
+    level = COMPRESSION_LEVELS[compression]
+    wb.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(
+        tzinfo=None
+    )
+
+    if workers <= 1 or level == 0:
+        method = ZIP_DEFLATED if level else ZIP_STORED
+        with ZipFile(
+            target, "w", method, allowZip64=True, compresslevel=level or None
+        ) as archive:
+            ExcelWriter(wb, archive).write_data()
+        logging.info("Saved workbook with %s compression.", compression)
+        return
+
+    parts = serialize_parts(wb)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        compressed = list(executor.map(lambda part: compress_part(part, level), parts))
+    write_archive(compressed, target)
+    logging.info(
+        "Saved workbook with %s compression on %d threads.", compression, workers
+    )
+
+
+def serialize_parts(wb: Workbook) -> List[ZipPart]:
+    """Serialize the workbook into uncompressed package parts.
+
+    Args:
+        wb (Workbook): The workbook to serialize.
+
+    Returns:
+        List[ZipPart]: Package parts in archive order.
+    """
+    buffer = BytesIO()
+    with ZipFile(buffer, "w", ZIP_STORED, allowZip64=True) as archive:
+        ExcelWriter(wb, archive).write_data()
+
+    with ZipFile(buffer) as archive:
+        return [
+            ZipPart(
+                info.filename,
+                info.date_time,
+                info.CRC,
+                info.file_size,
+                ZIP_STORED,
+                archive.read(info),
+            )
+            for info in archive.infolist()
+        ]
+
+
+def compress_part(part: ZipPart, level: int) -> ZipPart:
+    """Deflate a package part, keeping it stored if compression does not help.
+
+    Args:
+        part (ZipPart): The uncompressed part.
+        level (int): Zlib compression level.
+
+    Returns:
+        ZipPart: The part with raw deflate data.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    data = compressor.compress(part.data) + compressor.flush()
+    if len(data) >= part.size:
+        return part
+    return part._replace(method=ZIP_DEFLATED, data=data)
+
+
+def write_archive(parts: List[ZipPart], target: SaveTarget) -> None:
+    """Write already compressed parts into a zip archive.
+
+    Args:
+        parts (List[ZipPart]): Parts with their final payloads.
+        target (SaveTarget): Path or binary stream to write to.
+    Raises:
+        ValueError: If the package does not fit into a zip archive without zip64.
+    """
+    if isinstance(target, Path):
+        with atomic_write(target, "wb") as stream:
+            _write_archive(parts, stream)
+    else:
+        _write_archive(parts, target)
+
+
+def _write_archive(parts: List[ZipPart], stream: BinaryIO) -> None:
+    offset = 0
+    central_directory: List[bytes] = []
+
+    for part in parts:
+        name = part.name.encode("utf-8")
+        dos_time, dos_date = _dos_date_time(part.date_time)
+        if offset > _ZIP_LIMIT or part.size > _ZIP_LIMIT:
+            raise ValueError(f"Workbook part '{part.name}' is too large for zip32")
+
+        stream.write(
+            _LOCAL_HEADER.pack(
+                0x04034B50,
+                _ZIP_VERSION,
+                0x800,
+                part.method,
+                dos_time,
+                dos_date,
+                part.crc,
+                len(part.data),
+                part.size,
+                len(name),
+                0,
+            )
+        )
+        stream.write(name)
+        stream.write(part.data)
+        central_directory.append(
+            _CENTRAL_HEADER.pack(
+                0x02014B50,
+                _ZIP_VERSION,
+                _ZIP_VERSION,
+                0x800,
+                part.method,
+                dos_time,
+                dos_date,
+                part.crc,
+                len(part.data),
+                part.size,
+                len(name),
+                0,
+                0,
+                0,
+                0,
+                _FILE_ATTRIBUTES,
+                offset,
+            )
+            + name
+        )
+        offset += _LOCAL_HEADER.size + len(name) + len(part.data)
+
+    directory = b"".join(central_directory)
+    stream.write(directory)
+    stream.write(
+        _END_OF_DIRECTORY.pack(
+            0x06054B50,
+            0,
+            0,
+            len(parts),
+            len(parts),
+            len(directory),
+            offset,
+            0,
+        )
+    )
+
+
+def _dos_date_time(date_time: tuple) -> tuple:
+    year, month, day, hour, minute, second = date_time
+    dos_time = hour << 11 | minute << 5 | second // 2
+    dos_date = (year - 1980) << 9 | month << 5 | day
+    return dos_time, dos_date
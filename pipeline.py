@@ -0,0 +1,580 @@
+import logging
+import os
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Callable, List, Optional, Set, Union
+
+import numpy as np
+
+from metrics import record_failure, timed_stage
+from metrics.run_metrics import (
+    BYTES_READ,
+    BYTES_WRITTEN,
+    SCORE_ANOMALIES,
+    SHEETS_PROCESSED,
+    SHEETS_UNCHANGED,
+    STUDENT_ROWS_PROCESSED,
+    WORKBOOKS_PROCESSED,
+)
+from openpyxl_worker import (
+    AnalyticTableCreates,
+    DistrictTableWorker,
+    GivenTableWorker,
+    PivotTableWorker,
+    StatisticsTableCreates,
+    SummaryTableWorker,
+    WorkbookContainer,
+    WorksheetRanges,
+)
+from openpyxl_worker.analitic_table.analitic_table_planner import (
+    plan_aggregate_table,
+    plan_analytic_tables,
+)
+from openpyxl_worker.analitic_table.layout_cache import LayoutCache
+from openpyxl_worker.constants import (
+    DISTRICT_TABLE_TITLE,
+    PIVOT_TABLE_TITLE,
+    SUMMARY_TABLE_TITLE,
+)
+from openpyxl_worker.dashboard.dashboard_writer import (
+    write_dashboard,
+    write_dashboard_index,
+)
+from openpyxl_worker.feedback_report.feedback_writer import write_feedback_reports
+from openpyxl_worker.fingerprint import (
+    read_fingerprint,
+    sheet_fingerprint,
+    summary_fingerprint,
+    write_fingerprint,
+)
+from openpyxl_worker.given_table.score_cache import (
+    ScoreCache,
+    file_digest,
+    load_scores,
+)
+from openpyxl_worker.given_table.score_cleaner import (
+    clean_scores,
+    write_anomaly_report,
+)
+from openpyxl_worker.quantile_sketch import KllSketch, merge_sketches, write_sketch
+from openpyxl_worker.readers import xlsx_path
+from openpyxl_worker.requirements_catalog import (
+    Requirements,
+    RequirementsCatalog,
+    fill_requirements,
+)
+from openpyxl_worker.statistics_table.score_statistics import (
+    answered_totals,
+    compute_statistics,
+    compute_variant_statistics,
+)
+from openpyxl_worker.student_profiles import ProfileIndex, assessment_key
+from openpyxl_worker.types import (
+    AssessmentKey,
+    CachedSheet,
+    GivenTableData,
+    ScoreStatistics,
+    SheetScores,
+    TableLayout,
+)
+from sentences import Sentences
+from yaml_worker.types import OutputSettings, Subject, Workbook, Worksheet
+
+_layout_cache_path = os.getenv("LAYOUT_CACHE_PATH", "config/layout_cache")
+LAYOUT_CACHE = LayoutCache(Path(_layout_cache_path) if _layout_cache_path else None)
+"""Layouts shared by all workbooks of the process; an empty LAYOUT_CACHE_PATH keeps
+them in memory only."""
+
+MEMORY_LAYOUT_CACHE = LayoutCache()
+"""Layouts of in-memory runs, which never touch the filesystem."""
+
+_score_cache_path = os.getenv("SCORE_CACHE_PATH", "config/score_cache")
+SCORE_CACHE = ScoreCache(Path(_score_cache_path)) if _score_cache_path else None
+"""Extracted scores of processed files; an empty SCORE_CACHE_PATH disables it."""
+
+_anomaly_report_path = os.getenv("ANOMALY_REPORT_PATH", "config/anomalies")
+ANOMALY_REPORT_DIRECTORY = Path(_anomaly_report_path) if _anomaly_report_path else None
+"""Directory of per-workbook score anomaly reports; an empty ANOMALY_REPORT_PATH
+disables them."""
+
+_requirements_path = os.getenv("REQUIREMENTS_CATALOG_PATH", "config/requirements")
+REQUIREMENTS_CATALOG = RequirementsCatalog(
+    Path(_requirements_path) if _requirements_path else None
+)
+"""Task requirements read once per process and written into empty requirement
+cells; an empty REQUIREMENTS_CATALOG_PATH disables them."""
+
+_district_sketch_path = os.getenv("DISTRICT_SKETCH_PATH", "config/district_sketches")
+DISTRICT_SKETCH_DIRECTORY = (
+    Path(_district_sketch_path) if _district_sketch_path else None
+)
+"""Directory of the quantile sketches of student totals of every workbook, merged
+into district percentiles; an empty DISTRICT_SKETCH_PATH disables them."""
+
+
+def process_workbook(
+    wb: Workbook, table_path: Path, before_save: Optional[Callable[[], None]] = None
+) -> None:
+    """Create analytic, statistics and summary tables of a workbook and save it.
+
+    Args:
+        wb (Workbook): Workbook configuration.
+        table_path (Path): Path of the Excel file, overwritten with the result.
+            CSV and ODS inputs are kept and the result is saved as xlsx next to them.
+        before_save (Optional[Callable[[], None]]): Called right before the
+            result is saved; an exception it raises leaves every file untouched.
+    """
+    output_path = xlsx_path(table_path)
+    try:
+        with timed_stage("load"):
+            BYTES_READ.inc(table_path.stat().st_size)
+            wb_container = WorkbookContainer(table_path, wb.trim_used_range)
+        requirements = REQUIREMENTS_CATALOG.lookup(
+            wb.subject.name if wb.subject else "", wb.grade, wb.year
+        )
+        sheet_scores = build_tables(wb_container, wb, LAYOUT_CACHE, requirements)
+        if before_save is not None:
+            before_save()
+        with timed_stage("save"):
+            wb_container.save_table(
+                output_path, wb.output.compression, wb.output.workers
+            )
+            BYTES_WRITTEN.inc(output_path.stat().st_size)
+        if SCORE_CACHE is not None:
+            with timed_stage("score_cache"):
+                cache_scores(SCORE_CACHE, wb, table_path, sheet_scores)
+        if DISTRICT_SKETCH_DIRECTORY is not None:
+            with timed_stage("sketch"):
+                sketch = KllSketch()
+                for sheet in sheet_scores:
+                    shape = (len(sheet.students), len(sheet.max_points))
+                    scores = np.array(sheet.scores, dtype=np.float64).reshape(shape)
+                    sketch.extend(answered_totals(scores, shape[1]))
+                write_sketch(
+                    DISTRICT_SKETCH_DIRECTORY / f"{output_path.stem}.json",
+                    workbook_assessment(wb),
+                    sketch,
+                )
+        if ANOMALY_REPORT_DIRECTORY is not None:
+            write_anomaly_report(
+                ANOMALY_REPORT_DIRECTORY / f"{output_path.stem}.json",
+                wb.name,
+                (anomaly for sheet in sheet_scores for anomaly in sheet.anomalies),
+            )
+        if wb.dashboard_directory is not None:
+            with timed_stage("dashboard"):
+                write_dashboard(
+                    sheet_scores,
+                    wb.dashboard_directory / f"{output_path.stem}.html",
+                    wb.subject.name if wb.subject else output_path.stem,
+                )
+        if wb.feedback_directory is not None:
+            with timed_stage("feedback"):
+                write_feedback_reports(
+                    sheet_scores,
+                    wb.feedback_directory / output_path.stem,
+                    wb.output.compression,
+                )
+    except Exception as exc:
+        record_failure(exc)
+        raise
+    WORKBOOKS_PROCESSED.inc()
+    logging.info("%s %s", Sentences.save_table, output_path)
+
+
+def process_bytes(
+    source: Union[bytes, BinaryIO],
+    worksheets: List[Worksheet],
+    subject: Optional[Subject] = None,
+    output: Optional[OutputSettings] = None,
+    name: str = "upload.xlsx",
+    requirements: Optional[Requirements] = None,
+) -> bytes:
+    """Create analytic, statistics and summary tables of an xlsx workbook in memory.
+
+    Nothing is read from or written to disk: layouts are cached in memory only,
+    the requirements catalog is not read, and score caches, anomaly reports and
+    feedback reports are skipped. Every
+    call works on its own workbook, so calls may run concurrently in threads.
+
+    Args:
+        source (Union[bytes, BinaryIO]): The xlsx workbook as bytes or a binary stream.
+        worksheets (List[Worksheet]): Worksheets to process.
+        subject (Optional[Subject]): Subject with grade thresholds.
+        output (Optional[OutputSettings]): Compression settings of the result.
+        name (str): Workbook name used in log messages.
+        requirements (Optional[Requirements]): Requirement text by task number
+            written into empty requirement cells, None to leave them empty.
+
+    Returns:
+        bytes: The resulting xlsx workbook.
+    """
+    wb = Workbook(name, worksheets, output or OutputSettings(), subject)
+    stream = BytesIO(source) if isinstance(source, bytes) else source
+    try:
+        with timed_stage("load"):
+            wb_container = WorkbookContainer(stream)
+        build_tables(wb_container, wb, MEMORY_LAYOUT_CACHE, requirements)
+        with timed_stage("save"):
+            result = BytesIO()
+            wb_container.save_table(result, wb.output.compression, wb.output.workers)
+    except Exception as exc:
+        record_failure(exc)
+        raise
+    if isinstance(source, bytes):
+        BYTES_READ.inc(len(source))
+    BYTES_WRITTEN.inc(result.tell())
+    WORKBOOKS_PROCESSED.inc()
+    return result.getvalue()
+
+
+def build_tables(
+    wb_container: WorkbookContainer,
+    wb: Workbook,
+    layout_cache: LayoutCache = LAYOUT_CACHE,
+    requirements: Optional[Requirements] = None,
+) -> List[SheetScores]:
+    """Create analytic, statistics and summary tables in a loaded workbook.
+
+    In incremental mode worksheets whose fingerprint matches the one stored by
+    the previous run keep their tables, and only the summary rows of changed
+    worksheets are rewritten. Empty requirement cells of every worksheet are
+    filled from the given requirements.
+
+    Args:
+        wb_container (WorkbookContainer): The loaded workbook.
+        wb (Workbook): Workbook configuration.
+        layout_cache (LayoutCache): Cache of analytic table layouts.
+        requirements (Optional[Requirements]): Requirement text by task number,
+            None to leave the requirement cells as they are.
+
+    Returns:
+        List[SheetScores]: Scores of every processed worksheet.
+    """
+    summary_table_data: List[WorksheetRanges] = []
+    statistics_data: List[ScoreStatistics] = []
+    sheet_scores: List[SheetScores] = []
+    grade_thresholds = wb.subject.grade_thresholds if wb.subject else ()
+
+    given_tables = []
+    unchanged: Set[int] = set()
+    for ws in wb.worksheets:
+        with timed_stage("extract"):
+            wb_data = wb_container.activate_sheet(ws.name)
+            given_ranges = GivenTableWorker(
+                wb_data.ws, ws.point_range
+            ).get_cell_ranges()
+        with timed_stage("clean"):
+            scores, anomalies = clean_scores(
+                wb_data.ws.title,
+                given_ranges.point_cells,
+                given_ranges.max_points,
+            )
+        for anomaly in anomalies:
+            SCORE_ANOMALIES.inc(labels=(anomaly.kind.value,))
+        with timed_stage("statistics"):
+            statistics = compute_statistics(
+                wb_data.ws.title,
+                scores,
+                given_ranges.task_numbers,
+                given_ranges.max_points,
+                grade_thresholds,
+            )
+            variants = compute_variant_statistics(
+                wb_data.ws.title,
+                scores,
+                given_ranges.variant_cells,
+                given_ranges.task_variants,
+                given_ranges.max_points,
+            )
+        STUDENT_ROWS_PROCESSED.inc(len(given_ranges.student_cells))
+        fingerprint = sheet_fingerprint(
+            given_ranges, scores, ws.layout, grade_thresholds
+        )
+        if wb.incremental and read_fingerprint(wb_data.ws) == fingerprint:
+            unchanged.add(len(given_tables))
+        else:
+            write_fingerprint(wb_data.ws, fingerprint)
+        given_tables.append(
+            (
+                wb_data.ws,
+                ws.layout,
+                GivenTableData.from_cells(given_ranges),
+                statistics,
+                variants,
+                scores,
+                tuple(str(cell.value) for cell in given_ranges.student_cells),
+                anomalies,
+            )
+        )
+
+    full_tables = [
+        index
+        for index, (_, layout, *_) in enumerate(given_tables)
+        if layout is TableLayout.FULL
+    ]
+    with timed_stage("plan"):
+        full_plans = plan_analytic_tables(
+            [
+                (given_tables[index][0].title, given_tables[index][2])
+                for index in full_tables
+            ],
+            wb.plan_workers,
+            layout_cache,
+        )
+    plans = dict(zip(full_tables, full_plans))
+
+    for index, (
+        worksheet,
+        _,
+        data,
+        statistics,
+        variants,
+        scores,
+        students,
+        anomalies,
+    ) in enumerate(given_tables):
+        plan = plans.get(index) or plan_aggregate_table(
+            worksheet.title, data, statistics
+        )
+        if index in unchanged:
+            worksheet_ranges = plan.ranges
+            SHEETS_UNCHANGED.inc()
+            logging.info(
+                "%s %s - %s", Sentences.sheet_unchanged, wb.name, worksheet.title
+            )
+        else:
+            with timed_stage("apply"):
+                worksheet_ranges = AnalyticTableCreates(
+                    wb_container.wb, worksheet
+                ).apply(plan)
+                StatisticsTableCreates(
+                    worksheet, worksheet_ranges, statistics, variants
+                ).create()
+            SHEETS_PROCESSED.inc()
+            logging.info("%s %s - %s", Sentences.create_table, wb.name, worksheet.title)
+        if requirements:
+            fill_requirements(
+                worksheet,
+                worksheet_ranges.task_discription_cells,
+                data.task_numbers,
+                requirements,
+            )
+        summary_table_data.append(worksheet_ranges)
+        statistics_data.append(statistics)
+        sheet_scores.append(
+            SheetScores(
+                worksheet.title,
+                students,
+                tuple(tuple(row) for row in scores.tolist()),
+                data.max_points,
+                tuple(
+                    _text(worksheet.cell(cell.row, cell.column).value)
+                    for cell in worksheet_ranges.task_discription_cells
+                ),
+                statistics,
+                anomalies,
+            )
+        )
+
+    with timed_stage("summary"):
+        summary_exists = SUMMARY_TABLE_TITLE in wb_container.wb.sheetnames
+        summary = SummaryTableWorker(wb_container.wb, SUMMARY_TABLE_TITLE)
+        summary_key = summary_fingerprint(summary_table_data)
+        if (
+            wb.incremental
+            and summary_exists
+            and read_fingerprint(summary.ws) == summary_key
+        ):
+            changed = set(range(len(given_tables))) - unchanged
+            if changed:
+                summary.patch(summary_table_data, statistics_data, changed)
+        else:
+            summary.create(summary_table_data, statistics_data)
+            write_fingerprint(summary.ws, summary_key)
+    with timed_stage("pivot"):
+        # Static values from the collected scores; cheap enough to rebuild every run.
+        PivotTableWorker(wb_container.wb, PIVOT_TABLE_TITLE).create(sheet_scores)
+    logging.info(
+        "%s %s - %s", Sentences.create_table, wb.name, Sentences.overall_results
+    )
+    return sheet_scores
+
+
+def cache_scores(
+    cache: ScoreCache, wb: Workbook, table_path: Path, sheet_scores: List[SheetScores]
+) -> None:
+    """Store the scores of a processed workbook under the digest of its source.
+
+    xlsx sources are overwritten with the result, so the digest is taken after
+    saving: the next analysis run reads the same file.
+
+    Args:
+        cache (ScoreCache): The score cache.
+        wb (Workbook): Workbook configuration.
+        table_path (Path): Path of the source file.
+        sheet_scores (List[SheetScores]): Scores of every worksheet.
+    """
+    digest = file_digest(table_path)
+    for ws, sheet in zip(wb.worksheets, sheet_scores):
+        cache.put(
+            digest,
+            ws.point_range,
+            CachedSheet(
+                sheet.name,
+                sheet.students,
+                sheet.statistics.task_numbers,
+                sheet.max_points,
+                np.array(sheet.scores, dtype=np.float64).reshape(
+                    len(sheet.students), len(sheet.max_points)
+                ),
+            ),
+            table_path,
+        )
+
+
+def analyze_workbook(wb: Workbook, table_path: Path) -> List[ScoreStatistics]:
+    """Compute score statistics of a workbook without creating tables.
+
+    Scores are read memory-mapped from the score cache; the file is parsed only
+    when it changed since it was cached.
+
+    Args:
+        wb (Workbook): Workbook configuration.
+        table_path (Path): Path of the source file.
+
+    Returns:
+        List[ScoreStatistics]: Statistics of every configured worksheet.
+    """
+    grade_thresholds = wb.subject.grade_thresholds if wb.subject else ()
+    with timed_stage("load"):
+        sheets = load_scores(
+            table_path,
+            [(ws.name, ws.point_range) for ws in wb.worksheets],
+            SCORE_CACHE,
+        )
+    with timed_stage("statistics"):
+        return [
+            compute_statistics(
+                sheet.name,
+                sheet.scores,
+                sheet.task_numbers,
+                sheet.max_points,
+                grade_thresholds,
+            )
+            for sheet in sheets
+        ]
+
+
+def build_profiles(workbooks: List[Workbook], tables_directory: Path) -> ProfileIndex:
+    """Join the results of every student across the workbooks of all subjects.
+
+    Workbooks are read one at a time, from the score cache when possible, so
+    only the profiles of a whole district are kept in memory.
+
+    Args:
+        workbooks (List[Workbook]): Workbook configurations.
+        tables_directory (Path): Directory of the workbook files.
+
+    Returns:
+        ProfileIndex: Profiles of every student.
+    """
+    index = ProfileIndex()
+    for wb in workbooks:
+        subject = wb.subject.name if wb.subject else Path(wb.name).stem
+        with timed_stage("load"):
+            sheets = load_scores(
+                Path(tables_directory, wb.name),
+                [(ws.name, ws.point_range) for ws in wb.worksheets],
+                SCORE_CACHE,
+            )
+        with timed_stage("join"):
+            for ws, sheet in zip(wb.worksheets, sheets):
+                index.add_sheet(wb.school, ws.class_name or ws.name, subject, sheet)
+    logging.info(
+        "Joined %d student profiles from %d workbooks", len(index), len(workbooks)
+    )
+    return index
+
+
+def workbook_assessment(wb: Workbook) -> AssessmentKey:
+    """Return the assessment of a workbook; workbooks without a subject stand alone."""
+    subject = wb.subject.name if wb.subject else Path(wb.name).stem
+    return assessment_key(subject, wb.grade, wb.year)
+
+
+def write_district_ranks(workbooks: List[Workbook], tables_directory: Path) -> None:
+    """Write district percentile ranks of classes and students into every workbook.
+
+    The sketches written when the workbooks were processed, by this or any
+    other worker, are merged per assessment one file at a time, so memory does
+    not grow with the size of the district. Each processed workbook then gets a
+    sheet ranking its classes and students against all workbooks of the same
+    subject, grade and year.
+
+    Args:
+        workbooks (List[Workbook]): Workbook configurations.
+        tables_directory (Path): Directory of the workbook files.
+    """
+    if DISTRICT_SKETCH_DIRECTORY is None:
+        logging.warning("District percentiles are disabled by DISTRICT_SKETCH_PATH")
+        return
+    with timed_stage("sketch"):
+        sketches = merge_sketches(
+            DISTRICT_SKETCH_DIRECTORY / f"{xlsx_path(Path(wb.name)).stem}.json"
+            for wb in workbooks
+        )
+    for key, sketch in sketches.items():
+        logging.info("District %s: %d students", "/".join(key), len(sketch))
+
+    for wb in workbooks:
+        sketch = sketches.get(workbook_assessment(wb))
+        if sketch is None:
+            continue
+        output_path = xlsx_path(Path(tables_directory, wb.name))
+        point_ranges = [(ws.name, ws.point_range) for ws in wb.worksheets]
+        with timed_stage("load"):
+            sheets = load_scores(output_path, point_ranges, SCORE_CACHE)
+            wb_container = WorkbookContainer(output_path)
+        with timed_stage("district"):
+            DistrictTableWorker(wb_container.wb, DISTRICT_TABLE_TITLE).create(
+                [
+                    (ws.class_name or ws.name, sheet)
+                    for ws, sheet in zip(wb.worksheets, sheets)
+                ],
+                sketch,
+            )
+        with timed_stage("save"):
+            wb_container.save_table(
+                output_path, wb.output.compression, wb.output.workers
+            )
+        if SCORE_CACHE is not None:
+            # The scores are unchanged; keep them cached under the new digest.
+            digest = file_digest(output_path)
+            for (_, point_range), sheet in zip(point_ranges, sheets):
+                SCORE_CACHE.put(digest, point_range, sheet, output_path)
+        logging.info("%s %s", Sentences.save_table, output_path)
+
+
+def write_dashboard_indexes(workbooks: List[Workbook]) -> None:
+    """Write the index page of every dashboard directory once per batch.
+
+    Each index lists the whole directory, so writing it after every workbook
+    would read the directory once per workbook.
+
+    Args:
+        workbooks (List[Workbook]): Workbook configurations of the batch.
+    """
+    directories = {
+        wb.dashboard_directory for wb in workbooks if wb.dashboard_directory is not None
+    }
+    with timed_stage("dashboard"):
+        for directory in sorted(directories):
+            write_dashboard_index(directory)
+
+
+def _text(value: object) -> str:
+    """Return cell text, skipping formulas and empty cells."""
+    if value is None or (isinstance(value, str) and value.startswith("=")):
+        return ""
+    return str(value)
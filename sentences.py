@@ -12,3 +12,4 @@ class Sentences(StrEnum):
     save_table = "Сохранена таблица:"
     press_to_close = "Нажмите Enter для закрытия..."
     overall_results = "Общие результаты"
+    sheet_unchanged = "Таблица не изменилась:"
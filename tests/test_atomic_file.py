@@ -0,0 +1,27 @@
+import pytest
+
+from atomic_file import FILE_MODE, atomic_write
+
+
+def test_file_is_replaced_when_the_block_completes(tmp_path):
+    path = tmp_path / "sub" / "book.xlsx"
+
+    with atomic_write(path, "wb") as file:
+        file.write(b"new")
+
+    assert path.read_bytes() == b"new"
+    assert path.stat().st_mode & 0o777 == FILE_MODE
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_interrupted_write_leaves_the_file_untouched(tmp_path):
+    path = tmp_path / "book.xlsx"
+    path.write_bytes(b"old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(path, "wb") as file:
+            file.write(b"partial")
+            raise RuntimeError("interrupted")
+
+    assert path.read_bytes() == b"old"
+    assert list(tmp_path.iterdir()) == [path]
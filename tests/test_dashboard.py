@@ -0,0 +1,50 @@
+import re
+
+import numpy as np
+
+from openpyxl_worker.dashboard.dashboard_writer import (
+    render_dashboard,
+    write_dashboard_index,
+)
+from openpyxl_worker.statistics_table.score_statistics import compute_statistics
+from openpyxl_worker.types import SheetScores
+
+NAN = np.nan
+
+
+def sheet_scores(name, scores):
+    scores = np.array(scores, dtype=float)
+    return SheetScores(
+        name,
+        tuple(f"Ученик {row}" for row in range(len(scores))),
+        tuple(tuple(row) for row in scores.tolist()),
+        (1, 3),
+        ("", ""),
+        compute_statistics(name, scores, ("1", "2"), (1, 3), (1, 2, 3)),
+    )
+
+
+def class_completion(page):
+    rows = re.findall(r"<tr><td>(.*?)</td>.*?>([\d,]+)%<", page)
+    return {name: value for name, value in rows if not name.isdigit()}
+
+
+def test_class_completion_matches_the_analytic_table():
+    # Like the analytic table: mean row total of every student row divided by
+    # the max total, a student without scores counting as 0.
+    sheets = [sheet_scores("5А", [[1, 3], [0, 1], [NAN, NAN], [1, NAN]])]
+
+    page = "".join(render_dashboard(sheets, "Математика"))
+
+    assert class_completion(page) == {"5А": "37,50"}
+
+
+def test_index_lists_every_dashboard_once(tmp_path):
+    for name in ("b", "a"):
+        (tmp_path / f"{name}.html").write_text("", encoding="utf-8")
+
+    write_dashboard_index(tmp_path)
+    write_dashboard_index(tmp_path)
+
+    index = (tmp_path / "index.html").read_text(encoding="utf-8")
+    assert re.findall(r'href="(.*?)"', index) == ["a.html", "b.html"]
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from openpyxl_worker.fingerprint import (
+    read_fingerprint,
+    sheet_fingerprint,
+    write_fingerprint,
+)
+from openpyxl_worker.given_table.given_table_worker import GivenTableWorker
+from openpyxl_worker.given_table.score_cleaner import clean_scores
+from openpyxl_worker.types import Range, TableLayout
+
+FORM = Path(__file__).parent.parent / "tables" / "base_form.xlsx"
+SHEET = "Протокол"
+POINT_RANGE = Range("C2", "R21")
+
+
+@pytest.fixture
+def wb():
+    return load_workbook(FORM)
+
+
+def fingerprint(ws, layout=TableLayout.FULL, thresholds=(6, 11, 16)):
+    cells = GivenTableWorker(ws, POINT_RANGE).get_cell_ranges()
+    scores, _ = clean_scores(ws.title, cells.point_cells, cells.max_points)
+    return sheet_fingerprint(cells, scores, layout, thresholds)
+
+
+def test_unchanged_worksheets_have_equal_fingerprints(wb):
+    assert fingerprint(wb[SHEET]) == fingerprint(load_workbook(FORM)[SHEET])
+
+
+def test_inputs_of_the_tables_change_the_fingerprint(wb):
+    ws = wb[SHEET]
+    original = fingerprint(ws)
+
+    assert fingerprint(ws, layout=TableLayout.AGGREGATE) != original
+    assert fingerprint(ws, thresholds=(5, 10, 15)) != original
+
+    cells = GivenTableWorker(ws, POINT_RANGE).get_cell_ranges()
+    cell = cells.point_cells[0][0]
+    cell.value = 0 if cell.value else 1
+    assert fingerprint(ws) != original
+
+
+def test_fingerprint_is_kept_in_the_saved_workbook(wb, tmp_path):
+    write_fingerprint(wb[SHEET], "abc")
+    wb.save(tmp_path / "book.xlsx")
+
+    saved = load_workbook(tmp_path / "book.xlsx")
+
+    assert read_fingerprint(saved[SHEET]) == "abc"
+    assert read_fingerprint(saved["Протокол_2"]) is None
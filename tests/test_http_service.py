@@ -0,0 +1,99 @@
+import json
+import multiprocessing
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import quote
+
+import pytest
+
+from http_service import AnalyzerServer, ServiceConfig
+from http_service.server import RequestError, parse_worksheets
+from http_service.worker_pool import WorkerPool
+
+FORM = Path(__file__).parent.parent / "tables" / "base_form.xlsx"
+
+
+@pytest.mark.parametrize(
+    "point_range", ["ZZ2:A1", "C21:R2", "2C:R21", "C2", "C2:R21:S3"]
+)
+def test_malformed_point_ranges_are_rejected(point_range):
+    with pytest.raises(RequestError):
+        parse_worksheets(f"worksheet=a&point_range={point_range}")
+
+
+def test_worksheets_and_thresholds_are_parsed():
+    worksheets, subject = parse_worksheets(
+        "worksheet=a&point_range=C2:R21&worksheet=b&point_range=C2:Q21"
+        "&grade_thresholds=6,11,16"
+    )
+
+    assert [(ws.name, ws.point_range.end) for ws in worksheets] == [
+        ("a", "R21"),
+        ("b", "Q21"),
+    ]
+    assert subject.grade_thresholds == (6, 11, 16)
+
+
+def test_hung_worker_is_replaced():
+    pool = WorkerPool(1)
+    try:
+        started = time.monotonic()
+        with pytest.raises(multiprocessing.TimeoutError):
+            pool.run(time.sleep, (30,), 0.5)
+        assert time.monotonic() - started < 10
+
+        assert pool.run(pow, (2, 10), 10) == 1024
+        with pytest.raises(ValueError):
+            pool.run(int, ("x",), 10)
+    finally:
+        pool.terminate()
+
+
+@pytest.fixture
+def server(request):
+    timeout = getattr(request, "param", 60)
+    server = AnalyzerServer(
+        ServiceConfig(port=0, workers=1, max_concurrency=1, timeout=timeout)
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, data, point_range="C2:R21"):
+    url = (
+        f"http://127.0.0.1:{server.server_address[1]}/analyze"
+        f"?worksheet={quote('Протокол')}&point_range={point_range}"
+    )
+    request = urllib.request.Request(url, data=data, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_uploads_are_processed_and_bad_input_is_rejected(server):
+    status, body = post(server, FORM.read_bytes())
+    assert status == 200 and body[:2] == b"PK"
+
+    assert post(server, b"not a workbook")[0] == 400
+    assert post(server, FORM.read_bytes(), "ZZ2:A1")[0] == 400
+    assert server.active_requests == 0
+
+
+def hang(*_args):
+    time.sleep(30)
+
+
+@pytest.mark.parametrize("server", [0.5], indirect=True)
+def test_hung_uploads_time_out_and_free_their_slot(server, monkeypatch):
+    monkeypatch.setattr("http_service.server.process_bytes", hang)
+
+    assert post(server, FORM.read_bytes())[0] == 504
+    assert server.active_requests == 0
@@ -0,0 +1,123 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from job_queue import JobQueue, JobStatus, LeaseLost, run_worker
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / "queue")
+    queue.enqueue("book.xlsx", tmp_path / "tables.yaml", tmp_path / "book.xlsx", 2)
+    return queue
+
+
+def expire_leases(queue):
+    with sqlite3.connect(queue.path) as connection:
+        connection.execute("UPDATE jobs SET lease_until = 0")
+
+
+def test_duplicate_jobs_are_not_queued(queue, tmp_path):
+    assert (
+        queue.enqueue("book.xlsx", tmp_path / "tables.yaml", tmp_path / "book.xlsx")
+        is None
+    )
+    assert queue.counts()[JobStatus.PENDING] == 1
+
+
+def test_only_the_lease_holder_finishes_a_job(queue):
+    job = queue.claim("first", 60)
+
+    assert queue.claim("second", 60) is None
+    assert not queue.complete(job.id, "second")
+    assert not queue.fail(job.id, "second", "error")
+    assert queue.complete(job.id, "first")
+    assert queue.counts()[JobStatus.DONE] == 1
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job = queue.claim("first", 60)
+    expire_leases(queue)
+
+    reclaimed = queue.claim("second", 60)
+
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+    assert not queue.heartbeat(job.id, "first", 60)
+    assert not queue.complete(job.id, "first")
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(queue):
+    queue.claim("first", 60)
+    expire_leases(queue)
+    queue.claim("second", 60)
+    expire_leases(queue)
+
+    assert queue.claim("third", 60) is None
+    (job,) = queue.jobs()
+    assert job.status is JobStatus.FAILED
+
+
+def test_failed_attempt_returns_the_job_to_the_queue(queue):
+    job = queue.claim("first", 60)
+
+    assert queue.fail(job.id, "first", "ValueError: bad")
+
+    (job,) = queue.jobs()
+    assert (job.status, job.error) == (JobStatus.PENDING, "ValueError: bad")
+
+
+def test_worker_abandons_a_job_taken_over_before_saving(queue):
+    saved = []
+
+    def process(job, check_lease):
+        expire_leases(queue)
+        queue.claim("other", 60)
+        check_lease()
+        saved.append(job.id)
+
+    completed = run_worker(queue, process, "worker", 60, 0, exit_when_empty=True)
+
+    assert completed == 0
+    assert saved == []
+    (job,) = queue.jobs()
+    assert (job.status, job.worker) == (JobStatus.RUNNING, "other")
+
+
+def test_lease_check_raises_once_the_lease_is_lost(queue):
+    errors = []
+
+    def process(job, check_lease):
+        check_lease()
+        with sqlite3.connect(queue.path) as connection:
+            connection.execute("UPDATE jobs SET worker = 'other'")
+        try:
+            check_lease()
+        except LeaseLost as exc:
+            errors.append(exc)
+            raise
+
+    assert run_worker(queue, process, "worker", 60, 0, exit_when_empty=True) == 0
+    assert len(errors) == 1
+
+
+def test_worker_completes_and_retries_jobs(queue):
+    attempts = []
+
+    def process(job, check_lease):
+        attempts.append(job.attempts)
+        if job.attempts == 1:
+            raise ValueError("first attempt")
+        check_lease()
+
+    completed = run_worker(queue, process, "worker", 60, 0, exit_when_empty=True)
+
+    assert completed == 1
+    assert attempts == [1, 2]
+    assert queue.counts()[JobStatus.DONE] == 1
+
+
+def test_queue_stores_absolute_paths(queue):
+    (job,) = queue.jobs()
+    assert Path(job.table_path).is_absolute()
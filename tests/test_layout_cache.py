@@ -0,0 +1,56 @@
+import json
+
+from openpyxl_worker.analitic_table.analitic_table_planner import (
+    layout_key,
+    plan_layout,
+)
+from openpyxl_worker.analitic_table.layout_cache import (
+    LayoutCache,
+    template_from_json,
+    template_to_json,
+)
+from openpyxl_worker.types import GivenTableData
+
+DATA = GivenTableData(
+    student_rows=(3, 4, 6),
+    point_columns=(3, 4, 6),
+    task_numbers=("1", "2", "3.1"),
+    max_points=(1, 2, 3),
+    last_row=6,
+)
+
+
+def test_template_survives_a_json_round_trip():
+    template = plan_layout(DATA)
+
+    data = json.loads(json.dumps(template_to_json(template)))
+
+    assert template_from_json(data) == template
+
+
+def test_layouts_are_shared_through_the_directory(tmp_path):
+    key = layout_key(DATA)
+    template = plan_layout(DATA)
+    LayoutCache(tmp_path).put(key, template)
+
+    assert LayoutCache(tmp_path).get(key) == template
+    assert LayoutCache(tmp_path).get("missing") is None
+
+
+def test_memory_cache_evicts_the_least_recently_used_layout():
+    cache = LayoutCache(size=2)
+    template = plan_layout(DATA)
+    for key in ("a", "b", "c"):
+        cache.put(key, template)
+
+    assert cache.get("a") is None
+    assert cache.get("c") == template
+
+
+def test_layout_key_depends_on_the_shape():
+    wider = GivenTableData(
+        DATA.student_rows, (3, 4, 5), DATA.task_numbers, DATA.max_points, DATA.last_row
+    )
+
+    assert layout_key(DATA) == layout_key(GivenTableData(*vars(DATA).values()))
+    assert layout_key(DATA) != layout_key(wider)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from openpyxl_worker.quantile_sketch import KllSketch, merge_sketches, write_sketch
+from openpyxl_worker.types import AssessmentKey
+
+
+def exact_ranks(stream, values):
+    stream = np.sort(stream)
+    below = np.searchsorted(stream, values, side="left")
+    equal = np.searchsorted(stream, values, side="right") - below
+    return (below + equal / 2) / stream.size
+
+
+def test_small_streams_are_ranked_exactly():
+    sketch = KllSketch()
+    sketch.extend([1, 2, 2, 3, float("nan")])
+
+    assert len(sketch) == 4
+    np.testing.assert_allclose(sketch.ranks([0, 2, 4]), [0, 0.5, 1])
+    assert np.isnan(sketch.ranks([float("nan")])[0])
+
+
+def test_ranks_of_large_streams_stay_close():
+    stream = np.random.default_rng(1).integers(0, 30, 200_000).astype(float)
+    sketch = KllSketch()
+    sketch.extend(stream)
+
+    values = np.arange(30)
+    error = np.abs(sketch.ranks(values) - exact_ranks(stream, values)).max()
+
+    assert len(sketch) == stream.size
+    assert error < 0.02
+
+
+def test_merged_sketches_rank_the_union(tmp_path):
+    rng = np.random.default_rng(2)
+    parts = [rng.normal(15, 4, 50_000) for _ in range(4)]
+    key = AssessmentKey("Математика", "5", "2026")
+    paths = []
+    for index, part in enumerate(parts):
+        sketch = KllSketch()
+        sketch.extend(part)
+        paths.append(tmp_path / f"{index}.json")
+        write_sketch(paths[-1], key, sketch)
+
+    merged = merge_sketches([*paths, tmp_path / "missing.json"])[key]
+
+    union = np.concatenate(parts)
+    values = np.linspace(5, 25, 21)
+    assert len(merged) == union.size
+    assert np.abs(merged.ranks(values) - exact_ranks(union, values)).max() < 0.02
+
+
+def test_empty_sketch_has_no_ranks():
+    assert np.isnan(KllSketch().ranks([1.0])).all()
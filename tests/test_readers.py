@@ -0,0 +1,78 @@
+import io
+import zipfile
+
+import pytest
+
+from openpyxl_worker.readers import read_csv, read_ods
+from openpyxl_worker.readers.sheet_builder import parse_value
+
+ODS_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content
+    xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+    xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+    xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">
+<office:body><office:spreadsheet>
+<table:table table:name="Протокол">
+<table:table-row>
+<table:table-cell office:value-type="string"><text:p>Иванов<text:s text:c="2"/>Иван</text:p></table:table-cell>
+<table:table-cell table:number-columns-repeated="2"/>
+<table:table-cell office:value-type="float" office:value="1.5"><text:p>1,5</text:p></table:table-cell>
+<table:table-cell office:value-type="string"><text:p>007</text:p></table:table-cell>
+</table:table-row>
+<table:table-row table:number-rows-repeated="3"><table:table-cell/></table:table-row>
+<table:table-row table:number-rows-repeated="2">
+<table:table-cell office:value-type="float" office:value="2"><text:p>2</text:p></table:table-cell>
+</table:table-row>
+<table:table-row table:number-rows-repeated="1000"><table:table-cell/></table:table-row>
+</table:table>
+</office:spreadsheet></office:body>
+</office:document-content>
+"""
+
+
+@pytest.mark.parametrize(
+    ("text", "value"),
+    [
+        ("12", 12),
+        (" 3 ", 3),
+        ("1,5", 1.5),
+        ("-0.5", -0.5),
+        ("0", 0),
+        ("0,5", 0.5),
+        ("007", "007"),
+        ("-007", "-007"),
+        ("00", "00"),
+        ("x", "x"),
+        ("  ", None),
+    ],
+)
+def test_parse_value(text, value):
+    assert parse_value(text) == value
+    assert type(parse_value(text)) is type(value)
+
+
+def test_csv_keeps_codes_and_parses_scores():
+    data = "Код;Балл\n007;1,5\n\n012;2\n;\n".encode("cp1251")
+
+    ws = read_csv(io.BytesIO(data), "proto").active
+
+    assert ws.title == "proto"
+    assert [[cell.value for cell in row] for row in ws.iter_rows()] == [
+        ["Код", "Балл"],
+        ["007", 1.5],
+        [None, None],
+        ["012", 2],
+    ]
+
+
+def test_ods_expands_spaces_and_repeats(tmp_path):
+    path = tmp_path / "proto.ods"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("content.xml", ODS_CONTENT)
+
+    ws = read_ods(path)["Протокол"]
+
+    assert ws.max_row == 6
+    assert [cell.value for cell in ws[1]] == ["Иванов  Иван", None, None, 1.5, "007"]
+    assert ws["A5"].value == ws["A6"].value == 2
+    assert ws["A2"].value is None
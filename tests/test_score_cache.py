@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from openpyxl_worker.given_table.score_cache import ScoreCache
+from openpyxl_worker.types import CachedSheet, Range
+
+POINT_RANGE = Range("C2", "E4")
+
+
+def sheet(scores):
+    return CachedSheet(
+        "Протокол",
+        ("Иванов", "Петров"),
+        ("1", "2"),
+        (1, 2),
+        np.array(scores, dtype=float),
+    )
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "book.xlsx"
+    path.write_bytes(b"")
+    return path
+
+
+def entries(cache):
+    return sorted(path.name for path in (cache.directory / "scores").iterdir())
+
+
+def test_scores_are_read_back_for_the_same_file(tmp_path, source):
+    cache = ScoreCache(tmp_path / "cache")
+    cache.put("digest", POINT_RANGE, sheet([[1, 2], [np.nan, 0]]), source)
+
+    cached = cache.get("digest", "Протокол", POINT_RANGE, source)
+
+    assert cached.students == ("Иванов", "Петров")
+    assert (cached.task_numbers, cached.max_points) == (("1", "2"), (1, 2))
+    np.testing.assert_array_equal(cached.scores, [[1, 2], [np.nan, 0]])
+    assert cache.get("other", "Протокол", POINT_RANGE, source) is None
+    assert cache.get("digest", "Протокол", Range("C2", "E5"), source) is None
+
+
+def test_saving_the_same_scores_again_keeps_the_entry(tmp_path, source):
+    cache = ScoreCache(tmp_path / "cache")
+    cache.put("first", POINT_RANGE, sheet([[1, 2], [0, 0]]), source)
+    before = entries(cache)
+
+    cache.put("second", POINT_RANGE, sheet([[1, 2], [0, 0]]), source)
+
+    assert entries(cache) == before
+    assert cache.get("first", "Протокол", POINT_RANGE, source) is None
+    assert cache.get("second", "Протокол", POINT_RANGE, source) is not None
+
+
+def test_changed_scores_replace_the_entry(tmp_path, source):
+    cache = ScoreCache(tmp_path / "cache")
+    cache.put("first", POINT_RANGE, sheet([[1, 2], [0, 0]]), source)
+    before = entries(cache)
+
+    cache.put("second", POINT_RANGE, sheet([[1, 2], [1, 0]]), source)
+
+    after = entries(cache)
+    assert len(after) == len(before) and set(after).isdisjoint(before)
+
+
+def test_mapped_entries_are_removed_once_released(tmp_path, source):
+    cache = ScoreCache(tmp_path / "cache")
+    cache.put("first", POINT_RANGE, sheet([[1, 2], [0, 0]]), source)
+    cached = cache.get("first", "Протокол", POINT_RANGE, source)
+
+    cache.put("second", POINT_RANGE, sheet([[1, 2], [1, 0]]), source)
+    assert len(entries(cache)) == 4
+
+    del cached
+    cache.put("third", POINT_RANGE, sheet([[0, 2], [1, 0]]), source)
+    assert len(entries(cache)) == 2
@@ -0,0 +1,115 @@
+import json
+
+import numpy as np
+import pytest
+from openpyxl import Workbook
+
+from openpyxl_worker.given_table.score_cleaner import clean_scores, write_anomaly_report
+from openpyxl_worker.types import AnomalyKind
+
+
+@pytest.fixture
+def ws():
+    return Workbook().active
+
+
+def point_cells(ws, rows):
+    for row_index, row in enumerate(rows, start=2):
+        for column_index, value in enumerate(row, start=2):
+            ws.cell(row_index, column_index, value)
+    last_row = 1 + len(rows)
+    last_column = 1 + max(len(row) for row in rows)
+    return tuple(
+        tuple(row)
+        for row in ws.iter_rows(
+            min_row=2, max_row=last_row, min_col=2, max_col=last_column
+        )
+    )
+
+
+def kinds(anomalies):
+    return {(anomaly.cell, anomaly.kind) for anomaly in anomalies}
+
+
+def test_text_numbers_and_crosses_are_normalised(ws):
+    cells = point_cells(ws, [["1,5", "х", " 2 "], [" ", 1, None]])
+
+    scores, anomalies = clean_scores("Лист", cells, (2, 1, 2))
+
+    np.testing.assert_array_equal(scores, [[1.5, 0, 2], [np.nan, 1, np.nan]])
+    assert [ws["B2"].value, ws["C2"].value, ws["D2"].value] == [1.5, 0, 2]
+    assert ws["B3"].value is None
+    assert kinds(anomalies) == {
+        ("B2", AnomalyKind.TEXT_NUMBER),
+        ("D2", AnomalyKind.TEXT_NUMBER),
+    }
+
+
+def test_rejected_values_stay_in_the_cells(ws):
+    cells = point_cells(ws, [[7, "abc", -1]])
+
+    scores, anomalies = clean_scores("Лист", cells, (2, 2, 2))
+
+    assert np.isnan(scores).all()
+    assert [ws["B2"].value, ws["C2"].value, ws["D2"].value] == [7, "abc", -1]
+    assert kinds(anomalies) == {
+        ("B2", AnomalyKind.ABOVE_MAX),
+        ("C2", AnomalyKind.NOT_A_NUMBER),
+        ("D2", AnomalyKind.NEGATIVE),
+    }
+
+
+def test_cleaning_twice_reports_the_same_anomalies(ws):
+    cells = point_cells(ws, [[7, "abc", "1,5"]])
+
+    _, first = clean_scores("Лист", cells, (2, 2, 2))
+    _, second = clean_scores("Лист", cells, (2, 2, 2))
+
+    assert kinds(first) - {("D2", AnomalyKind.TEXT_NUMBER)} == kinds(second)
+    assert ws["B2"].value == 7
+
+
+def test_formulas_are_kept_and_reported(ws):
+    cells = point_cells(ws, [["=1+1", 1]])
+
+    scores, anomalies = clean_scores("Лист", cells, (2, 2))
+
+    assert ws["B2"].value == "=1+1"
+    assert np.isnan(scores[0, 0])
+    assert kinds(anomalies) == {("B2", AnomalyKind.FORMULA)}
+
+
+def test_columns_without_a_task_are_reported(ws):
+    cells = point_cells(ws, [[1, 2, 5], [0, None, None]])
+
+    scores, anomalies = clean_scores("Лист", cells, (1, 2))
+
+    assert scores.shape == (2, 2)
+    np.testing.assert_array_equal(scores, [[1, 2], [0, np.nan]])
+    assert ws["D2"].value == 5
+    (anomaly,) = anomalies
+    assert (anomaly.cell, anomaly.kind, anomaly.max_point) == (
+        "D2",
+        AnomalyKind.NO_TASK,
+        None,
+    )
+
+
+def test_more_tasks_than_columns_keep_the_task_shape(ws):
+    cells = point_cells(ws, [[1]])
+
+    scores, anomalies = clean_scores("Лист", cells, (1, 2, 3))
+
+    assert scores.shape == (1, 3)
+    assert anomalies == ()
+
+
+def test_anomaly_report_lists_every_anomaly(ws, tmp_path):
+    cells = point_cells(ws, [[7, "abc"]])
+    _, anomalies = clean_scores("Лист", cells, (2, 2))
+
+    write_anomaly_report(tmp_path / "report.json", "book.xlsx", anomalies)
+
+    report = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+    assert "book.xlsx" in json.dumps(report, ensure_ascii=False)
+    assert json.dumps(report, ensure_ascii=False).count("Лист") == 2
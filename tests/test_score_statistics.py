@@ -0,0 +1,97 @@
+import math
+
+import numpy as np
+from openpyxl import Workbook
+
+from openpyxl_worker.statistics_table.score_statistics import (
+    answered_totals,
+    compute_statistics,
+    compute_variant_statistics,
+)
+
+NAN = np.nan
+TASKS = ("1", "2", "3")
+MAX_POINTS = (1, 2, 2)
+THRESHOLDS = (2, 3, 5)
+
+
+def test_absent_students_have_no_grade_and_no_median_weight():
+    scores = np.array(
+        [
+            [1, 2, 2],
+            [0, 1, 1],
+            [NAN, NAN, NAN],
+            [1, NAN, 0],
+        ]
+    )
+
+    statistics = compute_statistics("Лист", scores, TASKS, MAX_POINTS, THRESHOLDS)
+
+    assert statistics.student_totals == (5.0, 2.0, 0.0, 1.0)
+    assert statistics.median_total == 2.0
+    assert statistics.grades == (5, 3, None, 2)
+    assert statistics.grade_counts == (1, 1, 0, 1)
+
+
+def test_median_total_matches_answered_totals():
+    scores = np.array([[1, 2, NAN], [NAN, NAN, NAN], [0, 0, 1]])
+
+    statistics = compute_statistics("Лист", scores, TASKS, MAX_POINTS)
+
+    totals = answered_totals(scores, len(MAX_POINTS))
+    assert totals.tolist() == [3.0, 1.0]
+    assert statistics.median_total == float(np.median(totals))
+    assert statistics.grades == ()
+
+
+def test_nobody_took_part():
+    scores = np.full((2, 3), NAN)
+
+    statistics = compute_statistics("Лист", scores, TASKS, MAX_POINTS, THRESHOLDS)
+
+    assert math.isnan(statistics.median_total)
+    assert statistics.grades == (None, None)
+    assert statistics.grade_counts == (0, 0, 0, 0)
+
+
+def test_task_statistics_skip_empty_cells():
+    scores = np.array([[1, 2, NAN], [0, 1, NAN], [1, NAN, NAN]])
+
+    statistics = compute_statistics("Лист", scores, TASKS, MAX_POINTS)
+
+    assert statistics.averages[:2] == (2 / 3, 1.5)
+    assert math.isnan(statistics.averages[2])
+    assert statistics.histograms == ((1, 2), (0, 1, 1), (0, 0, 0))
+
+
+def variant_cells(rows):
+    ws = Workbook().active
+    for row in rows:
+        ws.append(row)
+    return tuple(tuple(row) for row in ws.iter_rows(max_col=len(rows[0])))
+
+
+def test_completion_is_grouped_by_the_variant_of_each_part():
+    scores = np.array([[1, 2, 2], [0, 1, NAN], [1, 0, 1], [NAN, NAN, NAN]])
+    cells = variant_cells([[1, 2], [2.0, "2"], [" 1 ", 10], [None, None]])
+
+    statistics = compute_variant_statistics(
+        "Лист", scores, cells, (0, 0, 1), MAX_POINTS
+    )
+
+    assert statistics.variants == ("1", "2", "10")
+    task_1, task_2, task_3 = statistics.completion
+    assert task_1[:2] == (1.0, 0.0) and math.isnan(task_1[2])
+    assert task_2[:2] == (0.5, 0.5) and math.isnan(task_2[2])
+    assert math.isnan(task_3[0]) and task_3[1:] == (1.0, 0.5)
+
+
+def test_worksheet_without_variants_has_no_variant_statistics():
+    scores = np.array([[1, 2, 2]])
+
+    assert (
+        compute_variant_statistics(
+            "Лист", scores, variant_cells([[None]]), (0, 0, 0), MAX_POINTS
+        )
+        is None
+    )
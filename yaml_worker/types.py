@@ -1,7 +1,8 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
 
-from openpyxl_worker.types import Range
+from openpyxl_worker.types import Compression, GradeThresholds, Range, TableLayout
 
 Name = str
 
@@ -13,10 +14,40 @@ class Worksheet:
     Attributes:
         name (Name): The name of the worksheet.
         point_range (Range): The cell range for the worksheet (e.g., C2:R21).
+        layout (TableLayout): Layout of the analytic table (full or aggregate).
+        class_name (Name): Class of the students, the worksheet name if empty.
     """
 
     name: Name
     point_range: Range
+    layout: TableLayout = TableLayout.FULL
+    class_name: Name = ""
+
+
+@dataclass
+class Subject:
+    """Represents a subject with its official grade bands.
+
+    Attributes:
+        name (Name): The name of the subject.
+        grade_thresholds (GradeThresholds): Minimal total score for grades 3, 4 and 5.
+    """
+
+    name: Name
+    grade_thresholds: GradeThresholds
+
+
+@dataclass
+class OutputSettings:
+    """Represents how a processed workbook is written to disk.
+
+    Attributes:
+        compression (Compression): Zip compression preset (store, fast, default, best).
+        workers (int): Number of threads compressing workbook parts in parallel.
+    """
+
+    compression: Compression = Compression.DEFAULT
+    workers: int = 1
 
 
 @dataclass
@@ -26,10 +57,33 @@ class Workbook:
     Attributes:
         name (Name): The name of the workbook (Excel file).
         worksheets (List[Worksheet]): List of worksheet configurations in the workbook.
+        output (OutputSettings): Settings used when saving the workbook.
+        subject (Optional[Subject]): Subject of the workbook, used for grade bands.
+        plan_workers (int): Number of processes laying out analytic tables.
+        feedback_directory (Optional[Path]): Directory of per-student feedback
+            reports, None to skip them.
+        incremental (bool): Whether worksheets with unchanged scores are left as they are.
+        trim_used_range (bool): Whether empty styled rows and columns past the data
+            of bloated worksheets are dropped.
+        school (Name): School of the students, joining their results across subjects.
+        grade (Name): Grade of the students, used to look up task requirements.
+        year (Name): Year of the assessment, used to look up task requirements.
+        dashboard_directory (Optional[Path]): Directory of HTML dashboards, None
+            to skip them.
     """
 
     name: Name
     worksheets: List[Worksheet]
+    output: OutputSettings = field(default_factory=OutputSettings)
+    subject: Optional[Subject] = None
+    plan_workers: int = 1
+    feedback_directory: Optional[Path] = None
+    incremental: bool = True
+    trim_used_range: bool = False
+    school: Name = ""
+    grade: Name = ""
+    year: Name = ""
+    dashboard_directory: Optional[Path] = None
 
 
 @dataclass
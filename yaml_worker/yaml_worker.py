@@ -2,12 +2,18 @@ import logging
 import os
 from dataclasses import asdict
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
 from yaml import YAMLError, dump, safe_load
 
-from openpyxl_worker.types import Range
-from yaml_worker.types import Workbook, WorkbooksRanges, Worksheet
+from openpyxl_worker.types import Compression, Range, TableLayout
+from yaml_worker.types import (
+    OutputSettings,
+    Subject,
+    Workbook,
+    WorkbooksRanges,
+    Worksheet,
+)
 
 
 class YamlWorker:
@@ -46,6 +52,7 @@ class YamlWorker:
             logging.exception("Failed to read or parse YAML file: %s", self.path)
             raise
 
+        subjects = self._read_subjects(yaml_data.get("subjects", []))
         workbooks_yaml = yaml_data.get("workbooks", [])
         workbooks: List[Workbook] = []
 
@@ -67,15 +74,152 @@ class YamlWorker:
                     raise ValueError(
                         f"Invalid point_range format: '{point_range}' in worksheet '{ws.get('name', '<unknown>')}' of workbook '{wb.get('name', '<unknown>')}'"
                     ) from ve
-                worksheets.append(Worksheet(ws["name"], Range(start, end)))
-
-            workbooks.append(Workbook(wb["name"], worksheets))
+                worksheets.append(
+                    Worksheet(
+                        ws["name"],
+                        Range(start, end),
+                        self._read_layout(ws, wb),
+                        str(ws.get("class", "")),
+                    )
+                )
+
+            output = self._read_output_settings(wb)
+            subject = self._find_subject(wb, subjects)
+            workbooks.append(
+                Workbook(
+                    wb["name"],
+                    worksheets,
+                    output,
+                    subject,
+                    int(wb.get("plan_workers", 1)),
+                    Path(wb["feedback_directory"])
+                    if wb.get("feedback_directory")
+                    else None,
+                    bool(wb.get("incremental", True)),
+                    bool(wb.get("trim_used_range", False)),
+                    str(wb.get("school", "")),
+                    str(wb.get("grade", "")),
+                    str(wb.get("year", "")),
+                    Path(wb["dashboard_directory"])
+                    if wb.get("dashboard_directory")
+                    else None,
+                )
+            )
 
         logging.info(
             "Successfully read %d workbooks from %s", len(workbooks), self.path
         )
         return workbooks
 
+    def _read_layout(self, ws: dict, wb: dict) -> TableLayout:
+        """Read the optional analytic table layout of a worksheet configuration.
+
+        Args:
+            ws (dict): Raw worksheet configuration.
+            wb (dict): Raw workbook configuration containing the worksheet.
+
+        Returns:
+            TableLayout: The layout, full when the key is absent.
+        Raises:
+            ValueError: If the layout is unknown.
+        """
+        layout = ws.get("layout", TableLayout.FULL.value)
+        try:
+            return TableLayout(layout)
+        except ValueError as ve:
+            logging.error(
+                "Invalid layout in worksheet '%s' of workbook '%s': %s",
+                ws.get("name", "<unknown>"),
+                wb.get("name", "<unknown>"),
+                layout,
+            )
+            raise ValueError(
+                f"Invalid layout: '{layout}' in worksheet '{ws.get('name', '<unknown>')}' of workbook '{wb.get('name', '<unknown>')}'"
+            ) from ve
+
+    def _read_subjects(self, subjects_yaml: List[dict]) -> Dict[str, Subject]:
+        """Read subjects with their grade thresholds.
+
+        Args:
+            subjects_yaml (List[dict]): Raw subject configurations.
+
+        Returns:
+            Dict[str, Subject]: Subjects by name.
+        Raises:
+            ValueError: If grade thresholds are not three non-decreasing numbers.
+        """
+        subjects: Dict[str, Subject] = {}
+
+        for subject in subjects_yaml:
+            thresholds = tuple(float(value) for value in subject["grade_thresholds"])
+            if len(thresholds) != 3 or list(thresholds) != sorted(thresholds):
+                logging.error(
+                    "Invalid grade_thresholds in subject '%s': %s",
+                    subject.get("name", "<unknown>"),
+                    subject["grade_thresholds"],
+                )
+                raise ValueError(
+                    f"Invalid grade_thresholds: '{subject['grade_thresholds']}' in subject '{subject.get('name', '<unknown>')}'"
+                )
+            subjects[subject["name"]] = Subject(subject["name"], thresholds)
+
+        return subjects
+
+    def _find_subject(
+        self, wb: dict, subjects: Dict[str, Subject]
+    ) -> Optional[Subject]:
+        """Find the subject referenced by a workbook configuration.
+
+        Args:
+            wb (dict): Raw workbook configuration.
+            subjects (Dict[str, Subject]): Subjects by name.
+
+        Returns:
+            Optional[Subject]: The subject, or None when the workbook has none.
+        Raises:
+            ValueError: If the subject is not described in the subjects section.
+        """
+        name = wb.get("subject")
+        if name is None:
+            return None
+        if name not in subjects:
+            logging.error(
+                "Unknown subject '%s' in workbook '%s'",
+                name,
+                wb.get("name", "<unknown>"),
+            )
+            raise ValueError(
+                f"Unknown subject: '{name}' in workbook '{wb.get('name', '<unknown>')}'"
+            )
+        return subjects[name]
+
+    def _read_output_settings(self, wb: dict) -> OutputSettings:
+        """Read the optional output section of a workbook configuration.
+
+        Args:
+            wb (dict): Raw workbook configuration.
+
+        Returns:
+            OutputSettings: Parsed output settings, defaults when the section is absent.
+        Raises:
+            ValueError: If the compression preset is unknown.
+        """
+        output_data = wb.get("output") or {}
+        compression = output_data.get("compression", Compression.DEFAULT.value)
+        try:
+            return OutputSettings(
+                Compression(compression), int(output_data.get("workers", 1))
+            )
+        except ValueError as ve:
+            logging.error(
+                "Invalid output settings in workbook '%s': %s",
+                wb.get("name", "<unknown>"),
+                output_data,
+            )
+            raise ValueError(
+                f"Invalid output settings: '{output_data}' in workbook '{wb.get('name', '<unknown>')}'"
+            ) from ve
+
     def write(self, workbooks_ranges: WorkbooksRanges) -> None:
         """Write workbook ranges to the YAML configuration file.
 